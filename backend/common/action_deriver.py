@@ -3,6 +3,23 @@
 from typing import Dict, List
 from datetime import datetime
 
+from common.keyword_scanner import KeywordScanner
+
+_portfolio_scanner = KeywordScanner({
+    "concentration": ["concentration"],
+    "risk": ["volatility", "risk"],
+    "rebalance": ["rebalance"],
+})
+
+_retirement_scanner = KeywordScanner({
+    "probability": ["probability", "success rate"],
+    "success": ["success"],
+    "percent": ["%"],
+    "income_gap": ["gap", "shortfall"],
+    "savings": ["increase savings"],
+    "insurance": ["insurance"],
+})
+
 # ✅ Add Portfolio Logic
 def derive_portfolio_actions(
     user_id: str,
@@ -17,10 +34,10 @@ def derive_portfolio_actions(
     alerts = []
     todos = []
 
-    text = portfolio_report.lower() if portfolio_report else ""
+    scan = _portfolio_scanner.scan(portfolio_report)
 
     # ------ ALERT RULES ------
-    if "concentration" in text:
+    if scan.has("concentration"):
         alerts.append({
             "clerk_user_id": user_id,
             "job_id": job_id,
@@ -33,7 +50,7 @@ def derive_portfolio_actions(
             "rationale": "Derived from portfolio analysis text."
         })
 
-    if "volatility" in text or "risk" in text:
+    if scan.has("risk"):
         alerts.append({
             "clerk_user_id": user_id,
             "job_id": job_id,
@@ -48,7 +65,7 @@ def derive_portfolio_actions(
 
 
     # ------ TODO MAPPING ------
-    if "rebalance" in text:
+    if scan.has("rebalance"):
         todos.append({
             "clerk_user_id": user_id,
             "job_id": job_id,
@@ -75,10 +92,10 @@ def derive_retirement_actions(
     alerts = []
     todos = []
 
-    text = retirement_report.lower() if retirement_report else ""
+    scan = _retirement_scanner.scan(retirement_report)
 
     # ------ ALERT RULES ------
-    if "probability" in text or "success rate" in text:
+    if scan.has("probability"):
         alerts.append({
             "clerk_user_id": user_id,
             "job_id": job_id,
@@ -91,7 +108,7 @@ def derive_retirement_actions(
             "rationale": "Current savings and asset model show elevated failure risk."
         })
 
-    if "success" in text and "%" in text:
+    if scan.has("success") and scan.has("percent"):
         alerts.append({
             "clerk_user_id": user_id,
             "job_id": job_id,
@@ -104,7 +121,7 @@ def derive_retirement_actions(
             "rationale": "Current savings and asset model show elevated failure risk."
         })
 
-    if "gap" in text or "shortfall" in text:
+    if scan.has("income_gap"):
         alerts.append({
             "clerk_user_id": user_id,
             "job_id": job_id,
@@ -118,7 +135,7 @@ def derive_retirement_actions(
         })
 
     # ------ TODO MAPPING ------
-    if "increase savings" in text:
+    if scan.has("savings"):
         todos.append({
             "clerk_user_id": user_id,
             "job_id": job_id,
@@ -132,7 +149,7 @@ def derive_retirement_actions(
             "due_at": None
         })
 
-    if "insurance" in text:
+    if scan.has("insurance"):
         todos.append({
             "clerk_user_id": user_id,
             "job_id": job_id,
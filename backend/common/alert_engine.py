@@ -2,9 +2,17 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import logging
+import operator
+import os
+import time
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -114,10 +122,19 @@ ApplyFn = Callable[[AlertContext], EngineResult]
 
 @dataclass
 class Rule:
+    """
+    domain / category are dispatch keys: the engine only runs a rule's
+    condition for contexts with matching keys. None means "any".
+    """
     name: str
     description: str
     condition: ConditionFn
     apply: ApplyFn
+    domain: Optional[str] = None
+    category: Optional[str] = None
+
+
+DispatchKey = Tuple[Optional[str], Optional[str]]
 
 
 # ---------------------------------------------------------------------------
@@ -189,132 +206,45 @@ def _default_todo_title(alert: AlertContext, action_hint: str) -> str:
 
 
 # ---------------------------------------------------------------------------
-# Concrete rules (V1)
+# Rule table compilation
 # ---------------------------------------------------------------------------
-
-def _price_large_drop_condition(alert: AlertContext) -> bool:
-    return (
-        alert.category == "price"
-        and alert.price_change_pct is not None
-        and alert.price_change_pct <= -8.0
-    )
-
-
-def _price_large_drop_apply(alert: AlertContext) -> EngineResult:
-    return _build_result(
-        alert,
-        severity="critical",
-        action_required=True,
-        confidence_score=90,
-        action_hint="review",
-        rationale=f"Price dropped {alert.price_change_pct:.1f}% in a single session.",
-        create_todo=True,
-        todo_action_type="review_position",
-        todo_priority="high",
-        todo_due_in_days=2,
-    )
-
-
-def _price_medium_drop_condition(alert: AlertContext) -> bool:
-    return (
-        alert.category == "price"
-        and alert.price_change_pct is not None
-        and -8.0 < alert.price_change_pct <= -4.0
-    )
-
-
-def _price_medium_drop_apply(alert: AlertContext) -> EngineResult:
-    return _build_result(
-        alert,
-        severity="warning",
-        action_required=True,
-        confidence_score=80,
-        action_hint="monitor",
-        rationale=f"Price dropped {alert.price_change_pct:.1f}%. Worth monitoring.",
-        create_todo=True,
-        todo_action_type="monitor_trend",
-        todo_priority="medium",
-        todo_due_in_days=5,
-    )
-
-
-def _price_spike_condition(alert: AlertContext) -> bool:
-    return (
-        alert.category == "price"
-        and alert.price_change_pct is not None
-        and alert.price_change_pct >= 7.0
-    )
-
-
-def _price_spike_apply(alert: AlertContext) -> EngineResult:
-    return _build_result(
-        alert,
-        severity="warning",
-        action_required=False,  # informational for now
-        confidence_score=75,
-        action_hint="monitor",
-        rationale=f"Price increased {alert.price_change_pct:.1f}%. Consider monitoring momentum.",
-        create_todo=False,
-    )
+#
+# Rules live in a versioned table (alert_rules.json, a YAML file, or the
+# alert_rule_sets DB table):
+#
+#   {"version": "v1", "rules": [{
+#       "name": "price_large_drop",
+#       "category": "price",                      # dispatch keys (optional)
+#       "when": {"all": [{"field": "price_change_pct", "op": "lte", "value": -8.0}]},
+#       "severity": "critical", "action_required": true,
+#       "confidence_score": 90, "action_hint": "review",
+#       "rationale": "Price dropped {price_change_pct:.1f}% in a single session.",
+#       "todo": {"action_type": "review_position", "priority": "high", "due_in_days": 2}
+#   }]}
+#
+# "when" nests "all" / "any" groups of {field, op, value} predicates.
+# Comparisons (lt/lte/gt/gte) never match a missing (None) field.
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("alert_rules.json")
+RULES_RELOAD_SECONDS = float(os.getenv("ALERT_RULES_RELOAD_SECONDS", "60"))
+
+_CONTEXT_FIELDS = {f.name for f in fields(AlertContext)}
+
+_COMPARISONS = {
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+}
 
 
-def _portfolio_drawdown_condition(alert: AlertContext) -> bool:
-    return (
-        alert.category == "risk"
-        and alert.portfolio_drawdown_pct is not None
-        and alert.portfolio_drawdown_pct <= -12.0
-    )
-
-
-def _portfolio_drawdown_apply(alert: AlertContext) -> EngineResult:
-    return _build_result(
-        alert,
-        severity="critical",
-        action_required=True,
-        confidence_score=90,
-        action_hint="rebalance",
-        rationale=f"Portfolio drawdown of {alert.portfolio_drawdown_pct:.1f}% exceeds threshold.",
-        create_todo=True,
-        todo_action_type="rebalance_portfolio",
-        todo_priority="high",
-        todo_due_in_days=3,
-    )
-
-
-def _overweight_position_condition(alert: AlertContext) -> bool:
-    return (
-        alert.category == "risk"
-        and alert.position_allocation_pct is not None
-        and alert.position_allocation_pct >= 35.0
-    )
-
-
-def _overweight_position_apply(alert: AlertContext) -> EngineResult:
-    return _build_result(
-        alert,
-        severity="warning",
-        action_required=True,
-        confidence_score=85,
-        action_hint="rebalance",
-        rationale=f"Position allocation at {alert.position_allocation_pct:.1f}% exceeds target.",
-        create_todo=True,
-        todo_action_type="rebalance_portfolio",
-        todo_priority="medium",
-        todo_due_in_days=7,
-    )
-
-
-def _earnings_miss_condition(alert: AlertContext) -> bool:
-    return (
-        alert.category == "earnings"
-        and (
-            (alert.earnings_surprise_pct is not None and alert.earnings_surprise_pct < 0)
-            or alert.guidance_change == "lowered"
-        )
-    )
+@dataclass
+class RuleTable:
+    version: Optional[str]
+    rules: List[Rule]
 
 
-def _earnings_miss_apply(alert: AlertContext) -> EngineResult:
+def _earnings_miss_rationale(alert: AlertContext) -> str:
     surprise_str = ""
     if alert.earnings_surprise_pct is not None:
         surprise_str = f"Earnings surprise {alert.earnings_surprise_pct:.1f}% below expectations. "
@@ -322,186 +252,281 @@ def _earnings_miss_apply(alert: AlertContext) -> EngineResult:
     if alert.guidance_change == "lowered":
         guidance_str = "Guidance lowered. "
 
-    rationale = (surprise_str + guidance_str).strip() or "Negative earnings event."
+    return (surprise_str + guidance_str).strip() or "Negative earnings event."
 
-    return _build_result(
-        alert,
-        severity="critical",
-        action_required=True,
-        confidence_score=88,
-        action_hint="review",
-        rationale=rationale,
-        create_todo=True,
-        todo_action_type="review_position",
-        todo_priority="high",
-        todo_due_in_days=3,
-    )
 
-
-def _earnings_beat_condition(alert: AlertContext) -> bool:
-    return (
-        alert.category == "earnings"
-        and alert.earnings_surprise_pct is not None
-        and alert.earnings_surprise_pct >= 5.0
-        and alert.guidance_change in (None, "raised", "unchanged")
-    )
-
-
-def _earnings_beat_apply(alert: AlertContext) -> EngineResult:
+def _earnings_beat_rationale(alert: AlertContext) -> str:
     guidance_str = ""
     if alert.guidance_change == "raised":
         guidance_str = " Guidance raised."
 
-    rationale = (
+    return (
         f"Earnings surprise {alert.earnings_surprise_pct:.1f}% above expectations."
         + guidance_str
     ).strip()
 
-    return _build_result(
-        alert,
-        severity="info",
-        action_required=False,
-        confidence_score=80,
-        action_hint="monitor",
-        rationale=rationale,
-        create_todo=False,
-    )
 
+# Rationales that a format template cannot express; referenced by
+# "rationale_builder" in the rule table
+RATIONALE_BUILDERS: Dict[str, Callable[[AlertContext], str]] = {
+    "earnings_miss": _earnings_miss_rationale,
+    "earnings_beat": _earnings_beat_rationale,
+}
+
+
+def _always(alert: AlertContext) -> bool:
+    return True
+
+
+def _compile_predicate(spec: Dict[str, Any]) -> ConditionFn:
+    field = spec["field"]
+    op = spec["op"]
+    value = spec.get("value")
+
+    if field not in _CONTEXT_FIELDS:
+        raise ValueError(f"Unknown AlertContext field '{field}'")
+
+    if op in _COMPARISONS:
+        cmp = _COMPARISONS[op]
+
+        def predicate(alert: AlertContext) -> bool:
+            v = getattr(alert, field)
+            return v is not None and cmp(v, value)
+
+    elif op == "eq":
+        def predicate(alert: AlertContext) -> bool:
+            return getattr(alert, field) == value
+
+    elif op == "ne":
+        def predicate(alert: AlertContext) -> bool:
+            return getattr(alert, field) != value
+
+    elif op in ("in", "not_in"):
+        options = tuple(value or ())
+        negate = op == "not_in"
+
+        def predicate(alert: AlertContext) -> bool:
+            return (getattr(alert, field) in options) != negate
+
+    elif op == "contains_ci":
+        needle = str(value).lower()
+
+        def predicate(alert: AlertContext) -> bool:
+            return needle in (getattr(alert, field) or "").lower()
+
+    elif op == "is_null":
+        def predicate(alert: AlertContext) -> bool:
+            return getattr(alert, field) is None
+
+    elif op == "not_null":
+        def predicate(alert: AlertContext) -> bool:
+            return getattr(alert, field) is not None
+
+    else:
+        raise ValueError(f"Unknown operator '{op}' on field '{field}'")
+
+    return predicate
 
-def _research_gap_condition(alert: AlertContext) -> bool:
-    return (
-        alert.category == "research_gap"
-        and alert.research_age_days is not None
-        and alert.research_age_days >= 30
-    )
-
-
-def _research_gap_apply(alert: AlertContext) -> EngineResult:
-    return _build_result(
-        alert,
-        severity="warning",
-        action_required=True,
-        confidence_score=70,
-        action_hint="investigate",
-        rationale=f"Last research on this symbol is {alert.research_age_days} days old.",
-        create_todo=True,
-        todo_action_type="research_symbol",
-        todo_priority="medium",
-        todo_due_in_days=7,
-    )
-
-# ADD RULES – Retirement income gap
-
-def _retirement_income_gap_condition(alert: AlertContext) -> bool:
-    return (
-        alert.domain == "retirement"
-        and alert.category == "income"
-    )
-
-def _retirement_income_gap_apply(alert: AlertContext) -> EngineResult:
-    return _build_result(
-        alert,
-        severity="critical",
-        action_required=True,
-        confidence_score=90,
-        action_hint="increase_contributions",
-        rationale="Projected retirement income shortfall detected.",
-        create_todo=True,
-        todo_action_type="increase_contributions",
-        todo_priority="high",
-        todo_due_in_days=30,
-    )
-
-# ADD RULES – Retirement probability risk
-
-def _retirement_probability_condition(alert: AlertContext) -> bool:
-    return (
-        alert.domain == "retirement"
-        and "probability" in (alert.message or "").lower()
-    )
-
-def _retirement_probability_apply(alert: AlertContext) -> EngineResult:
-    return _build_result(
-        alert,
-        severity="warning",
-        action_required=True,
-        confidence_score=85,
-        action_hint="review_plan",
-        rationale="Low retirement success probability detected.",
-        create_todo=True,
-        todo_action_type="review_retirement_plan",
-        todo_priority="medium",
-        todo_due_in_days=14,
-    )
+
+def _compile_condition(spec: Optional[Dict[str, Any]]) -> ConditionFn:
+    if not spec:
+        return _always
+    if "field" in spec:
+        return _compile_predicate(spec)
+
+    if "all" in spec:
+        parts = [_compile_condition(p) for p in spec["all"]]
+        if len(parts) == 1:
+            return parts[0]
+
+        def condition(alert: AlertContext) -> bool:
+            for part in parts:
+                if not part(alert):
+                    return False
+            return True
+
+        return condition
+
+    if "any" in spec:
+        parts = [_compile_condition(p) for p in spec["any"]]
+        if len(parts) == 1:
+            return parts[0]
+
+        def condition(alert: AlertContext) -> bool:
+            for part in parts:
+                if part(alert):
+                    return True
+            return False
+
+        return condition
+
+    raise ValueError(f"Condition must contain 'field', 'all' or 'any': {spec}")
+
+
+def _compile_apply(spec: Dict[str, Any]) -> ApplyFn:
+    """
+    Same result as _build_result, with everything that does not depend on
+    the alert (bounds, todo settings, constant rationales) resolved once.
+    """
+    builder_name = spec.get("rationale_builder")
+    if builder_name and builder_name not in RATIONALE_BUILDERS:
+        raise ValueError(f"Unknown rationale_builder '{builder_name}'")
+    builder = RATIONALE_BUILDERS.get(builder_name) if builder_name else None
+    template = spec.get("rationale") or spec.get("description", "")
+    constant = builder is None and "{" not in template
+
+    action_hint = spec.get("action_hint", "monitor")
+    base_updates: Dict[str, Any] = {
+        "action_required": bool(spec.get("action_required", False)),
+        "confidence_score": max(0, min(100, int(spec.get("confidence_score", 50)))),
+        "action_hint": action_hint,
+    }
+    if spec.get("severity") is not None:
+        base_updates["severity"] = spec["severity"]
+
+    todo = spec.get("todo") or {}
+    todo_action_type = todo.get("action_type")
+    todo_priority = todo.get("priority")
+    create_todo = bool(todo_action_type and todo_priority)
+    due_delta = timedelta(days=todo["due_in_days"]) if todo.get("due_in_days") is not None else None
+
+    def apply(alert: AlertContext) -> EngineResult:
+        if constant:
+            rationale = template
+        elif builder:
+            rationale = builder(alert)
+        else:
+            rationale = template.format_map(alert.__dict__)
+
+        alert_updates = dict(base_updates)
+        alert_updates["rationale"] = rationale
+
+        todo_spec = None
+        if create_todo:
+            todo_spec = TodoSpec(
+                clerk_user_id=alert.clerk_user_id,
+                job_id=alert.job_id,
+                domain=alert.domain,
+                title=_default_todo_title(alert, action_hint),
+                description=alert.message,
+                action_type=todo_action_type,
+                priority=todo_priority,
+                symbol=alert.symbol,
+                rationale=rationale,
+                due_at=alert.created_at + due_delta if due_delta is not None and alert.created_at else None,
+                source_alert_id=alert.alert_id,
+            )
+        return EngineResult(alert_updates=alert_updates, todo_spec=todo_spec)
+
+    return apply
+
+
+def compile_rule_table(doc: Dict[str, Any]) -> RuleTable:
+    """Compile a rule table document into Rule objects (done once per version)."""
+    rules = [
+        Rule(
+            name=spec["name"],
+            description=spec.get("description", ""),
+            condition=_compile_condition(spec.get("when")),
+            apply=_compile_apply(spec),
+            domain=spec.get("domain"),
+            category=spec.get("category"),
+        )
+        for spec in doc.get("rules", [])
+    ]
+    return RuleTable(version=str(doc["version"]), rules=rules)
+
+
+# ---------------------------------------------------------------------------
+# Rule sources
+# ---------------------------------------------------------------------------
+
+class FileRuleSource:
+    """JSON (or YAML, if PyYAML is installed) rule table on disk."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._mtime: Optional[float] = None
+        self._doc: Dict[str, Any] = {}
+
+    def _read(self) -> Dict[str, Any]:
+        mtime = self.path.stat().st_mtime
+        if mtime != self._mtime:
+            text = self.path.read_text()
+            if self.path.suffix in (".yaml", ".yml"):
+                try:
+                    import yaml
+                except ImportError as e:
+                    raise RuntimeError("PyYAML is required for YAML rule tables") from e
+                self._doc = yaml.safe_load(text)
+            else:
+                self._doc = json.loads(text)
+            self._mtime = mtime
+        return self._doc
+
+    def current_version(self) -> str:
+        return str(self._read()["version"])
+
+    def load(self) -> Dict[str, Any]:
+        return self._read()
+
+
+class DbRuleSource:
+    """Active row of the alert_rule_sets table. `db` is a database.src.models.Database."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def current_version(self) -> Optional[str]:
+        rows = self.db.query_raw(
+            """
+            SELECT version FROM alert_rule_sets
+            WHERE is_active
+            ORDER BY created_at DESC
+            LIMIT 1
+            """
+        )
+        return rows[0]["version"] if rows else None
+
+    def load(self) -> Dict[str, Any]:
+        rows = self.db.query_raw(
+            """
+            SELECT version, rules::text AS rules FROM alert_rule_sets
+            WHERE is_active
+            ORDER BY created_at DESC
+            LIMIT 1
+            """
+        )
+        if not rows:
+            raise LookupError("No active row in alert_rule_sets")
+        return {"version": rows[0]["version"], "rules": json.loads(rows[0]["rules"])}
+
+
+def rule_source_from_env(db=None):
+    """
+    ALERT_RULES_SOURCE:
+      unset   -> bundled alert_rules.json
+      "db"    -> alert_rule_sets table (requires `db`)
+      a path  -> JSON / YAML file
+    """
+    source = os.getenv("ALERT_RULES_SOURCE", "").strip()
+    if not source:
+        return FileRuleSource(DEFAULT_RULES_PATH)
+    if source.lower() == "db":
+        if db is None:
+            raise ValueError("ALERT_RULES_SOURCE=db requires a Database")
+        return DbRuleSource(db)
+    return FileRuleSource(source)
 
 
 # ---------------------------------------------------------------------------
 # Rule registry and engine
 # ---------------------------------------------------------------------------
 
-RULES: List[Rule] = [
-    Rule(
-        name="price_large_drop",
-        description="Critical alert for large single-day price drop",
-        condition=_price_large_drop_condition,
-        apply=_price_large_drop_apply,
-    ),
-    Rule(
-        name="price_medium_drop",
-        description="Warning alert for moderate price drop",
-        condition=_price_medium_drop_condition,
-        apply=_price_medium_drop_apply,
-    ),
-    Rule(
-        name="price_spike",
-        description="Informational alert for large price gain",
-        condition=_price_spike_condition,
-        apply=_price_spike_apply,
-    ),
-    Rule(
-        name="portfolio_drawdown",
-        description="Critical portfolio-level drawdown",
-        condition=_portfolio_drawdown_condition,
-        apply=_portfolio_drawdown_apply,
-    ),
-    Rule(
-        name="overweight_position",
-        description="Position allocation above threshold",
-        condition=_overweight_position_condition,
-        apply=_overweight_position_apply,
-    ),
-    Rule(
-        name="earnings_miss",
-        description="Negative earnings surprise or lowered guidance",
-        condition=_earnings_miss_condition,
-        apply=_earnings_miss_apply,
-    ),
-    Rule(
-        name="earnings_beat",
-        description="Positive earnings surprise",
-        condition=_earnings_beat_condition,
-        apply=_earnings_beat_apply,
-    ),
-    Rule(
-        name="research_gap",
-        description="Research is stale and needs refresh",
-        condition=_research_gap_condition,
-        apply=_research_gap_apply,
-    ),
-    Rule(
-        name="retirement_income_gap",
-        description="Income shortfall in retirement projection",
-        condition=_retirement_income_gap_condition,
-        apply=_retirement_income_gap_apply,
-    ),
-    Rule(
-        name="retirement_probability",
-        description="Low retirement success probability",
-        condition=_retirement_probability_condition,
-        apply=_retirement_probability_apply,
-    ),
-
-]
+_DEFAULT_TABLE = compile_rule_table(FileRuleSource(DEFAULT_RULES_PATH).load())
+
+RULES_VERSION: str = _DEFAULT_TABLE.version
+RULES: List[Rule] = _DEFAULT_TABLE.rules
 
 
 class AlertDecisionEngine:
@@ -509,20 +534,130 @@ class AlertDecisionEngine:
     Main entry point.
     You can keep this completely framework-agnostic and call it from
     Lambdas, FastAPI routes, or background jobs.
+
+    With a `source`, the rule table is reloaded when its version changes
+    (checked at most every `reload_seconds` by evaluate_many or
+    reload_if_due), without a redeploy. The active
+    version is written to alert_updates["engine_version"].
+
+    If the source cannot be loaded at start (e.g. no active alert_rule_sets
+    row yet), the bundled rules are served and the source is retried on the
+    next reload check, so importing a caller never fails on it.
     """
 
-    def __init__(self, rules: Optional[List[Rule]] = None):
-        self._rules = rules or RULES
+    def __init__(
+        self,
+        rules: Optional[List[Rule]] = None,
+        source=None,
+        reload_seconds: float = RULES_RELOAD_SECONDS,
+    ):
+        self._source = source
+        self._reload_seconds = reload_seconds
+        self._next_check = time.monotonic() + reload_seconds
+
+        self._from_source = False
+        if source is not None:
+            try:
+                self._install(compile_rule_table(source.load()))
+                self._from_source = True
+            except Exception as e:
+                logger.warning(
+                    f"[AlertEngine] Rule source unavailable, using bundled {_DEFAULT_TABLE.version}: {e}"
+                )
+                self._install(_DEFAULT_TABLE)
+        elif rules is not None:
+            self._install(RuleTable(version=None, rules=rules))
+        else:
+            self._install(_DEFAULT_TABLE)
+
+    def _install(self, table: RuleTable) -> None:
+        # Dispatch index: (domain, category) -> candidate rules in registry order.
+        # Built for every key the rules declare; other keys are filled lazily
+        # from the wildcard rules on first use.
+        self._rules = table.rules
+        self._index: Dict[DispatchKey, List[Rule]] = {}
+        for rule in self._rules:
+            if rule.domain is not None or rule.category is not None:
+                self._candidates(rule.domain, rule.category)
+        self.version: Optional[str] = table.version
+
+    def reload_if_due(self) -> None:
+        """
+        Pick up a new rule table version if the source has one (checked at
+        most every reload_seconds). evaluate_many calls this once per batch;
+        evaluate does not, so callers evaluating one context at a time call
+        it per request, outside the per-context path.
+        """
+        if self._source is None:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self._reload_seconds
+
+        try:
+            version = self._source.current_version()
+            if version is not None and (version != self.version or not self._from_source):
+                self._install(compile_rule_table(self._source.load()))
+                self._from_source = True
+                logger.info(f"[AlertEngine] Loaded rule table {self.version}")
+        except Exception as e:
+            # Keep serving the last good table
+            logger.warning(f"[AlertEngine] Rule reload failed, keeping {self.version}: {e}")
+
+    def _candidates(self, domain: Optional[str], category: Optional[str]) -> List[Rule]:
+        key = (domain, category)
+        rules = self._index.get(key)
+        if rules is None:
+            rules = [
+                r for r in self._rules
+                if r.domain in (None, domain) and r.category in (None, category)
+            ]
+            self._index[key] = rules
+        return rules
 
     def evaluate(self, alert: AlertContext) -> EngineResult:
         """
-        Apply rules in order and return the first matching result.
+        Apply candidate rules in order and return the first matching result.
         If no rule matches, return a neutral default.
         """
-        for rule in self._rules:
-            if rule.condition(alert):
-                return rule.apply(alert)
+        rules = self._index.get((alert.domain, alert.category))
+        if rules is None:
+            rules = self._candidates(alert.domain, alert.category)
+        return self._evaluate(alert, rules)
+
+    def evaluate_many(self, alerts: List[AlertContext]) -> List[EngineResult]:
+        """
+        Evaluate a batch of contexts. Contexts are grouped by
+        (domain, category) so each group resolves its candidate rules once.
+        Results are returned in input order.
+        """
+        self.reload_if_due()
+
+        groups: Dict[DispatchKey, List[int]] = {}
+        for i, alert in enumerate(alerts):
+            groups.setdefault((alert.domain, alert.category), []).append(i)
 
+        results: List[Optional[EngineResult]] = [None] * len(alerts)
+        for (domain, category), positions in groups.items():
+            rules = self._candidates(domain, category)
+            for i in positions:
+                results[i] = self._evaluate(alerts[i], rules)
+        return results  # type: ignore[return-value]
+
+    def _evaluate(self, alert: AlertContext, rules: List[Rule]) -> EngineResult:
+        for rule in rules:
+            if rule.condition(alert):
+                result = rule.apply(alert)
+                break
+        else:
+            result = self._default_result(alert)
+        if self.version is not None:
+            result.alert_updates["engine_version"] = self.version
+        return result
+
+    @staticmethod
+    def _default_result(alert: AlertContext) -> EngineResult:
         # Default behaviour: informational, no todo
         return EngineResult(
             alert_updates={
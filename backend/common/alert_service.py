@@ -1,31 +1,147 @@
 # backend/common/alert_service.py
 
-from typing import Any, Dict, List, Optional
-from uuid import UUID
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import uuid4
 
-from common.alert_engine import AlertDecisionEngine, AlertContext, EngineResult
+from src.models import Database
+from common.alert_engine import (
+    AlertDecisionEngine,
+    AlertContext,
+    EngineResult,
+    TodoSpec,
+    rule_source_from_env,
+)
 from common.alert_store import AlertStore
-from common.todo_store import TodoStore  # you already use this elsewhere
 
 
-_engine = AlertDecisionEngine()
-_alert_store = AlertStore()
-_todo_store = TodoStore()
+# Built on first use (not at import), then shared for the container's
+# lifetime: one Data API client, and an engine that hot-reloads its rules
+_engine: Optional[AlertDecisionEngine] = None
+_alert_store: Optional[AlertStore] = None
+_init_lock = threading.Lock()
+
+
+def _get_engine() -> AlertDecisionEngine:
+    _init()
+    return _engine
+
+
+def _get_alert_store() -> AlertStore:
+    _init()
+    return _alert_store
+
+
+def _init() -> None:
+    global _engine, _alert_store
+    with _init_lock:
+        if _engine is None:
+            db = Database()
+            _alert_store = AlertStore(db)
+            _engine = AlertDecisionEngine(source=rule_source_from_env(db))
 
 
 def emit_alert(ctx: AlertContext) -> EngineResult:
     """
     Central pipeline for alerts:
-      1. Insert base alert via AlertStore
-      2. Run decision engine
-      3. Update alert with engine fields
-      4. Optionally create Todo via TodoStore
+      1. Run decision engine on the raw context (in memory)
+      2. Persist alert + engine fields + optional Todo in ONE statement
+         (dedup of both happens inside that statement)
     """
 
-    # 1) Insert raw alert (baseline severity/status; domain/category/title/message)
-    alert_dict: Dict[str, Any] = {
+    # 1) Decision engine
+    engine = _get_engine()
+    engine.reload_if_due()
+    result = engine.evaluate(ctx)
+
+    # 2) Single round trip
+    todo_dict = _todo_row(result.todo_spec) if result.todo_spec else None
+    ids = _get_alert_store().insert_alert_with_todo(_alert_row(ctx, result), todo_dict)
+
+    ctx.alert_id = str(ids["alert_id"]) if ids.get("alert_id") else None
+    if result.todo_spec:
+        result.todo_spec.source_alert_id = ctx.alert_id
+
+    return result
+
+
+def emit_alerts(
+    contexts: List[AlertContext],
+    todos: Sequence[TodoSpec] = (),
+) -> List[EngineResult]:
+    """
+    Batch pipeline for producers that emit many signals per job:
+      1. Run decision engine on every context (in memory)
+      2. Dedup alerts and todos within the batch
+      3. Persist all alerts and todos with ONE statement
+         (dedup against the DB happens there via the partial unique indexes)
+
+    `todos` are standalone todos (e.g. event-derived) that go through the
+    same dedup. Costs one round trip regardless of batch size.
+    Returns one EngineResult per context, in order.
+    """
+
+    # 1) Decision engine
+    results = _get_engine().evaluate_many(contexts)
+
+    # 2) In-batch dedup (first occurrence wins; keys mirror the unique indexes)
+    alert_rows: List[Dict[str, Any]] = []
+    seen_alerts = set()
+    for ctx, result in zip(contexts, results):
+        key = _alert_key(ctx.clerk_user_id, ctx.domain, ctx.category, ctx.symbol)
+        if key in seen_alerts:
+            continue
+        seen_alerts.add(key)
+        ctx.alert_id = str(uuid4())
+        alert_rows.append({**_alert_row(ctx, result), "alert_id": ctx.alert_id})
+
+    for ctx, result in zip(contexts, results):
+        if result.todo_spec:
+            result.todo_spec.source_alert_id = ctx.alert_id
+
+    todo_rows: List[Dict[str, Any]] = []
+    seen_todos = set()
+    for spec in [r.todo_spec for r in results if r.todo_spec] + list(todos):
+        key = _todo_key(spec.clerk_user_id, spec.symbol, spec.action_type)
+        if key not in seen_todos:
+            seen_todos.add(key)
+            todo_rows.append({**_todo_row(spec), "source_alert_id": spec.source_alert_id})
+
+    if not alert_rows and not todo_rows:
+        return results
+
+    # 3) One write
+    written = _get_alert_store().insert_batch(alert_rows, todo_rows)
+
+    # Alerts skipped by ON CONFLICT were never stored
+    for ctx, result in zip(contexts, results):
+        if ctx.alert_id and ctx.alert_id not in written["alert_ids"]:
+            ctx.alert_id = None
+            if result.todo_spec:
+                result.todo_spec.source_alert_id = None
+
+    deduped = len(alert_rows) - len(written["alert_ids"])
+    if deduped:
+        print(f"[AlertService] Deduped {deduped} alert(s) against open alerts")
+
+    return results
+
+
+def _alert_key(user, domain, category, symbol):
+    # COALESCE(symbol, '') in uq_alerts_live_dedup
+    return (user, domain, category, symbol or "")
+
+
+def _todo_key(user, symbol, action_type):
+    # COALESCE(symbol, '') in uq_todos_open_dedup
+    return (user, symbol or "", action_type)
+
+
+def _alert_row(ctx: AlertContext, result: EngineResult) -> Dict[str, Any]:
+    """Base alert columns from the context, overlaid with engine decisions."""
+    row: Dict[str, Any] = {
         "clerk_user_id": ctx.clerk_user_id,
-        "job_id": ctx.job_id or None,   # if you later bind job_id into context, wire here
+        "job_id": ctx.job_id or None,
         "symbol": ctx.symbol or None,
         "domain": ctx.domain,
         "category": ctx.category,
@@ -34,52 +150,22 @@ def emit_alert(ctx: AlertContext) -> EngineResult:
         "message": ctx.message,
         "rationale": ctx.rationale,
     }
+    for key, value in result.alert_updates.items():
+        if key in AlertStore.INTEL_FIELDS:
+            row[key] = value
+    return row
 
-    alert_id = _alert_store.insert_alert(alert_dict)
-    ctx.alert_id = str(alert_id) if alert_id else None
-
-    # 2) Decision engine
-    result = _engine.evaluate(ctx)
 
-    # 3) Update alert with intelligence fields
-    if alert_id:
-        _alert_store.update_intel_fields(alert_id, result.alert_updates)
-
-    # 4) Create Todo, with light de-duplication
-    if result.todo_spec:
-        existing = _todo_store.list_open_for_user_and_symbol(
-            clerk_user_id=result.todo_spec.clerk_user_id,
-            job_id=result.todo_spec.job_id,
-            symbol=result.todo_spec.symbol,
-        )
-        if _should_create_todo(existing, result.todo_spec):
-            _todo_store.insert_todo({
-                "clerk_user_id": result.todo_spec.clerk_user_id,
-                "job_id": result.todo_spec.job_id,  # can wire job_id into TodoSpec later if needed - DONE
-                "symbol": result.todo_spec.symbol,
-                "domain": result.todo_spec.domain,
-                "title": result.todo_spec.title,
-                "description": result.todo_spec.description,
-                "rationale": result.todo_spec.rationale,
-                "action_type": result.todo_spec.action_type,
-                "priority": result.todo_spec.priority,
-                "due_at": result.todo_spec.due_at,
-                "source_alert_id": alert_id,
-            })
-
-    return result
-
-
-def _should_create_todo(existing_todos: List[Dict[str, Any]], spec) -> bool:
-    """
-    Avoid creating multiple open/in_progress todos for same symbol + action_type.
-    """
-
-    for t in existing_todos:
-        if (
-            t.get("action_type") == spec.action_type
-            and t.get("status") in ("open", "in_progress")
-            and t.get("symbol") == spec.symbol
-        ):
-            return False
-    return True
+def _todo_row(spec: TodoSpec) -> Dict[str, Any]:
+    return {
+        "clerk_user_id": spec.clerk_user_id,
+        "job_id": spec.job_id,
+        "symbol": spec.symbol,
+        "domain": spec.domain,
+        "title": spec.title,
+        "description": spec.description,
+        "rationale": spec.rationale,
+        "action_type": spec.action_type,
+        "priority": spec.priority,
+        "due_at": spec.due_at,
+    }
@@ -1,63 +1,34 @@
 from src.models import Database
 from typing import List, Dict, Optional
 from uuid import UUID
+from datetime import datetime, timezone
 
 
 class AlertStore:
 
-    def __init__(self):
-        self.db = Database()
-
-    def alert_exists(self, clerk_user_id, category, domain, severity, symbol) -> bool:
-        sql = """
-            SELECT 1
-            FROM alerts
-            WHERE clerk_user_id = :user
-                AND category = :category
-                AND domain = :domain
-                AND (:symbol::varchar IS NULL OR symbol = :symbol::varchar)
-                AND status != 'dismissed'
-                LIMIT 1
-        """
-
-        params = [
-            {"name": "user", "value": {"stringValue": str(clerk_user_id)}},
-            {"name": "category", "value": {"stringValue": str(category)}},
-            {"name": "domain", "value": {"stringValue": str(domain)}},
-            ]
-
-        if symbol is None:
-            params.append({"name": "symbol", "value": {"isNull": True}})
-        else:
-            params.append({"name": "symbol", "value": {"stringValue": str(symbol)}})
-
-        rows = self.db.query_raw(sql, params)
-        return bool(rows)
+    # Decision-engine columns written with a new alert (the insert statements
+    # write exactly these, besides the base columns)
+    INTEL_FIELDS = (
+        "severity",
+        "action_required",
+        "confidence_score",
+        "action_hint",
+        "rationale",
+        "engine_version",
+    )
+
+    def __init__(self, db: Optional[Database] = None):
+        # Pass a shared Database to avoid building a new Data API client per store
+        self.db = db or Database()
 
     # -------------------------
     # INSERT
     # -------------------------
     def insert_alert(self, alert: dict):
-        
+
         # ============================
-        # Alert deduplication
+        # Alert deduplication: enforced by uq_alerts_live_dedup
         # ============================
-        if self.alert_exists(
-            clerk_user_id=alert["clerk_user_id"],
-            category=alert["category"],
-            domain=alert["domain"],
-            severity=alert["severity"],
-            symbol=alert.get("symbol"),
-        ):
-            print(
-                f"[AlertStore] Deduped alert: "
-                f"user={alert['clerk_user_id']} "
-                f"type={alert['category']} "
-                f"domain={alert['domain']} "
-                f"symbol={alert['symbol']}"
-            )
-            return None
-
         sql = """
             INSERT INTO alerts (
                 alert_id, clerk_user_id, job_id, symbol,
@@ -69,6 +40,7 @@ class AlertStore:
                 :domain, :category, :severity,
                 :title, :message, :rationale
             )
+            ON CONFLICT DO NOTHING
             RETURNING alert_id
         """
 
@@ -89,8 +61,220 @@ class AlertStore:
 
         rows = self.db.query_raw(sql, params)
         # Aurora Data API wrapper returns list[dict]
-        return rows[0]["alert_id"] if rows else None
+        if not rows:
+            self._log_dedup(alert)
+            return None
+        return rows[0]["alert_id"]
+
+
+    def insert_alert_with_todo(self, alert: Dict, todo: Optional[Dict] = None) -> Dict:
+        """
+        Persist an already-evaluated alert and its optional todo in ONE statement.
+
+        `alert` carries the base columns plus decision-engine fields.
+        `todo` (optional) carries the todo columns; its source_alert_id is
+        taken from the alert inserted by the same statement.
+
+        Dedup is enforced by the partial unique indexes (ON CONFLICT DO NOTHING):
+          - uq_alerts_live_dedup: one non-dismissed alert per (user, domain, category, symbol)
+          - uq_todos_open_dedup: one open/in_progress todo per (user, action_type, symbol)
+
+        Returns {"alert_id": ... | None, "todo_id": ... | None}.
+        """
+        sql = """
+            WITH new_alert AS (
+                INSERT INTO alerts (
+                    alert_id, clerk_user_id, job_id, symbol,
+                    domain, category, severity,
+                    title, message, rationale,
+                    action_required, confidence_score, action_hint,
+                    engine_version
+                )
+                SELECT
+                    uuid_generate_v4(), :user, :job::uuid, :symbol::varchar,
+                    :domain, :category, :severity,
+                    :title, :message, :rationale,
+                    :action_required::boolean, :confidence_score::integer, :action_hint,
+                    :engine_version::varchar
+                ON CONFLICT DO NOTHING
+                RETURNING alert_id
+            )
+        """
+
+        if todo:
+            sql += """
+            , new_todo AS (
+                INSERT INTO todos (
+                    todo_id, clerk_user_id, job_id, symbol,
+                    domain, title, description, rationale,
+                    action_type, priority, due_at, source_alert_id
+                )
+                SELECT
+                    uuid_generate_v4(), :todo_user, :todo_job::uuid, :todo_symbol::varchar,
+                    :todo_domain, :todo_title, :todo_description, :todo_rationale,
+                    :todo_action_type, :todo_priority, :todo_due_at::timestamp,
+                    (SELECT alert_id FROM new_alert)
+                ON CONFLICT DO NOTHING
+                RETURNING todo_id
+            )
+            SELECT
+                (SELECT alert_id FROM new_alert) AS alert_id,
+                (SELECT todo_id FROM new_todo) AS todo_id
+            """
+        else:
+            sql += """
+            SELECT
+                (SELECT alert_id FROM new_alert) AS alert_id,
+                NULL::uuid AS todo_id
+            """
+
+        params = self._build_params(alert)
+        params.append(self._bind_param("job", alert.get("job_id")))
+        params.append(self._bind_param("action_required", alert.get("action_required")))
+        params.append(self._bind_param("confidence_score", alert.get("confidence_score")))
+        params.append(self._bind_param("action_hint", alert.get("action_hint")))
+        params.append(self._bind_param("engine_version", alert.get("engine_version")))
+
+        if todo:
+            params.extend([
+                self._bind_param("todo_user", todo["clerk_user_id"]),
+                self._bind_param("todo_job", todo.get("job_id")),
+                self._bind_param("todo_symbol", todo.get("symbol")),
+                self._bind_param("todo_domain", todo["domain"]),
+                self._bind_param("todo_title", todo["title"]),
+                self._bind_param("todo_description", todo["description"]),
+                self._bind_param("todo_rationale", todo.get("rationale")),
+                self._bind_param("todo_action_type", todo["action_type"]),
+                self._bind_param("todo_priority", todo["priority"]),
+                self._bind_param("todo_due_at", todo.get("due_at")),
+            ])
+
+        rows = self.db.query_raw(sql, params)
+        row = rows[0] if rows else {}
+
+        if not row.get("alert_id"):
+            self._log_dedup(alert)
+
+        return {"alert_id": row.get("alert_id"), "todo_id": row.get("todo_id")}
+
+    # -------------------------
+    # BATCH
+    # -------------------------
+
+    # (param suffix, row key, SQL cast) for multi-row VALUES clauses
+    _ALERT_BATCH_COLUMNS = [
+        ("id", "alert_id", "::uuid"),
+        ("user", "clerk_user_id", ""),
+        ("job", "job_id", "::uuid"),
+        ("symbol", "symbol", "::varchar"),
+        ("domain", "domain", ""),
+        ("category", "category", ""),
+        ("severity", "severity", ""),
+        ("title", "title", ""),
+        ("message", "message", ""),
+        ("rationale", "rationale", ""),
+        ("action_required", "action_required", "::boolean"),
+        ("confidence_score", "confidence_score", "::integer"),
+        ("action_hint", "action_hint", ""),
+        ("engine_version", "engine_version", "::varchar"),
+    ]
+
+    _TODO_BATCH_COLUMNS = [
+        ("user", "clerk_user_id", ""),
+        ("job", "job_id", "::uuid"),
+        ("symbol", "symbol", "::varchar"),
+        ("domain", "domain", ""),
+        ("title", "title", ""),
+        ("description", "description", ""),
+        ("rationale", "rationale", ""),
+        ("action_type", "action_type", ""),
+        ("priority", "priority", ""),
+        ("due_at", "due_at", "::timestamp"),
+        ("source_alert_id", "source_alert_id", "::uuid"),
+    ]
+
+    def insert_batch(self, alerts: List[Dict], todos: List[Dict]) -> Dict:
+        """
+        Persist many evaluated alerts and todos with ONE statement.
+
+        Dedup is enforced by the partial unique indexes (ON CONFLICT DO NOTHING).
+        Alert rows must carry a pre-generated alert_id. When alerts are written
+        in the same batch, a todo's source_alert_id is kept only if that alert
+        was actually inserted by this statement.
 
+        Returns {"alert_ids": set of inserted alert ids, "todo_ids": [...]}.
+        """
+        if not alerts and not todos:
+            return {"alert_ids": set(), "todo_ids": []}
+
+        params: List[Dict] = []
+        ctes = []
+        selects = []
+
+        if alerts:
+            ctes.append(f"""
+                new_alerts AS (
+                    INSERT INTO alerts (
+                        alert_id, clerk_user_id, job_id, symbol,
+                        domain, category, severity,
+                        title, message, rationale,
+                        action_required, confidence_score, action_hint,
+                        engine_version
+                    )
+                    VALUES {self._values_clause("a", alerts, self._ALERT_BATCH_COLUMNS, params)}
+                    ON CONFLICT DO NOTHING
+                    RETURNING alert_id
+                )
+            """)
+            selects.append("SELECT 'alert' AS kind, alert_id AS id FROM new_alerts")
+
+        if todos:
+            source = (
+                "(SELECT na.alert_id FROM new_alerts na WHERE na.alert_id = v.source_alert_id)"
+                if alerts else "v.source_alert_id"
+            )
+            ctes.append(f"""
+                new_todos AS (
+                    INSERT INTO todos (
+                        clerk_user_id, job_id, symbol,
+                        domain, title, description, rationale,
+                        action_type, priority, due_at, source_alert_id
+                    )
+                    SELECT
+                        v.clerk_user_id, v.job_id, v.symbol,
+                        v.domain, v.title, v.description, v.rationale,
+                        v.action_type, v.priority, v.due_at, {source}
+                    FROM (
+                        VALUES {self._values_clause("t", todos, self._TODO_BATCH_COLUMNS, params)}
+                    ) AS v (
+                        clerk_user_id, job_id, symbol,
+                        domain, title, description, rationale,
+                        action_type, priority, due_at, source_alert_id
+                    )
+                    ON CONFLICT DO NOTHING
+                    RETURNING todo_id
+                )
+            """)
+            selects.append("SELECT 'todo' AS kind, todo_id AS id FROM new_todos")
+
+        sql = "WITH " + ", ".join(ctes) + " " + " UNION ALL ".join(selects)
+        rows = self.db.query_raw(sql, params)
+
+        return {
+            "alert_ids": {str(r["id"]) for r in rows if r["kind"] == "alert"},
+            "todo_ids": [r["id"] for r in rows if r["kind"] == "todo"],
+        }
+
+    def _values_clause(self, prefix: str, rows: List[Dict], columns, params: List[Dict]) -> str:
+        tuples = []
+        for i, row in enumerate(rows):
+            placeholders = []
+            for suffix, key, cast in columns:
+                name = f"{prefix}{i}_{suffix}"
+                placeholders.append(f":{name}{cast}")
+                params.append(self._bind_param(name, row.get(key)))
+            tuples.append(f"({', '.join(placeholders)})")
+        return ", ".join(tuples)
 
     def insert_bulk(self, alerts: List[Dict]) -> None:
         for alert in alerts:
@@ -195,6 +379,15 @@ class AlertStore:
             rationale=alert.get("rationale")
         )
 
+    def _log_dedup(self, alert: Dict):
+        print(
+            f"[AlertStore] Deduped alert: "
+            f"user={alert['clerk_user_id']} "
+            f"type={alert['category']} "
+            f"domain={alert['domain']} "
+            f"symbol={alert.get('symbol')}"
+        )
+
     def _query_params(self, **kwargs):
         params = []
         for k, v in kwargs.items():
@@ -211,6 +404,12 @@ class AlertStore:
         if value is None:
             return {"name": name, "value": {"isNull": True}}
 
+        if isinstance(value, datetime):
+            # alerts/todos timestamps are 'timestamp without time zone' (UTC)
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return {"name": name, "value": {"stringValue": value.strftime("%Y-%m-%d %H:%M:%S")}}
+
         if isinstance(value, bool):
             return {"name": name, "value": {"booleanValue": value}}
 
@@ -228,14 +427,7 @@ class AlertStore:
         Apply decision-engine fields to an existing alert row.
         Only updates known columns; ignores anything extra in `updates`.
         """
-        allowed_keys = {
-            "severity",
-            "action_required",
-            "confidence_score",
-            "action_hint",
-            "rationale",
-            "status",
-        }
+        allowed_keys = set(self.INTEL_FIELDS) | {"status"}
 
         set_clauses = []
         params = []
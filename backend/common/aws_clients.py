@@ -0,0 +1,49 @@
+"""
+Process-wide AWS clients, created lazily and reused for the container's life.
+
+    sqs = get_client("sqs")
+    s3v = get_client("s3vectors", region_name="us-east-1")
+    bucket = vector_bucket_name()
+
+boto3 clients are thread-safe and expensive to build (credential chain,
+endpoint resolution, a fresh TLS connection pool), so a warm Lambda should
+build each one once. Clients are keyed by (service, region); the first
+caller's config wins.
+
+The account ID (one STS call) and the vector bucket name are resolved once
+as well. Set VECTOR_BUCKET to skip STS entirely.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import boto3
+
+_clients: Dict[Tuple[str, Optional[str]], object] = {}
+_lock = threading.Lock()
+_account_id: Optional[str] = None
+
+
+def get_client(service: str, region_name: Optional[str] = None, config=None):
+    key = (service, region_name)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = boto3.client(service, region_name=region_name, config=config)
+                _clients[key] = client
+    return client
+
+
+def get_account_id() -> str:
+    global _account_id
+    if _account_id is None:
+        _account_id = get_client("sts").get_caller_identity()["Account"]
+    return _account_id
+
+
+def vector_bucket_name() -> str:
+    """VECTOR_BUCKET, else the alex-vectors-{account_id} naming used by terraform."""
+    return os.getenv("VECTOR_BUCKET") or f"alex-vectors-{get_account_id()}"
@@ -0,0 +1,226 @@
+"""
+Shared embedding client with a content-addressed cache.
+
+One client replaces the per-module copies of `get_embedding` (ingest,
+search, cleanup, Reporter insights):
+
+    client = get_embedding_client()
+    vector = client.embed("market analysis SPY QQQ")
+    vectors = client.embed_many(chunks)
+
+Embeddings are keyed by sha256(namespace + text), where the namespace names
+the model (EMBEDDING_CACHE_NAMESPACE, default: the endpoint name) so a
+model change never serves stale vectors. Lookups go:
+
+  1. in-process LRU (per warm Lambda / container)
+  2. persistent S3 tier (EMBEDDING_CACHE_BUCKET, under embedding-cache/),
+     shared by every function; optional
+  3. the SageMaker endpoint, for the remaining misses only, in batches
+
+Repeated queries and re-ingests of unchanged text skip the endpoint.
+`client.metrics` counts hits per tier and endpoint calls/latency.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from common.aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "embedding-cache"
+
+
+def unwrap_embedding(result):
+    # HuggingFace returns nested arrays ([[[embedding]]] or [[embedding]]); unwrap to the vector
+    while isinstance(result, list) and len(result) > 0 and isinstance(result[0], list):
+        result = result[0]
+    return result
+
+
+@dataclass
+class EmbeddingMetrics:
+    texts: int = 0
+    lru_hits: int = 0
+    persistent_hits: int = 0
+    endpoint_calls: int = 0
+    endpoint_texts: int = 0
+    endpoint_seconds: float = 0.0
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+class EmbeddingClient:
+    def __init__(
+        self,
+        endpoint_name: Optional[str] = None,
+        region: Optional[str] = None,
+        cache_bucket: Optional[str] = None,
+        namespace: Optional[str] = None,
+        lru_size: int = 2048,
+        batch_size: Optional[int] = None,
+    ):
+        self.endpoint_name = endpoint_name or os.getenv("SAGEMAKER_ENDPOINT", "alex-embedding-endpoint")
+        self.region = region or os.getenv("DEFAULT_AWS_REGION") or None
+        self.cache_bucket = cache_bucket if cache_bucket is not None else os.getenv("EMBEDDING_CACHE_BUCKET")
+        self.namespace = namespace or os.getenv("EMBEDDING_CACHE_NAMESPACE", self.endpoint_name)
+        self.lru_size = lru_size
+        self.batch_size = batch_size or int(os.getenv("EMBED_BATCH_SIZE", "16"))  # texts per invoke_endpoint
+        self.metrics = EmbeddingMetrics()
+
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sagemaker = get_client("sagemaker-runtime", region_name=self.region)
+        self._s3 = get_client("s3", region_name=self.region) if self.cache_bucket else None
+
+    # ---------------------------------------
+    # Public API
+    # ---------------------------------------
+    def embed(self, text: str) -> List[float]:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings for texts, in order. Only cache misses reach the endpoint."""
+        keys = [self.cache_key(t) for t in texts]
+        found: Dict[str, List[float]] = {}
+        self.metrics.texts += len(texts)
+
+        # Tier 1: in-process LRU
+        for key in dict.fromkeys(keys):
+            vector = self._lru_get(key)
+            if vector is not None:
+                found[key] = vector
+                self.metrics.lru_hits += 1
+
+        # Tier 2: persistent S3 cache
+        missing = [k for k in dict.fromkeys(keys) if k not in found]
+        if missing and self._s3:
+            for key, vector in self._persistent_get_many(missing).items():
+                found[key] = vector
+                self._lru_put(key, vector)
+                self.metrics.persistent_hits += 1
+
+        # Tier 3: the endpoint, batched, one call per distinct missing text
+        missing_texts = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing_texts.setdefault(key, text)
+        if missing_texts:
+            computed = dict(zip(missing_texts, self._invoke(list(missing_texts.values()))))
+            for key, vector in computed.items():
+                found[key] = vector
+                self._lru_put(key, vector)
+            if self._s3:
+                self._persistent_put_many(computed)
+
+        return [found[k] for k in keys]
+
+    def cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\n{text.strip()}".encode("utf-8")).hexdigest()
+
+    def log_metrics(self, prefix: str = "[Embeddings]") -> None:
+        logger.info(f"{prefix} {json.dumps(self.metrics.as_dict())}")
+
+    # ---------------------------------------
+    # Endpoint
+    # ---------------------------------------
+    def _invoke(self, texts: List[str]) -> List[List[float]]:
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            began = time.perf_counter()
+            response = self._sagemaker.invoke_endpoint(
+                EndpointName=self.endpoint_name,
+                ContentType="application/json",
+                Body=json.dumps({"inputs": batch}),
+            )
+            result = json.loads(response["Body"].read().decode())
+            self.metrics.endpoint_calls += 1
+            self.metrics.endpoint_texts += len(batch)
+            self.metrics.endpoint_seconds += time.perf_counter() - began
+
+            # One input may come back unbatched; a batch is one entry per input
+            if len(batch) == 1:
+                embeddings.append(unwrap_embedding(result))
+                continue
+            if not isinstance(result, list) or len(result) != len(batch):
+                raise ValueError(f"Embedding endpoint returned an unexpected shape for {len(batch)} inputs")
+            embeddings.extend(unwrap_embedding(item) for item in result)
+        return embeddings
+
+    # ---------------------------------------
+    # LRU tier
+    # ---------------------------------------
+    def _lru_get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+            return vector
+
+    def _lru_put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    # ---------------------------------------
+    # Persistent tier (S3); failures only cost a cache miss
+    # ---------------------------------------
+    def _object_key(self, key: str) -> str:
+        return f"{CACHE_PREFIX}/{key[:2]}/{key}.json"
+
+    def _persistent_get(self, key: str) -> Optional[List[float]]:
+        try:
+            obj = self._s3.get_object(Bucket=self.cache_bucket, Key=self._object_key(key))
+            return json.loads(obj["Body"].read())
+        except self._s3.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            logger.warning(f"[Embeddings] persistent cache read failed: {e}")
+            return None
+
+    def _persistent_put(self, key: str, vector: List[float]) -> None:
+        try:
+            self._s3.put_object(
+                Bucket=self.cache_bucket,
+                Key=self._object_key(key),
+                Body=json.dumps(vector).encode("utf-8"),
+                ContentType="application/json",
+            )
+        except Exception as e:
+            logger.warning(f"[Embeddings] persistent cache write failed: {e}")
+
+    def _persistent_get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        with ThreadPoolExecutor(max_workers=min(8, len(keys))) as pool:
+            results = dict(zip(keys, pool.map(self._persistent_get, keys)))
+        return {k: v for k, v in results.items() if v is not None}
+
+    def _persistent_put_many(self, vectors: Dict[str, List[float]]) -> None:
+        with ThreadPoolExecutor(max_workers=min(8, len(vectors))) as pool:
+            list(pool.map(lambda item: self._persistent_put(*item), vectors.items()))
+
+
+_client: Optional[EmbeddingClient] = None
+_client_lock = threading.Lock()
+
+
+def get_embedding_client() -> EmbeddingClient:
+    """Process-wide client, so the LRU survives across warm invocations."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = EmbeddingClient()
+        return _client
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import os
 import json
+import hashlib
 import logging
 from agents import Agent, Runner
 from agents.extensions.models.litellm_model import LitellmModel
 
 from .events import DetectedEvent, EventSeverity
+from .event_cache_store import EventCacheStore
+from .keyword_scanner import KeywordScanner
 # from tenacity import retry, wait_exponential, stop_after_attempt
 
 logger = logging.getLogger(__name__)
@@ -61,6 +66,81 @@ TEXT:
 {input_text}
 """
 
+# Bump whenever EVENT_AGENT_PROMPT changes so cached detections are not reused
+EVENT_PROMPT_VERSION = "v1"
+
+
+# ============================
+# Detection cache
+# ============================
+# Keyed by (sha256(narrative), source, prompt version, model id). Holds the
+# parsed event payloads without user/job attribution: memory first, then the
+# event_detection_cache table, so Lambda retries and re-runs of an identical
+# narrative skip the LLM call.
+
+EVENT_CACHE_MAX_ENTRIES = int(os.getenv("EVENT_CACHE_MAX_ENTRIES", "256"))
+
+_EVENT_PAYLOAD_FIELDS = {
+    "event_type",
+    "severity",
+    "confidence",
+    "title",
+    "explanation",
+    "evidence",
+    "suggested_actions",
+}
+
+CacheKey = Tuple[str, str, str, str]
+
+_memory_cache: "OrderedDict[CacheKey, List[Dict]]" = OrderedDict()
+_cache_store: Optional[EventCacheStore] = None
+
+
+def _event_cache_key(narrative: str, source: str, model_id: str) -> CacheKey:
+    narrative_hash = hashlib.sha256((narrative or "").encode("utf-8")).hexdigest()
+    return (narrative_hash, source, EVENT_PROMPT_VERSION, model_id)
+
+
+def _remember(key: CacheKey, payloads: List[Dict]) -> None:
+    _memory_cache[key] = payloads
+    _memory_cache.move_to_end(key)
+    while len(_memory_cache) > EVENT_CACHE_MAX_ENTRIES:
+        _memory_cache.popitem(last=False)
+
+
+def _get_cache_store() -> EventCacheStore:
+    global _cache_store
+    if _cache_store is None:
+        _cache_store = EventCacheStore()
+    return _cache_store
+
+
+def _cache_get(key: CacheKey) -> Optional[List[Dict]]:
+    payloads = _memory_cache.get(key)
+    if payloads is not None:
+        _memory_cache.move_to_end(key)
+        return payloads
+
+    try:
+        payloads = _get_cache_store().get(*key)
+    except Exception as e:
+        # The cache is an optimisation; never fail detection because of it
+        logger.warning(f"[EventAgent] Cache lookup failed: {e}")
+        return None
+
+    if payloads is not None:
+        _remember(key, payloads)
+    return payloads
+
+
+def _cache_put(key: CacheKey, payloads: List[Dict]) -> None:
+    _remember(key, payloads)
+    try:
+        _get_cache_store().put(*key, payloads)
+    except Exception as e:
+        logger.warning(f"[EventAgent] Cache write failed: {e}")
+
+
 def _make_event(
     *,
     user_id: Optional[str],
@@ -88,6 +168,17 @@ def _make_event(
     )
 
 
+# event_type -> phrases for the rules-based detector
+NARRATIVE_EVENT_SIGNALS = {
+    "concentration_risk": ["concentration", "overweight"],
+    "elevated_volatility": ["high volatility", "elevated risk", "significant drawdown"],
+    "rebalance_recommended": ["rebalance", "rebalancing"],
+    "retirement_shortfall": ["shortfall", "not on track", "below target income"],
+}
+
+_narrative_scanner = KeywordScanner(NARRATIVE_EVENT_SIGNALS)
+
+
 def detect_events_from_narrative(
     *,
     user_id: Optional[str],
@@ -99,18 +190,19 @@ def detect_events_from_narrative(
     Foundation for the Event Intelligence Layer.
 
     CURRENTLY:
-      - Uses lightweight keyword/phrase heuristics.
+      - Uses lightweight keyword/phrase heuristics (one scan of the text).
       - Safe, deterministic, no AI calls.
+      - Evidence holds the matched snippets from the narrative.
 
     LATER:
       - Swap internals to call an Agent or Bedrock model
         that reads full context and emits DetectedEvent JSON.
     """
-    text = (narrative or "").lower()
+    scan = _narrative_scanner.scan(narrative)
     events: List[DetectedEvent] = []
 
     # --- Example: concentration risk ---
-    if "concentration" in text or "overweight" in text:
+    if scan.has("concentration_risk"):
         events.append(
             _make_event(
                 user_id=user_id,
@@ -124,9 +216,7 @@ def detect_events_from_narrative(
                     "The analysis suggests that a significant portion of the portfolio "
                     "may be concentrated in a small number of positions or themes."
                 ),
-                evidence=[
-                    "Narrative references concentration or materially overweight positions."
-                ],
+                evidence=scan.snippets("concentration_risk"),
                 suggested_actions=[
                     "Review top holdings and their weight versus your target allocation.",
                     "Consider rebalancing to reduce concentration risk.",
@@ -135,7 +225,7 @@ def detect_events_from_narrative(
         )
 
     # --- Example: volatility / risk language ---
-    if "high volatility" in text or "elevated risk" in text or "significant drawdown" in text:
+    if scan.has("elevated_volatility"):
         events.append(
             _make_event(
                 user_id=user_id,
@@ -148,9 +238,7 @@ def detect_events_from_narrative(
                 explanation=(
                     "The report calls out elevated volatility or risk in parts of your portfolio."
                 ),
-                evidence=[
-                    "Narrative references high volatility or elevated risk.",
-                ],
+                evidence=scan.snippets("elevated_volatility"),
                 suggested_actions=[
                     "Check your risk tolerance and investment horizon.",
                     "Consider diversifying into lower-volatility assets.",
@@ -159,7 +247,7 @@ def detect_events_from_narrative(
         )
 
     # --- Example: rebalance suggestion ---
-    if "rebalance" in text or "rebalancing" in text:
+    if scan.has("rebalance_recommended"):
         events.append(
             _make_event(
                 user_id=user_id,
@@ -172,7 +260,7 @@ def detect_events_from_narrative(
                 explanation=(
                     "The analysis explicitly suggests a portfolio rebalance to realign with targets."
                 ),
-                evidence=["Narrative mentions rebalance or rebalancing."],
+                evidence=scan.snippets("rebalance_recommended"),
                 suggested_actions=[
                     "Schedule a review of your current allocation vs target.",
                     "Execute a rebalance or discuss options with an advisor.",
@@ -181,7 +269,7 @@ def detect_events_from_narrative(
         )
 
     # --- Example: retirement shortfall (from retirement agent language) ---
-    if "shortfall" in text or "not on track" in text or "below target income" in text:
+    if scan.has("retirement_shortfall"):
         events.append(
             _make_event(
                 user_id=user_id,
@@ -195,9 +283,7 @@ def detect_events_from_narrative(
                     "The retirement analysis indicates that projected income may fall short "
                     "of your target retirement income."
                 ),
-                evidence=[
-                    "Narrative references shortfall, not on track, or income below target."
-                ],
+                evidence=scan.snippets("retirement_shortfall"),
                 suggested_actions=[
                     "Review your contribution rate and time horizon.",
                     "Consider increasing savings or adjusting retirement goals.",
@@ -230,13 +316,25 @@ async def detect_events_via_llm(
         if not model_id:
             raise RuntimeError("BEDROCK_MODEL_ID is not set")
 
+        # ---------------------------------------------------------
+        # 2. Cached detection for this exact narrative?
+        # ---------------------------------------------------------
+        cache_key = _event_cache_key(narrative, source, model_id)
+        cached = await asyncio.to_thread(_cache_get, cache_key)
+        if cached is not None:
+            logger.info(f"[EventAgent] Cache hit: {len(cached)} event(s), source={source}")
+            return [
+                DetectedEvent(**payload, source=source, job_id=job_id, user_id=user_id)
+                for payload in cached
+            ]
+
         os.environ["AWS_REGION_NAME"] = bedrock_region
         logger.info(f"[EventAgent] Using Bedrock model={model_id}, region={bedrock_region}")
 
         model = LitellmModel(model=f"bedrock/{model_id}")
 
         # ---------------------------------------------------------
-        # 2. Build agent
+        # 3. Build agent
         # ---------------------------------------------------------
         agent = Agent(
             name="Event Intelligence Agent",
@@ -246,12 +344,12 @@ async def detect_events_via_llm(
         )
 
         # ---------------------------------------------------------
-        # 3. Prepare LLM task
+        # 4. Prepare LLM task
         # ---------------------------------------------------------
         task = EVENT_AGENT_PROMPT.format(input_text=narrative)
 
         # ---------------------------------------------------------
-        # 4. Run Agent synchronously (bridges already in async loop)
+        # 5. Run Agent synchronously (bridges already in async loop)
         # ---------------------------------------------------------
         result = await Runner.run(agent, input=task)
 
@@ -268,7 +366,7 @@ async def detect_events_via_llm(
             raise ValueError("EventAgent output must be a JSON array")
 
         # ---------------------------------------------------------
-        # 5. Convert JSON → DetectedEvent objects
+        # 6. Convert JSON → DetectedEvent objects
         # ---------------------------------------------------------
         
         events = []
@@ -295,6 +393,10 @@ async def detect_events_via_llm(
             except Exception as e:
                 logger.warning(f"[EventAgent] Skipping malformed event: {e} | item={item}")
 
+        await asyncio.to_thread(
+            _cache_put, cache_key, [e.model_dump(include=_EVENT_PAYLOAD_FIELDS) for e in events]
+        )
+
         return events
 
     except Exception as e:
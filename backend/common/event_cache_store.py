@@ -0,0 +1,56 @@
+from src.models import Database
+from typing import List, Dict, Optional
+import json
+
+
+class EventCacheStore:
+    """
+    Persistent tier of the event-detection cache.
+
+    Rows are content-addressed by (narrative_hash, source, prompt_version, model_id)
+    and hold the parsed event payloads WITHOUT user/job attribution, so an
+    identical narrative re-uses the same detection.
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        # Pass a shared Database to avoid building a new Data API client per store
+        self.db = db or Database()
+
+    def get(self, narrative_hash: str, source: str, prompt_version: str, model_id: str) -> Optional[List[Dict]]:
+        rows = self.db.query_raw(
+            """
+            SELECT events::text AS events
+            FROM event_detection_cache
+            WHERE narrative_hash = :narrative_hash
+                AND source = :source
+                AND prompt_version = :prompt_version
+                AND model_id = :model_id
+            """,
+            self._key_params(narrative_hash, source, prompt_version, model_id),
+        )
+        return json.loads(rows[0]["events"]) if rows else None
+
+    def put(self, narrative_hash: str, source: str, prompt_version: str, model_id: str, events: List[Dict]) -> None:
+        params = self._key_params(narrative_hash, source, prompt_version, model_id)
+        params.append({"name": "events", "value": {"stringValue": json.dumps(events)}})
+
+        self.db.query_raw(
+            """
+            INSERT INTO event_detection_cache (
+                narrative_hash, source, prompt_version, model_id, events
+            )
+            VALUES (
+                :narrative_hash, :source, :prompt_version, :model_id, :events::jsonb
+            )
+            ON CONFLICT (narrative_hash, source, prompt_version, model_id) DO NOTHING
+            """,
+            params,
+        )
+
+    def _key_params(self, narrative_hash: str, source: str, prompt_version: str, model_id: str):
+        return [
+            {"name": "narrative_hash", "value": {"stringValue": narrative_hash}},
+            {"name": "source", "value": {"stringValue": source}},
+            {"name": "prompt_version", "value": {"stringValue": prompt_version}},
+            {"name": "model_id", "value": {"stringValue": model_id}},
+        ]
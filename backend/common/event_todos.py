@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Optional
 from datetime import datetime, timezone
 import logging
 
@@ -60,37 +60,23 @@ EVENT_TYPE_ALIASES = {
 }
 
 
-def maybe_create_todo_from_event(event: DetectedEvent):
+def todo_spec_from_event(event: DetectedEvent) -> Optional[TodoSpec]:
     """
-    Turn a DetectedEvent into a Todo using policy mapping.
-    Deduplicates on (user, symbol, open/in_progress).
+    Map a DetectedEvent to a TodoSpec using the policy mapping.
+    Returns None when no automation rule applies.
     """
 
-    # mapping = EVENT_TODO_MAP.get(event.event_type)
     canonical = EVENT_TYPE_ALIASES.get(event.event_type, event.event_type)
     mapping = EVENT_TODO_MAP.get(canonical)
     logger.info(f"[TodoMapper] event={event.event_type}, canonical={canonical}")
 
     if not mapping:
-        return  # no automation rule
+        return None  # no automation rule
 
     if not event.user_id:
-        return  # safety: no user
-
-    store = TodoStore()
-
-    # ✅ de-dup: do not create another open todo for same user+symbol
-    existing = store.list_open_for_user_and_symbol(
-        clerk_user_id=event.user_id,
-        job_id=event.job_id,
-        symbol=None,  # Event-level action (not per symbol)
-    )
-
-    if existing:
-        return  # ✅ already has open todo for this type of issue
+        return None  # safety: no user
 
-    # ✅ build TodoSpec (uses your real model)
-    todo = TodoSpec(
+    return TodoSpec(
         clerk_user_id=event.user_id,
         job_id=event.job_id,
         domain=mapping["domain"],
@@ -98,10 +84,25 @@ def maybe_create_todo_from_event(event: DetectedEvent):
         description=mapping["description"],
         action_type=mapping["action_type"],
         priority=mapping["priority"],
-        symbol=None,
+        symbol=None,  # Event-level action (not per symbol)
         rationale=f"Generated from event '{event.event_type}'",
         due_at=None,
         source_alert_id=None,  # we can add later once alert_id is returned
     )
 
-    store.insert_todo(todo.__dict__)
+
+def maybe_create_todo_from_event(event: DetectedEvent):
+    """
+    Turn a DetectedEvent into a Todo using policy mapping.
+    Deduplicates on (user, action_type, symbol) via uq_todos_open_dedup.
+
+    Producers emitting several events should pass todo_spec_from_event()
+    results to alert_service.emit_alerts instead.
+    """
+
+    todo = todo_spec_from_event(event)
+    if not todo:
+        return
+
+    # ✅ de-dup happens in the INSERT (ON CONFLICT DO NOTHING)
+    TodoStore().insert_todo(todo.__dict__)
@@ -1,17 +1,33 @@
 from __future__ import annotations
-from typing import List, Dict, Optional
+import logging
+from typing import Callable, List, Dict, Optional
 
 from database.src.models import Database   # ⬅️ Matches refresher codebase pattern
+from common.research_completion import notify_research_settled
+
+logger = logging.getLogger(__name__)
+
+SettledHook = Callable[[str, Dict], None]
 
 
 class JobTracker:
     """
     Uses the existing Database() abstraction,
     consistent with refresher and other backend modules.
+
+    A job is "settled" once every symbol is done or failed. The transition
+    that settles it calls `on_settled(job_id, state)` exactly once (by
+    default: push the Reporter continuation, see common.research_completion).
     """
 
-    def __init__(self) -> None:
-        self.db = Database()
+    def __init__(
+        self,
+        db: Optional[Database] = None,
+        on_settled: Optional[SettledHook] = notify_research_settled,
+    ) -> None:
+        # Pass a shared Database to avoid building a new Data API client per tracker
+        self.db = db or Database()
+        self.on_settled = on_settled
 
     # ---------------------------------------
     # Initialize tracker rows for a job (existing jobs.id)
@@ -34,7 +50,7 @@ class JobTracker:
             """,
             [
                 {"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"},
-                {"name": "symbol_count", "value": {"longValue": len(symbols)}},
+                {"name": "symbol_count", "value": {"longValue": len(unique_symbols)}},
             ]
         )
 
@@ -55,82 +71,241 @@ class JobTracker:
     # ---------------------------------------
     # Status updates
     # ---------------------------------------
-    def mark_symbol_running(self, job_id: str, symbol: str) -> None:
-        self.db.query_raw(
+    def mark_symbol_running(self, job_id: str, symbol: str) -> Optional[Dict]:
+        """
+        Move a symbol to running (done items are left alone, so a duplicate
+        delivery cannot be counted twice). Retrying a failed symbol takes it
+        back out of symbols_failed.
+
+        Picking up an item that is already running or failed is a retry (a
+        redelivery after a timeout or error) and bumps retry_count.
+        """
+        rows = self.db.query_raw(
             """
-            UPDATE job_tracker_items
-            SET status='running', last_updated=NOW()
-            WHERE job_id=:job_id AND symbol=:symbol
+            WITH item AS (
+                UPDATE job_tracker_items i
+                SET status='running',
+                    retry_count = i.retry_count + CASE
+                        WHEN prev.old_status IN ('running', 'error') THEN 1 ELSE 0
+                    END,
+                    last_updated=NOW()
+                FROM (
+                    SELECT status FROM job_tracker_items
+                    WHERE job_id=:job_id AND symbol=:symbol
+                    FOR UPDATE
+                ) AS prev (old_status)
+                WHERE i.job_id=:job_id AND i.symbol=:symbol AND prev.old_status != 'done'
+                RETURNING prev.old_status
+            ),
+            delta AS (
+                SELECT COUNT(*) FILTER (WHERE old_status = 'error')::int AS retried FROM item
+            )
+            UPDATE job_tracker t
+            SET symbols_failed = t.symbols_failed - delta.retried,
+                status = CASE
+                    WHEN t.status = 'pending' THEN 'running'
+                    WHEN t.status = 'error' AND t.symbols_failed - delta.retried = 0 THEN 'running'
+                    ELSE t.status
+                END,
+                completed_at = CASE WHEN delta.retried > 0 THEN NULL ELSE t.completed_at END
+            FROM delta
+            WHERE t.job_id=:job_id
+            RETURNING t.job_id, t.status, t.symbol_count, t.symbols_done, t.symbols_failed, t.completed_at
             """,
             [
                 {"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"},
                 {"name": "symbol", "value": {"stringValue": symbol}},
             ]
         )
+        return rows[0] if rows else None
 
-        self.db.query_raw(
-            """
-            UPDATE job_tracker
-            SET status='running'
-            WHERE job_id=:job_id AND status='pending'
-            """,
-            [{"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"}]
-        )
+    def mark_symbol_done(self, job_id: str, symbol: str) -> Optional[Dict]:
+        """
+        Atomically mark one symbol done and advance the job, in ONE statement.
 
-    def mark_symbol_done(self, job_id: str, symbol: str) -> None:
-        self.db.query_raw(
+        The item only changes if it was not already done, so duplicate or
+        concurrent deliveries never double count. symbols_done is bumped by
+        the number of items that actually changed, and the job flips to
+        done once the count reaches symbol_count.
+
+        Returns the new job state plus:
+          - changed: this call moved the item to done
+          - just_completed: this call completed the job (true for exactly one caller)
+          - just_settled: this call settled the job (every symbol done or failed)
+        """
+        rows = self.db.query_raw(
             """
-            UPDATE job_tracker_items
-            SET status='done', last_updated=NOW()
-            WHERE job_id=:job_id AND symbol=:symbol 
+            WITH item AS (
+                UPDATE job_tracker_items i
+                SET status='done', error_message=NULL, last_updated=NOW()
+                FROM (
+                    SELECT status FROM job_tracker_items
+                    WHERE job_id=:job_id AND symbol=:symbol
+                    FOR UPDATE
+                ) AS prev (old_status)
+                WHERE i.job_id=:job_id AND i.symbol=:symbol AND prev.old_status != 'done'
+                RETURNING prev.old_status
+            ),
+            delta AS (
+                SELECT COUNT(*)::int AS n,
+                       COUNT(*) FILTER (WHERE old_status = 'error')::int AS recovered
+                FROM item
+            )
+            UPDATE job_tracker t
+            SET symbols_done = t.symbols_done + delta.n,
+                symbols_failed = t.symbols_failed - delta.recovered,
+                status = CASE
+                    WHEN t.symbols_done + delta.n >= t.symbol_count THEN 'done'
+                    WHEN t.symbols_failed - delta.recovered > 0 THEN 'error'
+                    WHEN delta.n > 0 THEN 'running'
+                    ELSE t.status
+                END,
+                completed_at = CASE
+                    WHEN t.completed_at IS NULL
+                         AND t.symbols_done + delta.n + t.symbols_failed - delta.recovered >= t.symbol_count
+                    THEN NOW()
+                    ELSE t.completed_at
+                END
+            FROM delta
+            WHERE t.job_id=:job_id
+            RETURNING t.job_id, t.status, t.symbol_count, t.symbols_done, t.symbols_failed, t.completed_at,
+                      delta.n > 0 AS changed,
+                      (delta.n > 0
+                       AND t.symbols_done >= t.symbol_count
+                       AND t.symbols_done - delta.n < t.symbol_count) AS just_completed,
+                      (delta.n - delta.recovered > 0
+                       AND t.symbols_done + t.symbols_failed >= t.symbol_count
+                       AND t.symbols_done + t.symbols_failed - (delta.n - delta.recovered) < t.symbol_count) AS just_settled
             """,
             [
                 {"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"},
                 {"name": "symbol", "value": {"stringValue": symbol}},
             ]
         )
+        return self._after_transition(job_id, rows)
 
-        self.db.query_raw(
+    def mark_symbol_error(self, job_id: str, symbol: str, error: str) -> Optional[Dict]:
+        """
+        Atomically record a symbol failure and flag the job, in ONE statement.
+
+        Done items are never downgraded, and the job is only flagged when
+        the item actually moved to error. A failure still settles its
+        symbol, so the job can settle with partial research. Returns the
+        new job state plus `changed` and `just_settled`.
+        """
+        rows = self.db.query_raw(
             """
-            UPDATE job_tracker
-            SET symbols_done = symbols_done + 1
-            WHERE job_id=:job_id
+            WITH item AS (
+                UPDATE job_tracker_items i
+                SET status='error', error_message=:err, last_updated=NOW()
+                FROM (
+                    SELECT status FROM job_tracker_items
+                    WHERE job_id=:job_id AND symbol=:symbol
+                    FOR UPDATE
+                ) AS prev (old_status)
+                WHERE i.job_id=:job_id AND i.symbol=:symbol AND prev.old_status NOT IN ('done', 'error')
+                RETURNING prev.old_status
+            ),
+            delta AS (
+                SELECT COUNT(*)::int AS n FROM item
+            )
+            UPDATE job_tracker t
+            SET symbols_failed = t.symbols_failed + delta.n,
+                status = CASE WHEN delta.n > 0 THEN 'error' ELSE t.status END,
+                completed_at = CASE
+                    WHEN t.completed_at IS NULL
+                         AND t.symbols_done + t.symbols_failed + delta.n >= t.symbol_count
+                    THEN NOW()
+                    ELSE t.completed_at
+                END
+            FROM delta
+            WHERE t.job_id=:job_id
+            RETURNING t.job_id, t.status, t.symbol_count, t.symbols_done, t.symbols_failed, t.completed_at,
+                      delta.n > 0 AS changed,
+                      (delta.n > 0
+                       AND t.symbols_done + t.symbols_failed >= t.symbol_count
+                       AND t.symbols_done + t.symbols_failed - delta.n < t.symbol_count) AS just_settled
             """,
-            [{"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"}]
+            [
+                {"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"},
+                {"name": "symbol", "value": {"stringValue": symbol}},
+                {"name": "err", "value": {"stringValue": error[:1000]}},
+            ]
         )
+        return self._after_transition(job_id, rows)
+
+    def mark_symbol_waiting(self, job_id: str, symbol: str) -> None:
+        """
+        Park a pending symbol on in-flight research of the same symbol (see
+        SymbolResearchStore). It is settled by release_waiters when that run
+        finishes, without a Researcher call of its own.
 
-        # mark job done when all symbols done
+        Park BEFORE claiming: a run that finishes after this update is
+        guaranteed to see the item in release_waiters. Parking after an
+        "inflight" claim could miss a run finishing in between.
+        """
         self.db.query_raw(
             """
-            UPDATE job_tracker
-            SET status='done', completed_at=NOW()
-            WHERE job_id=:job_id AND symbols_done >= symbol_count
+            UPDATE job_tracker_items
+            SET status='waiting', last_updated=NOW()
+            WHERE job_id=:job_id AND symbol=:symbol AND status='pending'
             """,
-            [{"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"}]
+            [
+                {"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"},
+                {"name": "symbol", "value": {"stringValue": symbol}},
+            ]
         )
 
-    def mark_symbol_error(self, job_id: str, symbol: str, error: str) -> None:
-        self.db.query_raw(
+    def mark_symbol_pending(self, job_id: str, symbol: str) -> bool:
+        """
+        Un-park a waiting symbol this job will research itself. False if it
+        is no longer waiting (a finishing run already settled it).
+        """
+        rows = self.db.query_raw(
             """
             UPDATE job_tracker_items
-            SET status='error', error_message=:err, last_updated=NOW()
-            WHERE job_id=:job_id AND symbol=:symbol
+            SET status='pending', last_updated=NOW()
+            WHERE job_id=:job_id AND symbol=:symbol AND status='waiting'
+            RETURNING symbol
             """,
             [
                 {"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"},
                 {"name": "symbol", "value": {"stringValue": symbol}},
-                {"name": "err", "value": {"stringValue": error[:1000]}},
             ]
         )
+        return bool(rows)
 
-        self.db.query_raw(
+    def release_waiters(self, symbol: str, error: Optional[str] = None) -> List[str]:
+        """
+        Settle every job waiting on a symbol: done, or failed with `error`.
+        Each job goes through the normal transition, so on_settled still
+        fires for the job this settles. Returns the released job ids.
+        """
+        rows = self.db.query_raw(
             """
-            UPDATE job_tracker
-            SET status='error'
-            WHERE job_id=:job_id AND status!='error'
+            SELECT job_id::text AS job_id
+            FROM job_tracker_items
+            WHERE symbol=:symbol AND status='waiting'
             """,
-            [{"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"}]
+            [{"name": "symbol", "value": {"stringValue": symbol}}]
         )
+        job_ids = [r["job_id"] for r in rows]
+        for job_id in job_ids:
+            if error is None:
+                self.mark_symbol_done(job_id, symbol)
+            else:
+                self.mark_symbol_error(job_id, symbol, error)
+        return job_ids
+
+    def _after_transition(self, job_id: str, rows: List[Dict]) -> Optional[Dict]:
+        state = rows[0] if rows else None
+        if state and state.get("just_settled") and self.on_settled:
+            try:
+                self.on_settled(job_id, state)
+            except Exception as e:
+                # Never fail the symbol transition because the notification failed
+                logger.error(f"[JobTracker] on_settled failed for job {job_id}: {e}")
+        return state
 
     # ---------------------------------------
     # Reads
@@ -138,7 +313,7 @@ class JobTracker:
     def get_job_status(self, job_id: str) -> Optional[Dict]:
         rows = self.db.query_raw(
             """
-            SELECT job_id, status, symbol_count, symbols_done,
+            SELECT job_id, status, symbol_count, symbols_done, symbols_failed,
                    created_at, completed_at
             FROM job_tracker
             WHERE job_id=:job_id
@@ -164,6 +339,22 @@ class JobTracker:
         job["items"] = items
         return job
 
+    def find_stale_items(self, max_age_seconds: int) -> List[Dict]:
+        """
+        Unsettled items (pending, running or waiting) that have not moved
+        for max_age_seconds: their push-based settlement was lost.
+        """
+        return self.db.query_raw(
+            """
+            SELECT job_id::text AS job_id, symbol, status
+            FROM job_tracker_items
+            WHERE status IN ('pending', 'running', 'waiting')
+                AND last_updated < NOW() - make_interval(secs => :max_age)
+            ORDER BY last_updated
+            """,
+            [{"name": "max_age", "value": {"longValue": max_age_seconds}}]
+        )
+
     def is_job_complete(self, job_id: str) -> bool:
         row = self.db.query_raw(
             """
@@ -0,0 +1,123 @@
+"""
+Single-pass multi-pattern keyword scanner for narrative fact extraction.
+
+A registry maps each signal to the phrases that indicate it:
+
+    scanner = KeywordScanner({
+        "rebalance": ["rebalance", "rebalancing"],
+        "risk": ["volatility", "risk"],
+    })
+    result = scanner.scan(narrative)
+    if result.has("rebalance"):
+        evidence = result.snippets("rebalance")
+
+All phrases are compiled into ONE case-insensitive regex and the text is
+scanned once. Matching keeps the semantics of the `phrase in text.lower()`
+checks it replaces: every occurrence of every phrase is found, including
+overlapping ones (e.g. "risk" inside "elevated risk").
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Set, Tuple
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    signal: str
+    phrase: str
+    start: int
+    end: int
+
+
+class ScanResult:
+    """All hits for one text, grouped by signal, with snippet extraction."""
+
+    def __init__(self, text: str, hits: List[KeywordHit]):
+        self.text = text
+        self.hits = hits
+        self._by_signal: Dict[str, List[KeywordHit]] = {}
+        for hit in hits:
+            self._by_signal.setdefault(hit.signal, []).append(hit)
+
+    @property
+    def signals(self) -> Set[str]:
+        return set(self._by_signal)
+
+    def has(self, *signals: str) -> bool:
+        """True if ANY of the given signals was hit."""
+        return any(s in self._by_signal for s in signals)
+
+    def hits_for(self, signal: str) -> List[KeywordHit]:
+        return self._by_signal.get(signal, [])
+
+    def phrases(self, signal: str) -> List[str]:
+        """Distinct matched phrases for a signal, in order of first appearance."""
+        return list(dict.fromkeys(h.phrase for h in self.hits_for(signal)))
+
+    def snippets(self, signal: str, context: int = 60, limit: int = 3) -> List[str]:
+        """
+        Matched text with surrounding context for evidence, one per distinct
+        phrase (first occurrence), whitespace collapsed.
+        """
+        snippets: List[str] = []
+        seen: Set[str] = set()
+        for hit in self.hits_for(signal):
+            if hit.phrase in seen:
+                continue
+            seen.add(hit.phrase)
+
+            start = max(0, hit.start - context)
+            end = min(len(self.text), hit.end + context)
+            snippet = " ".join(self.text[start:end].split())
+            if start > 0:
+                snippet = "…" + snippet
+            if end < len(self.text):
+                snippet += "…"
+            snippets.append(snippet)
+
+            if len(snippets) >= limit:
+                break
+        return snippets
+
+
+class KeywordScanner:
+    def __init__(self, registry: Mapping[str, Sequence[str]]):
+        # phrase (lowercase) -> signals it directly indicates
+        direct: Dict[str, List[str]] = {}
+        for signal, phrases in registry.items():
+            for phrase in phrases:
+                signals = direct.setdefault(phrase.lower(), [])
+                if signal not in signals:
+                    signals.append(signal)
+
+        # A match of "elevated risk" at some position is also a match of the
+        # registered prefix "elevated" there; the lookahead below only reports
+        # the longest phrase per position, so fold prefix signals in up front.
+        self._signals: Dict[str, List[Tuple[str, str]]] = {}
+        for phrase in direct:
+            pairs = []
+            for other, signals in direct.items():
+                if phrase.startswith(other):
+                    pairs.extend((s, other) for s in signals)
+            self._signals[phrase] = pairs
+
+        alternation = "|".join(
+            re.escape(p) for p in sorted(direct, key=len, reverse=True)
+        )
+        # Zero-width lookahead so overlapping occurrences are all reported
+        self._pattern = re.compile(f"(?=({alternation}))", re.IGNORECASE) if direct else None
+
+    def scan(self, text: str) -> ScanResult:
+        text = text or ""
+        hits: List[KeywordHit] = []
+        if self._pattern is not None:
+            for m in self._pattern.finditer(text):
+                matched = m.group(1).lower()
+                start = m.start(1)
+                for signal, phrase in self._signals[matched]:
+                    hits.append(KeywordHit(signal, phrase, start, start + len(phrase)))
+        return ScanResult(text, hits)
+
@@ -0,0 +1,440 @@
+"""
+Local stand-in for the S3 Vectors service, for tests and benchmarks.
+
+Implements the subset of the boto3 `s3vectors` client the code base uses,
+with the same arguments and response shapes:
+
+    put_vectors / get_vectors / query_vectors / delete_vectors / list_vectors
+
+Selected with VECTOR_STORE=local (see common.vector_store), so ingest,
+search and the Reporter's insights run offline unchanged.
+
+- NumPy-backed: one float32 matrix per (bucket, index). Queries are a
+  brute-force cosine scan, or an HNSW graph when hnswlib is installed and
+  use_hnsw=True.
+- Metadata filters use the S3 Vectors operators: $eq, $ne, $gt, $gte, $lt,
+  $lte, $in, $nin, $exists, $and, $or; a bare value means $eq.
+- Persistence: with a path, writes stay in memory until save() (or
+  close(), leaving a `with` block, or interpreter exit). Each index is
+  saved as <bucket>/<index>.npy plus its L2-normalised copy (.unit.npy)
+  and .json for keys and metadata, and reopened with both matrices
+  memory-mapped, so a brute-force index loads without reading every
+  vector up front (an HNSW graph is rebuilt on load, which does).
+
+Deletes leave tombstones; the matrix is compacted once a quarter of the
+rows are dead.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import hnswlib  # optional: approximate search for large indexes
+except ImportError:  # pragma: no cover - depends on the environment
+    hnswlib = None
+
+
+# HNSW search breadth: higher trades query time for recall
+HNSW_EF = int(os.getenv("LOCAL_VECTOR_HNSW_EF", "128"))
+
+
+# ---------------------------------------
+# Metadata filters
+# ---------------------------------------
+def _compare(op: str, actual: Any, expected: Any) -> bool:
+    if op == "$exists":
+        return (actual is not None) == bool(expected)
+    if actual is None:
+        return op in ("$ne", "$nin")
+    if op == "$eq":
+        return actual == expected
+    if op == "$ne":
+        return actual != expected
+    if op == "$in":
+        return actual in expected
+    if op == "$nin":
+        return actual not in expected
+    try:
+        if op == "$gt":
+            return actual > expected
+        if op == "$gte":
+            return actual >= expected
+        if op == "$lt":
+            return actual < expected
+        if op == "$lte":
+            return actual <= expected
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def matches_filter(metadata: Dict[str, Any], flt: Optional[Dict[str, Any]]) -> bool:
+    if not flt:
+        return True
+    for field, condition in flt.items():
+        if field == "$and":
+            if not all(matches_filter(metadata, sub) for sub in condition):
+                return False
+        elif field == "$or":
+            if not any(matches_filter(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            actual = metadata.get(field)
+            if not all(_compare(op, actual, expected) for op, expected in condition.items()):
+                return False
+        elif metadata.get(field) != condition:
+            return False
+    return True
+
+
+# ---------------------------------------
+# One index
+# ---------------------------------------
+class _Index:
+    def __init__(self, dimension: Optional[int] = None, use_hnsw: bool = False):
+        self.dimension = dimension
+        self.use_hnsw = use_hnsw and hnswlib is not None
+        self.keys: List[Optional[str]] = []
+        self.metadata: List[Optional[Dict[str, Any]]] = []
+        self.rows: Dict[str, int] = {}
+        self.vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self.unit = np.zeros((0, dimension or 0), dtype=np.float32)  # L2-normalised copy for cosine
+        self.alive = np.zeros(0, dtype=bool)
+        self._hnsw = None
+        self._filter_masks: Dict[str, np.ndarray] = {}  # filter -> row mask, until the next write
+
+    @property
+    def count(self) -> int:
+        return len(self.rows)
+
+    def _writable(self) -> None:
+        # Memory-mapped arrays are read-only; copy on first write
+        if not self.vectors.flags.writeable:
+            self.vectors = np.array(self.vectors)
+            self.unit = np.array(self.unit)
+
+    def _grow(self, extra: int) -> None:
+        needed = len(self.keys) + extra
+        if needed <= self.vectors.shape[0]:
+            return
+        capacity = max(needed, 2 * self.vectors.shape[0], 64)
+        for name in ("vectors", "unit"):
+            grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+            current = getattr(self, name)
+            grown[:current.shape[0]] = current
+            setattr(self, name, grown)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.alive.shape[0]] = self.alive
+        self.alive = alive
+
+    def put(self, items: List[Dict[str, Any]]) -> None:
+        data = np.asarray([item["data"]["float32"] for item in items], dtype=np.float32)
+        if self.dimension is None:
+            self.dimension = data.shape[1]
+            self.vectors = np.zeros((0, self.dimension), dtype=np.float32)
+            self.unit = np.zeros((0, self.dimension), dtype=np.float32)
+        if data.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension {data.shape[1]} does not match index dimension {self.dimension}")
+
+        norms = np.linalg.norm(data, axis=1, keepdims=True)
+        unit = data / np.where(norms == 0, 1, norms)
+
+        self._writable()
+        self._grow(len(items))
+        self._filter_masks.clear()
+        new_rows = []
+        for item, vector, unit_vector in zip(items, data, unit):
+            key = item["key"]
+            row = self.rows.get(key)
+            if row is None:
+                # Upsert: a new key appends, an existing key is overwritten in place
+                row = len(self.keys)
+                self.keys.append(key)
+                self.metadata.append(None)
+                self.rows[key] = row
+            self.vectors[row] = vector
+            self.unit[row] = unit_vector
+            self.metadata[row] = dict(item.get("metadata") or {})
+            self.alive[row] = True
+            new_rows.append(row)
+
+        if self.use_hnsw:
+            self._hnsw_add(new_rows)
+
+    def delete(self, keys: List[str]) -> None:
+        self._filter_masks.clear()
+        for key in keys:
+            row = self.rows.pop(key, None)
+            if row is None:
+                continue
+            self.alive[row] = False
+            self.keys[row] = None
+            self.metadata[row] = None
+            if self._hnsw is not None:
+                self._hnsw.mark_deleted(row)
+        if len(self.keys) >= 64 and self.count < 0.75 * len(self.keys):
+            self.compact()
+
+    def compact(self) -> None:
+        self._filter_masks.clear()
+        live = [row for row in range(len(self.keys)) if self.alive[row]]
+        self.vectors = np.array(self.vectors[live])
+        self.unit = np.array(self.unit[live])
+        self.keys = [self.keys[row] for row in live]
+        self.metadata = [self.metadata[row] for row in live]
+        self.alive = np.ones(len(live), dtype=bool)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        if self.use_hnsw:
+            self._hnsw = None
+            self._hnsw_add(list(range(len(self.keys))))
+
+    def _hnsw_add(self, rows: List[int]) -> None:
+        if not rows:
+            return
+        if self._hnsw is None:
+            self._hnsw = hnswlib.Index(space="cosine", dim=self.dimension)
+            self._hnsw.init_index(max_elements=max(1024, 2 * len(self.keys)), ef_construction=200, M=16)
+            self._hnsw.set_ef(HNSW_EF)
+        needed = len(self.keys)
+        if needed > self._hnsw.get_max_elements():
+            self._hnsw.resize_index(2 * needed)
+        self._hnsw.add_items(self.unit[rows], np.asarray(rows))
+
+    def query(self, vector: List[float], top_k: int, flt: Optional[Dict[str, Any]]):
+        """[(row, cosine_distance)] for the top_k nearest live rows passing the filter."""
+        if self.count == 0:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+
+        n = len(self.keys)
+        mask = self.alive[:n].copy()
+        if flt:
+            mask &= self._filter_mask(flt)
+        candidates = int(mask.sum())
+        if candidates == 0:
+            return []
+        k = min(top_k, candidates)
+
+        if self._hnsw is not None:
+            try:
+                labels, distances = self._hnsw.knn_query(q, k=k, filter=lambda label: bool(mask[label]))
+                return [(int(row), float(d)) for row, d in zip(labels[0], distances[0])]
+            except RuntimeError:
+                pass  # a selective filter can leave the graph short of k results; scan instead
+
+        rows = np.flatnonzero(mask)
+        scores = self.unit[rows] @ q
+        if k < len(rows):
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best])]
+        return [(int(rows[i]), float(1.0 - scores[i])) for i in best]
+
+    def _filter_mask(self, flt: Dict[str, Any]) -> np.ndarray:
+        # Repeated filters (e.g. one per symbol) skip the metadata scan
+        ident = json.dumps(flt, sort_keys=True, default=str)
+        mask = self._filter_masks.get(ident)
+        if mask is None:
+            mask = np.fromiter(
+                (m is not None and matches_filter(m, flt) for m in self.metadata), dtype=bool, count=len(self.keys)
+            )
+            self._filter_masks[ident] = mask
+        return mask
+
+    def record(self, row: int, return_data: bool, return_metadata: bool) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"key": self.keys[row]}
+        if return_data:
+            out["data"] = {"float32": self.vectors[row].tolist()}
+        if return_metadata:
+            out["metadata"] = dict(self.metadata[row] or {})
+        return out
+
+    def live_rows(self) -> List[int]:
+        return [row for row in range(len(self.keys)) if self.alive[row]]
+
+    # ---------------------------------------
+    # Persistence
+    # ---------------------------------------
+    def save(self, base: str) -> None:
+        live = self.live_rows()
+        for suffix, matrix in ((".npy", self.vectors), (".unit.npy", self.unit)):
+            tmp = base + ".tmp" + suffix
+            np.save(tmp, np.asarray(matrix[live], dtype=np.float32))
+            os.replace(tmp, base + suffix)
+        with open(base + ".json.tmp", "w") as f:
+            json.dump({
+                "dimension": self.dimension,
+                "keys": [self.keys[row] for row in live],
+                "metadata": [self.metadata[row] for row in live],
+            }, f)
+        os.replace(base + ".json.tmp", base + ".json")
+
+    @classmethod
+    def load(cls, base: str, use_hnsw: bool = False) -> "_Index":
+        with open(base + ".json") as f:
+            meta = json.load(f)
+        index = cls(meta["dimension"], use_hnsw=use_hnsw)
+        if meta["keys"]:
+            index.vectors = np.load(base + ".npy", mmap_mode="r")
+            if os.path.exists(base + ".unit.npy"):
+                index.unit = np.load(base + ".unit.npy", mmap_mode="r")
+            else:
+                # Saved before .unit.npy existed: normalise (reads every vector)
+                norms = np.linalg.norm(index.vectors, axis=1, keepdims=True)
+                index.unit = (index.vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+            index.keys = list(meta["keys"])
+            index.metadata = list(meta["metadata"])
+            index.rows = {key: row for row, key in enumerate(index.keys)}
+            index.alive = np.ones(len(index.keys), dtype=bool)
+            if index.use_hnsw:
+                index._hnsw_add(list(range(len(index.keys))))
+        return index
+
+
+# ---------------------------------------
+# Client surface
+# ---------------------------------------
+class LocalVectorStore:
+    """
+    Drop-in for boto3.client("s3vectors") covering the calls this repo makes.
+
+    With a path, changed indexes are written by save() / close(), and with
+    autosave also at interpreter exit; put/delete never rewrite the files.
+    """
+
+    _shared: Dict[str, "LocalVectorStore"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None, use_hnsw: bool = False, autosave: bool = True):
+        self.path = path
+        self.use_hnsw = use_hnsw
+        self.autosave = autosave and path is not None
+        self._indexes: Dict[tuple, _Index] = {}
+        self._dirty: set = set()  # (bucket, index) changed since the last save
+        self._lock = threading.RLock()
+        if self.autosave:
+            atexit.register(self.save)
+
+    @classmethod
+    def shared(cls, path: Optional[str] = None, use_hnsw: bool = False) -> "LocalVectorStore":
+        """One store per path per process, like a module-level boto3 client."""
+        with cls._shared_lock:
+            key = path or ":memory:"
+            if key not in cls._shared:
+                cls._shared[key] = cls(path=path, use_hnsw=use_hnsw)
+            return cls._shared[key]
+
+    def _base(self, bucket: str, index: str) -> str:
+        return os.path.join(self.path, bucket, index)
+
+    def _index(self, bucket: str, index: str) -> _Index:
+        ident = (bucket, index)
+        if ident not in self._indexes:
+            base = self._base(bucket, index) if self.path else None
+            if base and os.path.exists(base + ".json"):
+                self._indexes[ident] = _Index.load(base, use_hnsw=self.use_hnsw)
+            else:
+                self._indexes[ident] = _Index(use_hnsw=self.use_hnsw)
+        return self._indexes[ident]
+
+    def save(self) -> None:
+        """Write the indexes changed since the last save."""
+        if not self.path:
+            return
+        with self._lock:
+            for bucket, index in sorted(self._dirty):
+                os.makedirs(os.path.join(self.path, bucket), exist_ok=True)
+                self._indexes[(bucket, index)].save(self._base(bucket, index))
+            self._dirty.clear()
+
+    def close(self) -> None:
+        self.save()
+
+    def __enter__(self) -> "LocalVectorStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # boto3-compatible operations ---------------------------------------
+    def put_vectors(self, vectorBucketName: str, indexName: str, vectors: List[Dict[str, Any]], **_) -> Dict:
+        if vectors:
+            with self._lock:
+                self._index(vectorBucketName, indexName).put(vectors)
+                self._dirty.add((vectorBucketName, indexName))
+        return {}
+
+    def delete_vectors(self, vectorBucketName: str, indexName: str, keys: List[str], **_) -> Dict:
+        with self._lock:
+            self._index(vectorBucketName, indexName).delete(keys)
+            self._dirty.add((vectorBucketName, indexName))
+        return {}
+
+    def get_vectors(
+        self,
+        vectorBucketName: str,
+        indexName: str,
+        keys: List[str],
+        returnData: bool = False,
+        returnMetadata: bool = False,
+        **_,
+    ) -> Dict:
+        with self._lock:
+            idx = self._index(vectorBucketName, indexName)
+            return {"vectors": [
+                idx.record(idx.rows[key], returnData, returnMetadata) for key in keys if key in idx.rows
+            ]}
+
+    def query_vectors(
+        self,
+        vectorBucketName: str,
+        indexName: str,
+        queryVector: Dict[str, List[float]],
+        topK: int,
+        filter: Optional[Dict[str, Any]] = None,
+        returnMetadata: bool = False,
+        returnDistance: bool = False,
+        **_,
+    ) -> Dict:
+        with self._lock:
+            idx = self._index(vectorBucketName, indexName)
+            results = []
+            for row, distance in idx.query(queryVector["float32"], topK, filter):
+                record = idx.record(row, False, returnMetadata)
+                if returnDistance:
+                    record["distance"] = distance
+                results.append(record)
+            return {"vectors": results, "distanceMetric": "cosine"}
+
+    def list_vectors(
+        self,
+        vectorBucketName: str,
+        indexName: str,
+        maxResults: int = 500,
+        nextToken: Optional[str] = None,
+        segmentCount: int = 1,
+        segmentIndex: int = 0,
+        returnData: bool = False,
+        returnMetadata: bool = False,
+        **_,
+    ) -> Dict:
+        with self._lock:
+            idx = self._index(vectorBucketName, indexName)
+            rows = [r for r in idx.live_rows() if r % segmentCount == segmentIndex]
+            start = int(nextToken or 0)
+            page = rows[start:start + maxResults]
+            response: Dict[str, Any] = {
+                "vectors": [idx.record(r, returnData, returnMetadata) for r in page]
+            }
+            if start + maxResults < len(rows):
+                response["nextToken"] = str(start + maxResults)
+            return response
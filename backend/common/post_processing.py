@@ -0,0 +1,119 @@
+"""
+Asynchronous post-processing stage for agent narratives.
+
+Fact/event emission (LLM event extraction plus alert/todo writes) runs
+after an agent has saved its result and signalled completion. The agent
+Lambda re-invokes itself with InvocationType="Event" and a post_process
+payload. Lambda retries failed async invocations, so every run carries an
+idempotency key that is claimed in post_processing_runs before any work.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import boto3
+from botocore.config import Config
+
+from common.post_processing_store import PostProcessingStore
+
+logger = logging.getLogger(__name__)
+
+POST_PROCESS_ACTION = "post_process"
+
+# Async invoke payload limit is 256 KB; leave headroom for the envelope
+MAX_ASYNC_PAYLOAD_BYTES = 250_000
+
+EmitFn = Callable[[str, str, str], Awaitable[Any]]
+
+_lambda_client = None
+
+
+def _get_lambda_client():
+    global _lambda_client
+    if _lambda_client is None:
+        _lambda_client = boto3.client(
+            "lambda",
+            config=Config(connect_timeout=5, read_timeout=10, retries={"max_attempts": 2}),
+        )
+    return _lambda_client
+
+
+def idempotency_key(kind: str, job_id: str, narrative: str) -> str:
+    digest = hashlib.sha256((narrative or "").encode("utf-8")).hexdigest()[:16]
+    return f"{kind}:{job_id}:{digest}"
+
+
+def enqueue_post_processing(
+    kind: str,
+    *,
+    job_id: str,
+    user_id: str,
+    narrative: str,
+    function_name: Optional[str] = None,
+) -> bool:
+    """
+    Hand fact/event emission to an async invocation of `function_name`
+    (defaults to the current Lambda). Returns False when there is no
+    async target (local runs), the payload is too large, or the invoke
+    fails; the caller should then emit inline.
+    """
+    function_name = function_name or os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+    if not function_name:
+        return False
+
+    payload = json.dumps({
+        "action": POST_PROCESS_ACTION,
+        "kind": kind,
+        "job_id": job_id,
+        "user_id": user_id,
+        "narrative": narrative,
+        "idempotency_key": idempotency_key(kind, job_id, narrative),
+    }).encode("utf-8")
+
+    if len(payload) > MAX_ASYNC_PAYLOAD_BYTES:
+        logger.warning(f"[PostProcessing] {kind} payload too large for async invoke ({len(payload)} bytes)")
+        return False
+
+    try:
+        _get_lambda_client().invoke(
+            FunctionName=function_name,
+            InvocationType="Event",
+            Payload=payload,
+        )
+    except Exception as e:
+        logger.warning(f"[PostProcessing] Async invoke failed for {kind} job {job_id}: {e}")
+        return False
+
+    logger.info(f"[PostProcessing] Enqueued {kind} post-processing for job {job_id}")
+    return True
+
+
+async def run_post_processing(event: Dict[str, Any], emit: EmitFn) -> Dict[str, Any]:
+    """
+    Execute one post_process event exactly once per idempotency key.
+    `emit(user_id, job_id, narrative)` does the actual fact/event emission.
+    Failures are recorded and re-raised so Lambda's async retry kicks in.
+    """
+    key = event["idempotency_key"]
+    kind = event.get("kind", "unknown")
+    job_id = event.get("job_id")
+
+    store = PostProcessingStore()
+    if not store.claim(key, kind, job_id):
+        logger.info(f"[PostProcessing] {key} already processed or in flight, skipping")
+        return {"statusCode": 200, "body": json.dumps({"skipped": True, "idempotency_key": key})}
+
+    try:
+        await emit(event.get("user_id"), job_id, event.get("narrative") or "")
+    except Exception as e:
+        store.mark_failed(key, str(e))
+        raise
+
+    store.mark_done(key)
+    logger.info(f"[PostProcessing] {key} completed")
+    return {"statusCode": 200, "body": json.dumps({"success": True, "idempotency_key": key})}
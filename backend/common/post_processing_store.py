@@ -0,0 +1,69 @@
+from src.models import Database
+from typing import Optional
+
+
+class PostProcessingStore:
+    """
+    Idempotency ledger for the asynchronous post-processing stage.
+
+    One row per idempotency key. A key can be claimed when it is new, when
+    its previous run failed, or when a run has been 'running' for longer
+    than the stale window (the invocation that held it died).
+    """
+
+    STALE_MINUTES = 15
+
+    def __init__(self, db: Optional[Database] = None):
+        # Pass a shared Database to avoid building a new Data API client per store
+        self.db = db or Database()
+
+    def claim(self, idempotency_key: str, kind: str, job_id: Optional[str]) -> bool:
+        rows = self.db.query_raw(
+            """
+            INSERT INTO post_processing_runs (idempotency_key, kind, job_id, status, attempts)
+            VALUES (:key, :kind, :job_id::uuid, 'running', 1)
+            ON CONFLICT (idempotency_key) DO UPDATE
+            SET status = 'running',
+                attempts = post_processing_runs.attempts + 1,
+                error_message = NULL,
+                updated_at = NOW()
+            WHERE post_processing_runs.status = 'failed'
+               OR (
+                    post_processing_runs.status = 'running'
+                    AND post_processing_runs.updated_at < NOW() - make_interval(mins => :stale_minutes)
+               )
+            RETURNING idempotency_key
+            """,
+            [
+                {"name": "key", "value": {"stringValue": idempotency_key}},
+                {"name": "kind", "value": {"stringValue": kind}},
+                {"name": "job_id", "value": {"stringValue": job_id} if job_id else {"isNull": True}},
+                {"name": "stale_minutes", "value": {"longValue": self.STALE_MINUTES}},
+            ],
+        )
+        return bool(rows)
+
+    def mark_done(self, idempotency_key: str) -> None:
+        self._set_status(idempotency_key, "done", None)
+
+    def mark_failed(self, idempotency_key: str, error_message: str) -> None:
+        self._set_status(idempotency_key, "failed", error_message[:1000])
+
+    def _set_status(self, idempotency_key: str, status: str, error_message: Optional[str]) -> None:
+        self.db.query_raw(
+            """
+            UPDATE post_processing_runs
+            SET status = :status,
+                error_message = :error_message,
+                updated_at = NOW()
+            WHERE idempotency_key = :key
+            """,
+            [
+                {"name": "key", "value": {"stringValue": idempotency_key}},
+                {"name": "status", "value": {"stringValue": status}},
+                {
+                    "name": "error_message",
+                    "value": {"stringValue": error_message} if error_message else {"isNull": True},
+                },
+            ],
+        )
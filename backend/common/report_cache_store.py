@@ -0,0 +1,110 @@
+from src.models import Database
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+
+# Upper bound on reuse even when nothing in the key changed (research and
+# market insights move on even if prices and holdings do not)
+REPORT_CACHE_TTL_SECONDS = int(float(os.getenv("REPORT_CACHE_TTL_HOURS", "24")) * 3600)
+
+
+def _price_date(portfolio_data: Dict[str, Any]) -> str:
+    """Date of the newest price among the holdings; today (UTC) if none is recorded."""
+    dates = [
+        str(position.get("instrument", {}).get("price_updated_at"))[:10]
+        for account in portfolio_data.get("accounts", [])
+        for position in account.get("positions", [])
+        if position.get("instrument", {}).get("price_updated_at")
+    ]
+    return max(dates) if dates else datetime.now(timezone.utc).date().isoformat()
+
+
+def portfolio_snapshot(portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonical form of the holdings: what the report depends on, in a stable
+    order, without ids or job/user attribution.
+    """
+    accounts = []
+    for account in portfolio_data.get("accounts", []):
+        positions = sorted(
+            (position["symbol"], round(float(position.get("quantity", 0)), 6))
+            for position in account.get("positions", [])
+            if position.get("symbol")
+        )
+        accounts.append({
+            "name": account.get("name"),
+            "type": account.get("type"),
+            "cash_balance": round(float(account.get("cash_balance", 0)), 2),
+            "positions": positions,
+        })
+    accounts.sort(key=lambda a: json.dumps(a, sort_keys=True))
+    return {"accounts": accounts, "price_date": _price_date(portfolio_data)}
+
+
+def report_cache_key(
+    portfolio_data: Dict[str, Any], user_data: Dict[str, Any], prompt_version: str, model_id: str
+) -> str:
+    """sha256 over the portfolio snapshot, user goals, price date and prompt/model version."""
+    payload = {
+        "portfolio": portfolio_snapshot(portfolio_data),
+        "goals": {k: user_data.get(k) for k in sorted(user_data)},
+        "prompt_version": prompt_version,
+        "model_id": model_id,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ReportCacheStore:
+    """
+    Reporter results keyed by report_cache_key. A re-run of an unchanged
+    portfolio on the same price data reuses the stored report_payload
+    instead of regenerating (and re-judging) it.
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        # Pass a shared Database to avoid building a new Data API client per store
+        self.db = db or Database()
+
+    def get(self, cache_key: str, max_age_seconds: int = REPORT_CACHE_TTL_SECONDS) -> Optional[Dict]:
+        rows = self.db.query_raw(
+            """
+            SELECT report_payload::text AS report_payload, source_job_id::text AS source_job_id
+            FROM report_cache
+            WHERE cache_key = :cache_key
+                AND created_at >= NOW() - make_interval(secs => :max_age)
+            """,
+            [
+                {"name": "cache_key", "value": {"stringValue": cache_key}},
+                {"name": "max_age", "value": {"longValue": max_age_seconds}},
+            ],
+        )
+        if not rows:
+            return None
+        payload = json.loads(rows[0]["report_payload"])
+        payload["cache_source_job_id"] = rows[0]["source_job_id"]
+        return payload
+
+    def put(self, cache_key: str, report_payload: Dict, job_id: str) -> None:
+        self.db.query_raw(
+            """
+            INSERT INTO report_cache (cache_key, report_payload, source_job_id)
+            VALUES (:cache_key, :report_payload::jsonb, :job_id)
+            ON CONFLICT (cache_key) DO UPDATE
+            SET report_payload = EXCLUDED.report_payload,
+                source_job_id = EXCLUDED.source_job_id,
+                created_at = NOW()
+            """,
+            [
+                {"name": "cache_key", "value": {"stringValue": cache_key}},
+                {"name": "report_payload", "value": {"stringValue": json.dumps(report_payload)}},
+                {"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"},
+            ],
+        )
+
+    def invalidate(self, cache_key: str) -> None:
+        self.db.query_raw(
+            "DELETE FROM report_cache WHERE cache_key = :cache_key",
+            [{"name": "cache_key", "value": {"stringValue": cache_key}}],
+        )
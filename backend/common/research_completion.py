@@ -0,0 +1,62 @@
+"""
+Push-based completion for portfolio research jobs.
+
+When JobTracker settles a job (every symbol done or failed), the Reporter
+continuation is invoked asynchronously instead of the Reporter agent
+polling check_research_job_status. The target is RESEARCH_COMPLETE_FUNCTION
+(e.g. "alex-reporter"); when unset, nothing is pushed.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Dict
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+RESEARCH_COMPLETE_ACTION = "research_complete"
+
+_lambda_client = None
+
+
+def _get_lambda_client():
+    global _lambda_client
+    if _lambda_client is None:
+        _lambda_client = boto3.client(
+            "lambda",
+            config=Config(connect_timeout=5, read_timeout=10, retries={"max_attempts": 3}),
+        )
+    return _lambda_client
+
+
+def is_settled(state: Dict) -> bool:
+    """True when every symbol of a job_tracker row is done or failed."""
+    done = (state.get("symbols_done") or 0) + (state.get("symbols_failed") or 0)
+    return done >= (state.get("symbol_count") or 0)
+
+
+def notify_research_settled(job_id: str, state: Dict) -> None:
+    function_name = os.getenv("RESEARCH_COMPLETE_FUNCTION")
+    if not function_name:
+        logger.info(f"[ResearchCompletion] RESEARCH_COMPLETE_FUNCTION not set; not pushing job {job_id}")
+        return
+
+    payload = {
+        "action": RESEARCH_COMPLETE_ACTION,
+        "job_id": job_id,
+        "research_status": state.get("status"),
+    }
+    _get_lambda_client().invoke(
+        FunctionName=function_name,
+        InvocationType="Event",
+        Payload=json.dumps(payload).encode("utf-8"),
+    )
+    logger.info(
+        f"[ResearchCompletion] Pushed {RESEARCH_COMPLETE_ACTION} for job {job_id} "
+        f"to {function_name} (status={state.get('status')})"
+    )
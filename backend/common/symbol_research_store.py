@@ -0,0 +1,186 @@
+from __future__ import annotations
+import json
+import os
+from typing import Dict, List, Optional
+
+from database.src.models import Database   # same import path as JobTracker (worker + Researcher)
+
+# Research younger than this is reused across users/jobs instead of re-run
+FRESHNESS_SECONDS = int(float(os.getenv("SYMBOL_RESEARCH_FRESHNESS_HOURS", "24")) * 3600)
+
+# An in-flight claim older than this is presumed dead and can be taken over
+# (longer than a worker's full retry budget)
+LEASE_SECONDS = int(os.getenv("SYMBOL_RESEARCH_LEASE_SECONDS", "3600"))
+
+# A tracker item that has not moved for this long is failed by the sweeper:
+# one worker call (SYMBOL_RESEARCH_TIMEOUT_SECONDS), the SQS redeliveries
+# before the last receive (each after the queue's visibility timeout), and a
+# margin for a queued Researcher run to settle after answering 202. Same
+# variables as the worker, which runs the sweep.
+_WORKER_TIMEOUT_SECONDS = float(os.getenv("SYMBOL_RESEARCH_TIMEOUT_SECONDS", "300"))
+_MAX_RECEIVES = int(os.getenv("SYMBOL_MAX_RECEIVES", "3"))
+_VISIBILITY_SECONDS = int(os.getenv("SYMBOL_QUEUE_VISIBILITY_SECONDS", "920"))
+_SETTLE_MARGIN_SECONDS = 600
+STALE_ITEM_SECONDS = int(os.getenv(
+    "SYMBOL_RESEARCH_STALE_SECONDS",
+    str(int(_WORKER_TIMEOUT_SECONDS + (_MAX_RECEIVES - 1) * _VISIBILITY_SECONDS + _SETTLE_MARGIN_SECONDS)),
+))
+
+class SymbolResearchStore:
+    """
+    Cross-user registry of symbol research (`symbol_research`, one row per symbol).
+
+    Records the last successful research per symbol (timestamp, vector IDs,
+    job) and the job currently researching it. `claim` decides for a new
+    job whether a symbol needs a Researcher run:
+
+      - "fresh":    researched within the freshness window, reuse it
+      - "inflight": another job is researching it, wait for that run
+      - "claimed":  stale or unknown, this job must research it
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        # Pass a shared Database to avoid building a new Data API client per store
+        self.db = db or Database()
+
+    # ---------------------------------------
+    # Claiming
+    # ---------------------------------------
+    def claim(self, symbol: str, job_id: str) -> str:
+        """Atomically classify a symbol for a job, taking the in-flight claim if stale."""
+        params = [
+            {"name": "symbol", "value": {"stringValue": symbol}},
+            {"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"},
+            {"name": "freshness_seconds", "value": {"longValue": FRESHNESS_SECONDS}},
+            {"name": "lease_seconds", "value": {"longValue": LEASE_SECONDS}},
+        ]
+        rows = self.db.query_raw(
+            """
+            INSERT INTO symbol_research (symbol, in_flight_job_id, in_flight_since)
+            VALUES (:symbol, :job_id, NOW())
+            ON CONFLICT (symbol) DO UPDATE
+            SET in_flight_job_id = EXCLUDED.in_flight_job_id,
+                in_flight_since = NOW()
+            WHERE (
+                    symbol_research.researched_at IS NULL
+                    OR symbol_research.researched_at < NOW() - make_interval(secs => :freshness_seconds)
+                )
+                AND (
+                    symbol_research.in_flight_job_id IS NULL
+                    OR symbol_research.in_flight_job_id = EXCLUDED.in_flight_job_id
+                    OR symbol_research.in_flight_since < NOW() - make_interval(secs => :lease_seconds)
+                )
+            RETURNING symbol
+            """,
+            params,
+        )
+        if rows:
+            return "claimed"
+
+        # Not claimable: either fresh, or someone else holds a live claim
+        rows = self.db.query_raw(
+            """
+            SELECT (researched_at >= NOW() - make_interval(secs => :freshness_seconds)) AS is_fresh
+            FROM symbol_research
+            WHERE symbol = :symbol
+            """,
+            [params[0], params[2]],
+        )
+        return "fresh" if rows and rows[0].get("is_fresh") else "inflight"
+
+    # ---------------------------------------
+    # Completion
+    # ---------------------------------------
+    def record_success(self, symbol: str, job_id: str, vector_ids: List[str]) -> None:
+        """Store a successful run and release the in-flight claim."""
+        self.db.query_raw(
+            """
+            INSERT INTO symbol_research (symbol, researched_at, vector_ids, last_job_id)
+            VALUES (:symbol, NOW(), :vector_ids::jsonb, :job_id)
+            ON CONFLICT (symbol) DO UPDATE
+            SET researched_at = NOW(),
+                vector_ids = EXCLUDED.vector_ids,
+                last_job_id = EXCLUDED.last_job_id,
+                in_flight_job_id = NULL,
+                in_flight_since = NULL
+            """,
+            [
+                {"name": "symbol", "value": {"stringValue": symbol}},
+                {"name": "job_id", "value": {"stringValue": job_id}, "typeHint": "UUID"},
+                {"name": "vector_ids", "value": {"stringValue": json.dumps(vector_ids)}},
+            ],
+        )
+
+    def release(self, symbol: str, job_id: str) -> None:
+        """Drop this job's in-flight claim after a final failure (last success is kept)."""
+        self.db.query_raw(
+            """
+            UPDATE symbol_research
+            SET in_flight_job_id = NULL, in_flight_since = NULL
+            WHERE symbol = :symbol AND in_flight_job_id = :job_id::uuid
+            """,
+            [
+                {"name": "symbol", "value": {"stringValue": symbol}},
+                {"name": "job_id", "value": {"stringValue": job_id}},
+            ],
+        )
+
+    # ---------------------------------------
+    # Reads
+    # ---------------------------------------
+    def get(self, symbol: str) -> Optional[Dict]:
+        rows = self.db.query_raw(
+            """
+            SELECT symbol, researched_at, vector_ids::text AS vector_ids,
+                   last_job_id, in_flight_job_id, in_flight_since
+            FROM symbol_research
+            WHERE symbol = :symbol
+            """,
+            [{"name": "symbol", "value": {"stringValue": symbol}}],
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        row["vector_ids"] = json.loads(row["vector_ids"] or "[]")
+        return row
+
+
+# ---------------------------------------
+# Settling a symbol run (Researcher + worker)
+# ---------------------------------------
+def complete_symbol_research(tracker, job_id: str, symbol: str, vector_ids: List[str]) -> List[str]:
+    """
+    Publish a successful run to the registry, then settle this job and every
+    job waiting on it. Returns the released waiting job ids.
+    """
+    SymbolResearchStore(tracker.db).record_success(symbol, job_id, vector_ids)
+    tracker.mark_symbol_done(job_id, symbol)
+    return tracker.release_waiters(symbol)
+
+
+def fail_symbol_research(tracker, job_id: str, symbol: str, error: str) -> List[str]:
+    """
+    Record a final failure: settle this job's symbol as failed, hand the
+    claim back, and fail the jobs that were waiting on this run.
+    """
+    tracker.mark_symbol_error(job_id, symbol, error)
+    SymbolResearchStore(tracker.db).release(symbol, job_id)
+    return tracker.release_waiters(symbol, error=f"Shared research failed: {error}")
+
+
+def sweep_stale_research(tracker, max_age_seconds: int = STALE_ITEM_SECONDS) -> List[Dict]:
+    """
+    Fail tracker items whose settlement never arrived (a lost Researcher
+    run, a dropped message, a crashed continuation), so their jobs still
+    settle and the Reporter is pushed. Waiting items only fail themselves;
+    pending/running items held the claim, so it is released and its
+    waiters are failed too. Returns the swept items.
+    """
+    stale = tracker.find_stale_items(max_age_seconds)
+    error = f"Research did not settle within {max_age_seconds}s"
+    for item in stale:
+        if item["status"] == "waiting":
+            tracker.mark_symbol_error(item["job_id"], item["symbol"], error)
+        else:
+            fail_symbol_research(tracker, item["job_id"], item["symbol"], error)
+    return stale
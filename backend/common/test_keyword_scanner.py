@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+KeywordScanner tests.
+
+Run from backend/:
+    uv run python -m common.test_keyword_scanner
+"""
+
+from common.keyword_scanner import KeywordScanner
+
+
+REGISTRY = {
+    "risk": ["volatility", "risk"],
+    "elevated_volatility": ["high volatility", "elevated risk"],
+    "income_gap": ["gap", "shortfall"],
+}
+
+
+def test_matches_substring_semantics():
+    scanner = KeywordScanner(REGISTRY)
+    texts = [
+        "The portfolio shows HIGH volatility and elevated risk.",
+        "Projected income shortfall of $12k.",
+        "Singapore exposure",  # substring match, like `in`
+        "",
+        None,
+    ]
+    for text in texts:
+        lowered = (text or "").lower()
+        expected = {
+            signal for signal, phrases in REGISTRY.items()
+            if any(p in lowered for p in phrases)
+        }
+        assert scanner.scan(text).signals == expected, text
+
+    print("Scanner matches `in` semantics.")
+
+
+def test_offsets_and_snippets():
+    text = "Overall fine. The plan has a Shortfall risk in later years."
+    scan = KeywordScanner(REGISTRY).scan(text)
+
+    hit = scan.hits_for("income_gap")[0]
+    assert text[hit.start:hit.end] == "Shortfall"
+    assert scan.phrases("risk") == ["risk"]
+    assert "Shortfall" in scan.snippets("income_gap", context=10)[0]
+
+    print("Offsets and snippets are correct.")
+
+
+if __name__ == "__main__":
+    test_matches_substring_semantics()
+    test_offsets_and_snippets()
@@ -0,0 +1,172 @@
+"""
+Checks and benchmarks for the local vector store, no AWS needed.
+
+    cd backend && uv run --extra local-vectors python -m common.test_local_vector_store
+    cd backend && uv run --extra local-vectors python -m common.test_local_vector_store --bench 100000
+
+The benchmark ingests random 384-d vectors (the MiniLM embedding size) in
+put_vectors batches of 500, then times filtered and unfiltered top-10
+queries, brute force and (with hnswlib) HNSW, and reports HNSW recall and
+the ingest rate of a persisted store.
+Uniform random vectors are the hard case for HNSW; recall on real,
+clustered embeddings is higher at the same LOCAL_VECTOR_HNSW_EF.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from common.local_vector_store import LocalVectorStore, hnswlib
+
+BUCKET = "alex-vectors-local"
+INDEX = "financial-research"
+DIM = 384
+
+
+def _vectors(rng, n, start=0):
+    data = rng.standard_normal((n, DIM)).astype(np.float32)
+    return [
+        {
+            "key": f"doc-{start + i}",
+            "data": {"float32": data[i].tolist()},
+            "metadata": {"symbol": ["SPY", "QQQ", "AAPL", "MSFT"][(start + i) % 4], "chunk_index": (start + i) % 7},
+        }
+        for i in range(n)
+    ]
+
+
+def test_query_filters_and_deletes():
+    store = LocalVectorStore()
+    rng = np.random.default_rng(0)
+    vectors = _vectors(rng, 200)
+    store.put_vectors(vectorBucketName=BUCKET, indexName=INDEX, vectors=vectors)
+
+    # A stored vector is its own nearest neighbour at distance ~0
+    probe = vectors[17]
+    response = store.query_vectors(
+        vectorBucketName=BUCKET, indexName=INDEX, queryVector=probe["data"],
+        topK=3, returnDistance=True, returnMetadata=True,
+    )
+    assert response["vectors"][0]["key"] == "doc-17"
+    assert abs(response["vectors"][0]["distance"]) < 1e-5
+    assert response["vectors"][0]["metadata"]["symbol"] == "QQQ"
+
+    # Filters: implicit $eq, operators, $and/$or
+    response = store.query_vectors(
+        vectorBucketName=BUCKET, indexName=INDEX, queryVector=probe["data"],
+        topK=50, returnMetadata=True, filter={"symbol": "AAPL"},
+    )
+    assert response["vectors"] and all(v["metadata"]["symbol"] == "AAPL" for v in response["vectors"])
+
+    response = store.query_vectors(
+        vectorBucketName=BUCKET, indexName=INDEX, queryVector=probe["data"], topK=200, returnMetadata=True,
+        filter={"$and": [{"symbol": {"$in": ["SPY", "QQQ"]}}, {"chunk_index": {"$gte": 5}}]},
+    )
+    assert response["vectors"]
+    assert all(v["metadata"]["symbol"] in ("SPY", "QQQ") and v["metadata"]["chunk_index"] >= 5
+               for v in response["vectors"])
+
+    # Upsert overwrites; delete removes
+    store.put_vectors(vectorBucketName=BUCKET, indexName=INDEX, vectors=[{**probe, "metadata": {"symbol": "TSLA"}}])
+    got = store.get_vectors(vectorBucketName=BUCKET, indexName=INDEX, keys=["doc-17"], returnMetadata=True)
+    assert got["vectors"][0]["metadata"] == {"symbol": "TSLA"}
+
+    store.delete_vectors(vectorBucketName=BUCKET, indexName=INDEX, keys=["doc-17"])
+    response = store.query_vectors(vectorBucketName=BUCKET, indexName=INDEX, queryVector=probe["data"], topK=1)
+    assert response["vectors"][0]["key"] != "doc-17"
+    print("✅ query, filters, upsert and delete")
+
+
+def test_list_pagination_and_persistence():
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as path:
+        store = LocalVectorStore(path=path)
+        store.put_vectors(vectorBucketName=BUCKET, indexName=INDEX, vectors=_vectors(rng, 250))
+        store.delete_vectors(vectorBucketName=BUCKET, indexName=INDEX, keys=["doc-0", "doc-1"])
+
+        keys, token = [], None
+        while True:
+            kwargs = {"nextToken": token} if token else {}
+            page = store.list_vectors(vectorBucketName=BUCKET, indexName=INDEX, maxResults=100, **kwargs)
+            keys.extend(v["key"] for v in page["vectors"])
+            token = page.get("nextToken")
+            if not token:
+                break
+        assert len(keys) == 248 and len(set(keys)) == 248
+
+        # Writes stay in memory until save(); a fresh store then reopens the
+        # index with both matrices memory-mapped
+        assert not os.path.exists(os.path.join(path, BUCKET, INDEX + ".json"))
+        store.save()
+        reopened = LocalVectorStore(path=path, autosave=False)
+        idx = reopened._index(BUCKET, INDEX)
+        assert isinstance(idx.vectors, np.memmap) and isinstance(idx.unit, np.memmap)
+        page = reopened.list_vectors(vectorBucketName=BUCKET, indexName=INDEX, maxResults=1000, returnMetadata=True)
+        assert sorted(v["key"] for v in page["vectors"]) == sorted(keys)
+        probe = store.get_vectors(vectorBucketName=BUCKET, indexName=INDEX, keys=["doc-42"], returnData=True)
+        response = reopened.query_vectors(
+            vectorBucketName=BUCKET, indexName=INDEX, queryVector=probe["vectors"][0]["data"], topK=1,
+        )
+        assert response["vectors"][0]["key"] == "doc-42"
+    print("✅ list_vectors pagination and persistence")
+
+
+# ---------------------------------------
+# Benchmark
+# ---------------------------------------
+def benchmark(n=20000, queries=200):
+    rng = np.random.default_rng(42)
+    modes = [False] + ([True] if hnswlib is not None else [])
+    probes = rng.standard_normal((queries, DIM)).astype(np.float32).tolist()
+    batches = [_vectors(rng, min(500, n - start), start) for start in range(0, n, 500)]
+    exact = None
+
+    for use_hnsw in modes:
+        store = LocalVectorStore(use_hnsw=use_hnsw)
+        began = time.perf_counter()
+        for batch in batches:
+            store.put_vectors(vectorBucketName=BUCKET, indexName=INDEX, vectors=batch)
+        ingest_seconds = time.perf_counter() - began
+
+        results = []
+        for flt in (None, {"symbol": "AAPL"}):
+            began = time.perf_counter()
+            for probe in probes:
+                response = store.query_vectors(
+                    vectorBucketName=BUCKET, indexName=INDEX, queryVector={"float32": probe}, topK=10, filter=flt,
+                )
+                if flt is None:
+                    results.append({v["key"] for v in response["vectors"]})
+            elapsed = time.perf_counter() - began
+            label = "hnsw " if use_hnsw else "brute"
+            print(f"[{label}] n={n} ingest {n / ingest_seconds:,.0f} vectors/s | "
+                  f"query{' (filtered)' if flt else ''} {1000 * elapsed / queries:.2f} ms")
+
+        if exact is None:
+            exact = results
+        else:
+            recall = np.mean([len(a & b) / len(a) for a, b in zip(exact, results)])
+            print(f"[hnsw ] recall@10 vs brute force: {recall:.3f}")
+
+    # Persisted ingest: batches stay in memory, one write at save()
+    with tempfile.TemporaryDirectory() as path:
+        store = LocalVectorStore(path=path, autosave=False)
+        began = time.perf_counter()
+        for batch in batches:
+            store.put_vectors(vectorBucketName=BUCKET, indexName=INDEX, vectors=batch)
+        store.save()
+        print(f"[disk ] n={n} ingest + save {n / (time.perf_counter() - began):,.0f} vectors/s")
+
+    if hnswlib is None:
+        print("(hnswlib not installed, HNSW skipped)")
+
+
+if __name__ == "__main__":
+    test_query_filters_and_deletes()
+    test_list_pagination_and_persistence()
+    if "--bench" in sys.argv:
+        idx = sys.argv.index("--bench")
+        benchmark(int(sys.argv[idx + 1]) if len(sys.argv) > idx + 1 else 20000)
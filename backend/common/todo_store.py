@@ -6,13 +6,14 @@ from datetime import datetime, timezone
 
 class TodoStore:
 
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db: Optional[Database] = None):
+        # Pass a shared Database to avoid building a new Data API client per store
+        self.db = db or Database()
 
     # -------------------------
     # INSERT
     # -------------------------
-    def insert_todo(self, todo: Dict) -> None:
+    def insert_todo(self, todo: Dict) -> Optional[str]:
         sql = """
             INSERT INTO todos (
                 todo_id, clerk_user_id, job_id, symbol,
@@ -24,10 +25,14 @@ class TodoStore:
                 :domain, :title, :description, :rationale,
                 :action_type, :priority, :due_at, :source_alert_id
             )
+            ON CONFLICT DO NOTHING
+            RETURNING todo_id
         """
         params = self._build_params(todo)
-        
-        self.db.query_raw(sql, params)
+
+        # Open-todo dedup is enforced by uq_todos_open_dedup
+        rows = self.db.query_raw(sql, params)
+        return rows[0]["todo_id"] if rows else None
 
     def insert_bulk(self, todos: List[Dict]) -> None:
         for todo in todos:
@@ -179,21 +184,3 @@ class TodoStore:
                 # params.append({"name": k, "value": {"stringValue": str(v)}})
         # return params
         return [self._bind_param(k, v) for k, v in kwargs.items()]
-
-    def list_open_for_user_and_symbol(self, clerk_user_id: str, job_id: str, symbol: Optional[str],):
-        sql = """
-            SELECT *
-            FROM todos
-            WHERE clerk_user_id = :user
-            AND (:symbol::varchar IS NULL OR symbol = :symbol::varchar)
-            AND status IN ('open','in_progress')
-        """
-        params = [
-            {"name": "user", "value": {"stringValue": clerk_user_id}},
-            ]
-        if symbol is None:
-            params.append({"name": "symbol", "value": {"isNull": True}})
-        else:
-            params.append({"name": "symbol", "value": {"stringValue": symbol}})
-        return self.db.query_raw(sql, params)
-
@@ -0,0 +1,36 @@
+"""
+Vector store client factory.
+
+    s3v = get_vector_client()
+    s3v.query_vectors(vectorBucketName=..., indexName=..., ...)
+
+Returns the shared boto3 `s3vectors` client (common.aws_clients), or with
+VECTOR_STORE=local the NumPy-backed LocalVectorStore (same calls, same
+response shapes) for tests and benchmarks without AWS:
+
+    VECTOR_STORE=local            use the local store
+    LOCAL_VECTOR_PATH=/tmp/vecs   persist it there on save() or at exit (in-memory if unset)
+    LOCAL_VECTOR_HNSW=1           use an HNSW index (needs hnswlib)
+    LOCAL_VECTOR_HNSW_EF=128      HNSW search breadth (recall vs latency)
+
+The local store needs numpy (and hnswlib for HNSW), declared as the
+`local-vectors` extra; the Lambda packages do not ship them, so it is only
+imported when selected.
+"""
+
+import os
+from typing import Optional
+
+
+def get_vector_client(region_name: Optional[str] = None):
+    if os.getenv("VECTOR_STORE", "s3vectors").lower() == "local":
+        from common.local_vector_store import LocalVectorStore
+
+        return LocalVectorStore.shared(
+            path=os.getenv("LOCAL_VECTOR_PATH") or None,
+            use_hnsw=os.getenv("LOCAL_VECTOR_HNSW", "0") == "1",
+        )
+
+    from common.aws_clients import get_client
+
+    return get_client("s3vectors", region_name=region_name)
@@ -133,7 +133,7 @@ CREATE TABLE IF NOT EXISTS job_tracker (
 CREATE TABLE IF NOT EXISTS job_tracker_items (
     job_id        UUID        NOT NULL REFERENCES job_tracker(job_id),
     symbol        VARCHAR(20) NOT NULL,
-    status        VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending|running|done|error
+    status        VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending|waiting|running|done|error
     retry_count   INTEGER     NOT NULL DEFAULT 0,
     error_message TEXT,
     last_updated  TIMESTAMP   NOT NULL DEFAULT NOW(),
@@ -244,7 +244,7 @@ ALTER TABLE alerts
 ADD COLUMN IF NOT EXISTS action_hint VARCHAR(50);
 
 -- OPTIONAL AI READINESS
--- ALTER TABLE alerts ADD COLUMN engine_version VARCHAR(20);
+ALTER TABLE alerts ADD COLUMN IF NOT EXISTS engine_version VARCHAR(20);
 -- ALTER TABLE alerts ADD COLUMN reasoning JSONB;
 
 -- TODO LINKING
@@ -270,3 +270,112 @@ ADD COLUMN IF NOT EXISTS agent_status JSONB NOT NULL DEFAULT '{
 ALTER TABLE jobs
 ADD COLUMN IF NOT EXISTS agent_completed_at JSONB NOT NULL DEFAULT '{}'::jsonb;
 
+
+-- Price freshness: lets the Planner skip market-data calls for symbols
+-- the scheduled price_refresher has already updated
+ALTER TABLE instruments
+ADD COLUMN IF NOT EXISTS price_updated_at TIMESTAMP;
+
+-- DEDUP: at most one live alert per (user, domain, category, symbol) and one
+-- open todo per (user, action_type, symbol). Writers use ON CONFLICT DO NOTHING.
+-- Older duplicates are dismissed first so the indexes can be built.
+ALTER TABLE todos DROP CONSTRAINT IF EXISTS todos_status_check;
+ALTER TABLE todos ADD CONSTRAINT todos_status_check
+CHECK (status IN ('open', 'in_progress', 'done', 'dismissed'));
+
+UPDATE alerts a
+SET status = 'dismissed'
+WHERE a.status != 'dismissed'
+  AND EXISTS (
+    SELECT 1 FROM alerts b
+    WHERE b.clerk_user_id = a.clerk_user_id
+      AND b.domain = a.domain
+      AND b.category = a.category
+      AND COALESCE(b.symbol, '') = COALESCE(a.symbol, '')
+      AND b.status != 'dismissed'
+      AND (b.created_at, b.alert_id) > (a.created_at, a.alert_id)
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_alerts_live_dedup
+ON alerts (clerk_user_id, domain, category, COALESCE(symbol, ''))
+WHERE status != 'dismissed';
+
+UPDATE todos a
+SET status = 'dismissed'
+WHERE a.status IN ('open', 'in_progress')
+  AND EXISTS (
+    SELECT 1 FROM todos b
+    WHERE b.clerk_user_id = a.clerk_user_id
+      AND b.action_type = a.action_type
+      AND COALESCE(b.symbol, '') = COALESCE(a.symbol, '')
+      AND b.status IN ('open', 'in_progress')
+      AND (b.created_at, b.todo_id) > (a.created_at, a.todo_id)
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_todos_open_dedup
+ON todos (clerk_user_id, action_type, COALESCE(symbol, ''))
+WHERE status IN ('open', 'in_progress');
+
+-- Versioned alert-engine rule tables. The engine hot-reloads the newest
+-- active row when ALERT_RULES_SOURCE=db (see common/alert_rules.json).
+CREATE TABLE IF NOT EXISTS alert_rule_sets (
+    version VARCHAR(20) PRIMARY KEY,
+    rules JSONB NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT false,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_alert_rule_sets_active
+ON alert_rule_sets (created_at DESC) WHERE is_active;
+
+-- Event-detection cache: parsed LLM events per identical narrative
+CREATE TABLE IF NOT EXISTS event_detection_cache (
+    narrative_hash CHAR(64) NOT NULL,
+    source VARCHAR(50) NOT NULL,
+    prompt_version VARCHAR(20) NOT NULL,
+    model_id VARCHAR(200) NOT NULL,
+    events JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (narrative_hash, source, prompt_version, model_id)
+);
+
+-- Idempotency ledger for async post-processing (fact/event emission)
+CREATE TABLE IF NOT EXISTS post_processing_runs (
+    idempotency_key VARCHAR(255) PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    job_id UUID REFERENCES jobs(id) ON DELETE CASCADE,
+    status VARCHAR(20) NOT NULL CHECK (status IN ('running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 1,
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Failed symbols count toward settling a research job (done + failed = symbol_count),
+-- which pushes the Reporter continuation instead of the agent polling
+ALTER TABLE job_tracker
+ADD COLUMN IF NOT EXISTS symbols_failed INTEGER NOT NULL DEFAULT 0;
+
+-- Cross-user registry of symbol research: the last successful run per symbol
+-- is reused within a freshness window, and one in-flight run is shared by
+-- every job that needs the symbol (waiting job_tracker_items)
+CREATE TABLE IF NOT EXISTS symbol_research (
+    symbol VARCHAR(20) PRIMARY KEY,
+    researched_at TIMESTAMP,
+    vector_ids JSONB NOT NULL DEFAULT '[]',
+    last_job_id UUID,
+    in_flight_job_id UUID,
+    in_flight_since TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_tracker_items_waiting
+ON job_tracker_items (symbol) WHERE status = 'waiting';
+
+-- Reporter result cache: one report per (portfolio snapshot, goals, price
+-- date, prompt/model version) hash, reused by re-runs that change nothing
+CREATE TABLE IF NOT EXISTS report_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    report_payload JSONB NOT NULL,
+    source_job_id UUID,
+    created_at TIMESTAMP DEFAULT NOW()
+);
@@ -106,7 +106,7 @@ statements = [
     """CREATE TABLE IF NOT EXISTS job_tracker_items (
     job_id        UUID        NOT NULL REFERENCES job_tracker(job_id),
     symbol        VARCHAR(20) NOT NULL,
-    status        VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending|running|done|error
+    status        VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending|waiting|running|done|error
     retry_count   INTEGER     NOT NULL DEFAULT 0,
     error_message TEXT,
     last_updated  TIMESTAMP   NOT NULL DEFAULT NOW(),
@@ -237,6 +237,74 @@ statements = [
         DEFAULT '{}'::jsonb""",
     """ALTER TABLE todos DROP CONSTRAINT todos_status_check""",
     """ALTER TABLE todos ADD CONSTRAINT todos_status_check CHECK (status IN ('open', 'in_progress', 'done', 'dismissed'))""",
+    # Price freshness (written by price_refresher and Planner)
+    """ALTER TABLE instruments ADD COLUMN IF NOT EXISTS price_updated_at TIMESTAMP""",
+    # Alert / Todo dedup enforced by partial unique indexes (dismiss older duplicates first)
+    """UPDATE alerts a SET status = 'dismissed'
+    WHERE a.status != 'dismissed' AND EXISTS (
+        SELECT 1 FROM alerts b
+        WHERE b.clerk_user_id = a.clerk_user_id AND b.domain = a.domain
+          AND b.category = a.category AND COALESCE(b.symbol, '') = COALESCE(a.symbol, '')
+          AND b.status != 'dismissed' AND (b.created_at, b.alert_id) > (a.created_at, a.alert_id))""",
+    """CREATE UNIQUE INDEX IF NOT EXISTS uq_alerts_live_dedup
+    ON alerts (clerk_user_id, domain, category, COALESCE(symbol, '')) WHERE status != 'dismissed'""",
+    """UPDATE todos a SET status = 'dismissed'
+    WHERE a.status IN ('open', 'in_progress') AND EXISTS (
+        SELECT 1 FROM todos b
+        WHERE b.clerk_user_id = a.clerk_user_id AND b.action_type = a.action_type
+          AND COALESCE(b.symbol, '') = COALESCE(a.symbol, '')
+          AND b.status IN ('open', 'in_progress') AND (b.created_at, b.todo_id) > (a.created_at, a.todo_id))""",
+    """CREATE UNIQUE INDEX IF NOT EXISTS uq_todos_open_dedup
+    ON todos (clerk_user_id, action_type, COALESCE(symbol, '')) WHERE status IN ('open', 'in_progress')""",
+    # Versioned alert-engine rule tables (ALERT_RULES_SOURCE=db)
+    """CREATE TABLE IF NOT EXISTS alert_rule_sets (
+        version VARCHAR(20) PRIMARY KEY,
+        rules JSONB NOT NULL,
+        is_active BOOLEAN NOT NULL DEFAULT false,
+        created_at TIMESTAMP DEFAULT NOW()
+    )""",
+    """CREATE INDEX IF NOT EXISTS idx_alert_rule_sets_active
+    ON alert_rule_sets (created_at DESC) WHERE is_active""",
+    # Event-detection cache: parsed LLM events per identical narrative
+    """CREATE TABLE IF NOT EXISTS event_detection_cache (
+        narrative_hash CHAR(64) NOT NULL,
+        source VARCHAR(50) NOT NULL,
+        prompt_version VARCHAR(20) NOT NULL,
+        model_id VARCHAR(200) NOT NULL,
+        events JSONB NOT NULL,
+        created_at TIMESTAMP DEFAULT NOW(),
+        PRIMARY KEY (narrative_hash, source, prompt_version, model_id)
+    )""",
+    # Idempotency ledger for async post-processing (fact/event emission)
+    """CREATE TABLE IF NOT EXISTS post_processing_runs (
+        idempotency_key VARCHAR(255) PRIMARY KEY,
+        kind VARCHAR(50) NOT NULL,
+        job_id UUID REFERENCES jobs(id) ON DELETE CASCADE,
+        status VARCHAR(20) NOT NULL CHECK (status IN ('running', 'done', 'failed')),
+        attempts INTEGER NOT NULL DEFAULT 1,
+        error_message TEXT,
+        created_at TIMESTAMP DEFAULT NOW(),
+        updated_at TIMESTAMP DEFAULT NOW()
+    )""",
+    # Failed symbols count toward settling a research job
+    """ALTER TABLE job_tracker ADD COLUMN IF NOT EXISTS symbols_failed INTEGER NOT NULL DEFAULT 0""",
+    # Cross-user symbol research registry (freshness reuse + in-flight coalescing)
+    """CREATE TABLE IF NOT EXISTS symbol_research (
+        symbol VARCHAR(20) PRIMARY KEY,
+        researched_at TIMESTAMP,
+        vector_ids JSONB NOT NULL DEFAULT '[]',
+        last_job_id UUID,
+        in_flight_job_id UUID,
+        in_flight_since TIMESTAMP
+    )""",
+    """CREATE INDEX IF NOT EXISTS idx_job_tracker_items_waiting
+        ON job_tracker_items (symbol) WHERE status = 'waiting'""",
+    """CREATE TABLE IF NOT EXISTS report_cache (
+        cache_key CHAR(64) PRIMARY KEY,
+        report_payload JSONB NOT NULL,
+        source_job_id UUID,
+        created_at TIMESTAMP DEFAULT NOW()
+    )""",
 ]
 
 print("🚀 Running database migrations...")
@@ -260,6 +328,10 @@ for i, stmt in enumerate(statements, 1):
         stmt_type = "extension"
     elif "ALTER TABLE" in stmt.upper():
         stmt_type = "alter table"
+    elif "CREATE UNIQUE INDEX" in stmt.upper():
+        stmt_type = "unique index"
+    elif stmt.upper().lstrip().startswith("UPDATE"):
+        stmt_type = "data fix"
     # First non-empty line for display
     first_line = next(l for l in stmt.split("\n") if l.strip())[:60]
     print(f"\n[{i}/{len(statements)}] Creating {stmt_type}...")
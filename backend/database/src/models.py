@@ -142,6 +142,55 @@ class Instruments(BaseModel):
         ]
         return self.db.query_raw(sql, params)
 
+    def find_stale_symbols(self, symbols: List[str], max_age_minutes: int) -> List[str]:
+        """Return the symbols whose price is missing or older than max_age_minutes"""
+        if not symbols:
+            return []
+
+        placeholders = ", ".join([f":symbol{i}" for i in range(len(symbols))])
+        sql = f"""
+            SELECT symbol FROM {self.table_name}
+            WHERE symbol IN ({placeholders})
+              AND (
+                current_price IS NULL
+                OR price_updated_at IS NULL
+                OR price_updated_at < NOW() - make_interval(mins => :max_age)
+              )
+            ORDER BY symbol
+        """
+        params = [
+            {'name': f'symbol{i}', 'value': {'stringValue': sym}}
+            for i, sym in enumerate(symbols)
+        ]
+        params.append({'name': 'max_age', 'value': {'longValue': int(max_age_minutes)}})
+        return [row['symbol'] for row in self.db.query(sql, params)]
+
+    def update_prices(self, prices: Dict[str, float], mark_updated: bool = True) -> int:
+        """
+        Write current_price for many symbols in one statement. Only real
+        market data (mark_updated) stamps price_updated_at; placeholder prices
+        only fill instruments without a price and never look fresh to
+        find_stale_symbols.
+        """
+        if not prices:
+            return 0
+
+        values = []
+        params = []
+        for i, (symbol, price) in enumerate(prices.items()):
+            values.append(f"(:symbol{i}, :price{i})")
+            params.append({'name': f'symbol{i}', 'value': {'stringValue': symbol}})
+            params.append({'name': f'price{i}', 'value': {'doubleValue': float(price)}})
+
+        sql = f"""
+            UPDATE {self.table_name} AS i
+            SET current_price = v.price::numeric{", price_updated_at = NOW()" if mark_updated else ""}
+            FROM (VALUES {", ".join(values)}) AS v(symbol, price)
+            WHERE i.symbol = v.symbol{"" if mark_updated else " AND i.current_price IS NULL"}
+        """
+        response = self.db.execute(sql, params)
+        return response.get('numberOfRecordsUpdated', 0)
+
 class Accounts(BaseModel):
     """Accounts table operations"""
     table_name = 'accounts'
@@ -185,7 +234,19 @@ class Positions(BaseModel):
         """
         params = [{'name': 'account_id', 'value': {'stringValue': account_id}}]
         return self.db.query(sql, params)
-    
+
+    def find_symbols_by_user(self, clerk_user_id: str) -> List[str]:
+        """Find all distinct symbols held across a user's accounts"""
+        sql = f"""
+            SELECT DISTINCT p.symbol
+            FROM {self.table_name} p
+            JOIN accounts a ON p.account_id = a.id
+            WHERE a.clerk_user_id = :user_id
+            ORDER BY p.symbol
+        """
+        params = [{'name': 'user_id', 'value': {'stringValue': clerk_user_id}}]
+        return [row['symbol'] for row in self.db.query(sql, params)]
+
     def get_portfolio_value(self, account_id: str) -> Dict:
         """Calculate total portfolio value using current prices from instruments table"""
         sql = """
@@ -0,0 +1,112 @@
+"""
+Token-aware, sentence-aware chunking for the knowledge base.
+
+The embedding model (all-MiniLM-L6-v2 by default) reads at most 256 word
+pieces and silently truncates the rest, so a whole research report
+embedded as one vector is mostly ignored. Text is split into sentences,
+sentences are packed into chunks under a token budget, and consecutive
+chunks share a few trailing sentences of overlap:
+
+    chunks = chunk_text(report)          # ["First sentences...", ...]
+
+There is no tokenizer in the Lambda package; token counts are estimated
+from words and punctuation, leaving headroom under the model limit.
+"""
+
+import os
+import re
+
+# Target size per chunk and overlap carried into the next chunk, in tokens
+CHUNK_TOKENS = int(os.environ.get('CHUNK_TOKENS', '200'))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get('CHUNK_OVERLAP_TOKENS', '40'))
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+# Sentence ends: terminal punctuation followed by whitespace and a capital,
+# digit, quote or bracket; or a line break (bullets, headings, paragraphs)
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])|\s*\n+\s*")
+
+# A period after these is not a sentence end ("U.S. GDP", "Apple Inc. beat")
+_ABBREVIATION_RE = re.compile(
+    r"(?:\b(?:[A-Za-z]\.){2,}|\b[A-Z]\.|\b(?:Inc|Corp|Co|Ltd|Mr|Mrs|Ms|Dr|St|vs|etc|approx|No|Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.)$"
+)
+
+# Word pieces: roughly one per 6 characters of a word
+_CHARS_PER_PIECE = 6
+
+
+def estimate_tokens(text):
+    """Approximate word-piece count for text."""
+    return sum(1 + (len(tok) - 1) // _CHARS_PER_PIECE for tok in _TOKEN_RE.findall(text))
+
+
+def split_sentences(text):
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        candidate = text[start:match.start()]
+        if "\n" not in match.group() and _ABBREVIATION_RE.search(candidate):
+            continue
+        sentences.append(candidate)
+        start = match.end()
+    sentences.append(text[start:])
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def _split_long_sentence(sentence, max_tokens):
+    """Hard-split a sentence that alone exceeds the budget, on word boundaries."""
+    parts, current, current_tokens = [], [], 0
+    for word in sentence.split():
+        tokens = estimate_tokens(word)
+        if current and current_tokens + tokens > max_tokens:
+            parts.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += tokens
+    if current:
+        parts.append(" ".join(current))
+    return parts
+
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """
+    Split text into chunks of at most ~max_tokens, on sentence boundaries.
+    Each chunk after the first starts with the trailing sentences (up to
+    ~overlap_tokens) of the previous one.
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    sentences = []
+    for sentence in split_sentences(text):
+        if estimate_tokens(sentence) > max_tokens:
+            sentences.extend(_split_long_sentence(sentence, max_tokens))
+        else:
+            sentences.append(sentence)
+
+    chunks = []
+    current, current_tokens = [], 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(current))
+
+            # Carry the tail of this chunk into the next one as overlap
+            overlap, overlap_total = [], 0
+            for previous in reversed(current):
+                previous_tokens = estimate_tokens(previous)
+                if overlap_total + previous_tokens > overlap_tokens or overlap_total + previous_tokens + tokens > max_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_total += previous_tokens
+            current, current_tokens = overlap, overlap_total
+
+        current.append(sentence)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
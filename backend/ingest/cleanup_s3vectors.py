@@ -1,11 +1,25 @@
 """
-Clean up S3 Vectors database by removing all test data.
+Clean up the S3 Vectors index: delete everything, or apply a retention policy.
 This script directly accesses S3 Vectors without going through API Gateway.
+
+Pages through list_vectors (no embedding or similarity queries) and
+deletes in DeleteVectors-sized batches:
+
+    uv run cleanup_s3vectors.py                           # delete ALL vectors (asks first)
+    uv run cleanup_s3vectors.py --older-than-days 90      # drop research older than 90 days
+    uv run cleanup_s3vectors.py --where symbol=AAPL       # drop one symbol's research
+    uv run cleanup_s3vectors.py --older-than-days 30 --where topic="Market Outlook" --dry-run
+
+Age is read from metadata.timestamp; vectors without one are kept by an
+age policy unless --include-undated is given. Several --where clauses must
+all match.
 """
 
+import argparse
 import os
-import json
-import boto3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -13,107 +27,168 @@ from pathlib import Path
 env_path = Path(__file__).parent.parent.parent / '.env'
 load_dotenv(env_path, override=True)
 
+# Shared vector store factory lives in backend/common
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from common.vector_store import get_vector_client
+
 # Get configuration
 VECTOR_BUCKET = os.getenv('VECTOR_BUCKET')
 INDEX_NAME = 'financial-research'
 
+# Service limits
+LIST_PAGE_SIZE = 1000    # ListVectors maxResults
+DELETE_BATCH_SIZE = 500  # DeleteVectors keys per call
+
 if not VECTOR_BUCKET:
     print("Error: VECTOR_BUCKET not found in .env")
     exit(1)
 
-# Initialize S3 Vectors client
-s3_vectors = boto3.client('s3vectors')
+# Initialize S3 Vectors client (or the local store with VECTOR_STORE=local)
+s3_vectors = get_vector_client()
 
-def delete_all_vectors():
-    """Delete all vectors from the index."""
-    print("Cleaning S3 Vectors database...")
+
+def parse_timestamp(value):
+    try:
+        ts = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def matches_policy(metadata, cutoff=None, where=None, include_undated=False):
+    """True if a vector with this metadata should be deleted."""
+    for field, expected in (where or {}).items():
+        if str(metadata.get(field)) != expected:
+            return False
+    if cutoff is not None:
+        ts = parse_timestamp(metadata.get('timestamp')) if metadata.get('timestamp') else None
+        if ts is None:
+            return include_undated
+        return ts < cutoff
+    return True
+
+
+def list_all(return_metadata):
+    """Yield every vector in the index, one ListVectors page at a time."""
+    token = None
+    while True:
+        kwargs = {'nextToken': token} if token else {}
+        response = s3_vectors.list_vectors(
+            vectorBucketName=VECTOR_BUCKET,
+            indexName=INDEX_NAME,
+            maxResults=LIST_PAGE_SIZE,
+            returnMetadata=return_metadata,
+            **kwargs
+        )
+        yield from response.get('vectors', [])
+        token = response.get('nextToken')
+        if not token:
+            break
+
+
+def delete_keys(keys):
+    """Delete keys in DELETE_BATCH_SIZE batches; returns the number deleted."""
+    deleted = 0
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[start:start + DELETE_BATCH_SIZE]
+        try:
+            s3_vectors.delete_vectors(vectorBucketName=VECTOR_BUCKET, indexName=INDEX_NAME, keys=batch)
+            deleted += len(batch)
+            print(f"  Deleted {deleted}/{len(keys)}")
+        except Exception as e:
+            print(f"  Error deleting batch of {len(batch)} starting at {batch[0]}: {e}")
+    return deleted
+
+
+def cleanup(cutoff=None, where=None, include_undated=False, dry_run=False):
+    """
+    Delete the vectors matching the policy (all vectors with no policy).
+    Keys are collected first and deleted afterwards, so deletes cannot
+    shift the pages still being listed.
+    """
     print(f"Bucket: {VECTOR_BUCKET}")
     print(f"Index: {INDEX_NAME}")
     print()
-    
-    deleted_count = 0
-    
-    try:
-        # S3 Vectors doesn't have a list operation, so we need to search broadly
-        print("Searching for vectors to delete...")
-        
-        # Get a real embedding for a generic search term
-        sagemaker_runtime = boto3.client('sagemaker-runtime')
-        SAGEMAKER_ENDPOINT = os.getenv('SAGEMAKER_ENDPOINT', 'alex-embedding-endpoint')
-        
-        response = sagemaker_runtime.invoke_endpoint(
-            EndpointName=SAGEMAKER_ENDPOINT,
-            ContentType='application/json',
-            Body='{"inputs": "document"}'
-        )
-        
-        result = json.loads(response['Body'].read().decode())
-        # Extract from nested array [[[embedding]]]
-        dummy_vector = result[0][0]
-        
-        # S3 Vectors limits topK to 30, so we need to loop
-        all_vectors = []
-        batch_size = 30
-        
-        while True:
-            response = s3_vectors.query_vectors(
-                vectorBucketName=VECTOR_BUCKET,
-                indexName=INDEX_NAME,
-                queryVector={"float32": dummy_vector},
-                topK=batch_size,
-                returnMetadata=True
-            )
-            
-            vectors = response.get('vectors', [])
-            if not vectors:
-                break
-                
-            all_vectors.extend(vectors)
-            
-            # Delete this batch before getting more
-            print(f"  Found batch of {len(vectors)} vectors...")
-            for vector in vectors:
-                try:
-                    s3_vectors.delete_vectors(
-                        vectorBucketName=VECTOR_BUCKET,
-                        indexName=INDEX_NAME,
-                        keys=[vector['key']]
-                    )
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"  Error deleting {vector['key']}: {e}")
-            
-            # If we got less than batch_size, we're done
-            if len(vectors) < batch_size:
-                break
-        
-        if deleted_count > 0:
-            print(f"\n✅ Successfully deleted {deleted_count} vectors")
-        else:
-            print("✅ No vectors found - database is already empty")
-            
-    except Exception as e:
-        print(f"❌ Error during cleanup: {e}")
-        if deleted_count > 0:
-            print(f"   (Partially successful - deleted {deleted_count} vectors)")
+
+    started = time.perf_counter()
+    scanned = 0
+    keys = []
+    needs_metadata = cutoff is not None or bool(where)
+    for vector in list_all(return_metadata=needs_metadata):
+        scanned += 1
+        if matches_policy(vector.get('metadata', {}), cutoff, where, include_undated):
+            keys.append(vector['key'])
+    list_seconds = time.perf_counter() - started
+    print(f"Scanned {scanned} vectors in {list_seconds:.1f}s "
+          f"({scanned / max(list_seconds, 1e-9):,.0f}/s); {len(keys)} match")
+
+    if dry_run or not keys:
+        if dry_run:
+            print("Dry run: nothing deleted")
+        return {'scanned': scanned, 'matched': len(keys), 'deleted': 0}
+
+    started = time.perf_counter()
+    deleted = delete_keys(keys)
+    delete_seconds = time.perf_counter() - started
+    print(f"\n✅ Deleted {deleted} vectors in {delete_seconds:.1f}s "
+          f"({deleted / max(delete_seconds, 1e-9):,.0f}/s)")
+    if deleted < len(keys):
+        print(f"   ({len(keys) - deleted} failed; re-run to retry)")
+    return {'scanned': scanned, 'matched': len(keys), 'deleted': deleted}
+
+
+def delete_all_vectors():
+    """Delete all vectors from the index."""
+    print("Cleaning S3 Vectors database...")
+    return cleanup()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Delete vectors from the S3 Vectors index")
+    parser.add_argument('--older-than-days', type=float, help="delete vectors whose timestamp is older than this")
+    parser.add_argument('--where', action='append', default=[], metavar='FIELD=VALUE',
+                        help="delete only vectors whose metadata FIELD equals VALUE (repeatable)")
+    parser.add_argument('--include-undated', action='store_true',
+                        help="with --older-than-days, also delete vectors without a timestamp")
+    parser.add_argument('--dry-run', action='store_true', help="report what would be deleted")
+    parser.add_argument('--yes', action='store_true', help="do not ask for confirmation")
+    return parser.parse_args()
+
 
 def main():
     """Clean up the S3 Vectors database."""
+    args = parse_args()
+    where = dict(clause.split('=', 1) for clause in args.where)
+    cutoff = (
+        datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+        if args.older_than_days is not None else None
+    )
+
     print("=" * 60)
     print("S3 Vectors Database Cleanup")
     print("=" * 60)
     print()
-    
+
+    if cutoff is None and not where:
+        policy = "ALL vectors"
+    else:
+        parts = [f"older than {args.older_than_days:g} days"] if cutoff else []
+        parts += [f"{k}={v}" for k, v in where.items()]
+        policy = "vectors " + ", ".join(parts)
+
     # Confirm before deleting
-    response = input("⚠️  This will DELETE ALL vectors. Continue? (yes/no): ")
-    if response.lower() != 'yes':
-        print("Cleanup cancelled.")
-        return
-    
+    if not args.dry_run and not args.yes:
+        response = input(f"⚠️  This will DELETE {policy}. Continue? (yes/no): ")
+        if response.lower() != 'yes':
+            print("Cleanup cancelled.")
+            return
+
     print()
-    delete_all_vectors()
-    
-    print("\n💡 Tip: Run test_api.py to add new test data")
+    cleanup(cutoff, where, args.include_undated, args.dry_run)
+
+    if cutoff is None and not where:
+        print("\n💡 Tip: Run test_api.py to add new test data")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
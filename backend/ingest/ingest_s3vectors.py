@@ -1,45 +1,204 @@
 """
 Lambda function for ingesting text into S3 Vectors with embeddings.
+
+Accepts one document ({"text", "metadata"}) or a batch ({"documents": [...]}).
+Long texts are split into sentence-aware chunks under the embedding model's
+token limit (see chunker.py), chunks are embedded in batched SageMaker
+calls (common.embeddings, which skips unchanged text), and vectors are written in large put_vectors batches, so a batch of
+documents costs a handful of calls instead of two per document.
 """
 
 import json
+import math
 import os
-import boto3
 import datetime
-import uuid
+import hashlib
+
+from chunker import chunk_text
+from common.embeddings import get_embedding_client
+from common.vector_store import get_vector_client
 
 # Environment variables
 VECTOR_BUCKET = os.environ.get('VECTOR_BUCKET', 'alex-vectors')
-SAGEMAKER_ENDPOINT = os.environ.get('SAGEMAKER_ENDPOINT')
 INDEX_NAME = os.environ.get('INDEX_NAME', 'financial-research')
 
-# Initialize AWS clients
-sagemaker_runtime = boto3.client('sagemaker-runtime')
-s3_vectors = boto3.client('s3vectors')
+# Batching limits
+PUT_BATCH_SIZE = 500  # S3 Vectors PutVectors maximum
+MAX_DOCUMENTS = int(os.environ.get('MAX_DOCUMENTS', '100'))
+
+# Deduplication: metadata that identifies a document's source, hashed with its
+# text into the vector key; and an optional cosine-distance threshold under
+# which a document counts as a near-duplicate of its nearest stored neighbour
+# with the same source metadata
+DEDUP_METADATA_KEYS = ('source', 'symbol', 'topic')
+NEAR_DUPLICATE_DISTANCE = (
+    float(os.environ['NEAR_DUPLICATE_DISTANCE']) if os.environ.get('NEAR_DUPLICATE_DISTANCE') else None
+)
+
+# Initialize clients (embeddings go through the shared cached client;
+# VECTOR_STORE=local swaps S3 Vectors for the local store)
+s3_vectors = get_vector_client()
+
+
+def put_vectors(vectors):
+    """Write vectors in PUT_BATCH_SIZE batches."""
+    for start in range(0, len(vectors), PUT_BATCH_SIZE):
+        s3_vectors.put_vectors(
+            vectorBucketName=VECTOR_BUCKET,
+            indexName=INDEX_NAME,
+            vectors=vectors[start:start + PUT_BATCH_SIZE]
+        )
+
+
+def normalize_text(text):
+    """Case- and whitespace-insensitive form of text, for content hashing."""
+    return " ".join(text.lower().split())
+
+
+def dedup_scope(metadata):
+    """The DEDUP_METADATA_KEYS a document sets, e.g. {"symbol": "MSFT"}."""
+    return {k: metadata[k] for k in DEDUP_METADATA_KEYS if metadata.get(k) is not None}
+
 
+def document_key(text, metadata):
+    """
+    Deterministic document id: hash of the normalized text plus its source
+    metadata. Re-ingesting the same analysis yields the same keys, so
+    put_vectors overwrites instead of adding duplicates.
+    """
+    payload = json.dumps({"text": normalize_text(text), "source": dedup_scope(metadata)}, sort_keys=True)
+    return "doc-" + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def cosine_distance(a, b):
+    """1 - cosine similarity, the metric of the index (cosine)."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return 1.0 - dot / norm if norm else 1.0
+
+
+def find_batch_duplicate(embedding, scope, accepted):
+    """
+    First-chunk key of a document accepted earlier in this request within
+    NEAR_DUPLICATE_DISTANCE, if any, among those matching scope.
+    """
+    for key, other, other_metadata in accepted:
+        if all(other_metadata.get(k) == v for k, v in scope.items()) \
+                and cosine_distance(embedding, other) <= NEAR_DUPLICATE_DISTANCE:
+            return key
+    return None
 
-def get_embedding(text):
-    """Get embedding vector from SageMaker endpoint."""
-    response = sagemaker_runtime.invoke_endpoint(
-        EndpointName=SAGEMAKER_ENDPOINT,
-        ContentType='application/json',
-        Body=json.dumps({'inputs': text})
+
+def find_near_duplicate(embedding, scope, document_id):
+    """
+    Key of the nearest stored vector matching scope (see dedup_scope) if it
+    is within NEAR_DUPLICATE_DISTANCE of another document. Scoping keeps one
+    symbol's analysis from being skipped as a copy of another's.
+    """
+    query = {"filter": scope} if scope else {}
+    response = s3_vectors.query_vectors(
+        vectorBucketName=VECTOR_BUCKET,
+        indexName=INDEX_NAME,
+        queryVector={"float32": embedding},
+        topK=1,
+        returnDistance=True,
+        returnMetadata=True,
+        **query
     )
-    
-    result = json.loads(response['Body'].read().decode())
-    # HuggingFace returns nested array [[[embedding]]], extract the actual embedding
-    if isinstance(result, list) and len(result) > 0:
-        if isinstance(result[0], list) and len(result[0]) > 0:
-            if isinstance(result[0][0], list):
-                return result[0][0]  # Extract from [[[embedding]]]
-            return result[0]  # Extract from [[embedding]]
-    return result  # Return as-is if not nested
+    for vector in response.get('vectors', []):
+        parent = vector.get('metadata', {}).get('parent_id') or vector['key']
+        if parent != document_id and vector.get('distance', 1.0) <= NEAR_DUPLICATE_DISTANCE:
+            return vector['key']
+    return None
+
+
+def ingest_documents(documents):
+    """
+    Chunk, embed and store a batch of {"text", "metadata"} documents.
+
+    Returns one {"document_id", "chunk_ids"} per document. A document that
+    fits in one chunk keeps its document_id as the vector key. Every chunk
+    carries chunk_id and parent_id (the document_id) in its metadata, so
+    retrieval can de-duplicate chunks of the same document.
+
+    Document ids are content hashes (unless the caller passes "id"), so a
+    repeated document is an upsert. With NEAR_DUPLICATE_DISTANCE set, a
+    document whose first chunk is that close to another stored document with
+    the same source metadata, or to one accepted earlier in the same request,
+    is skipped and reported with "duplicate_of".
+
+    Raises ValueError for a document without text (nothing to embed).
+    """
+    timestamp = datetime.datetime.utcnow().isoformat()
+    results = []
+    planned = []  # (result, keys, chunks, metadata) per distinct document
+    seen = {}
+
+    for doc in documents:
+        metadata = doc.get('metadata', {})
+        document_id = doc.get('id') or document_key(doc['text'], metadata)
+        if document_id in seen:
+            # Same document twice in one request: write it once
+            results.append(seen[document_id])
+            continue
+
+        chunks = chunk_text(doc['text'])
+        if not chunks:
+            raise ValueError(f"Document {document_id} has no text to index")
+        keys = [document_id] if len(chunks) == 1 else [f"{document_id}#{i}" for i in range(len(chunks))]
+        result = {"document_id": document_id, "chunk_ids": keys}
+        seen[document_id] = result
+        results.append(result)
+        planned.append((result, keys, chunks, metadata))
+
+    chunk_texts = [chunk for _, _, chunks, _ in planned for chunk in chunks]
+    print(f"Embedding {len(chunk_texts)} chunk(s) from {len(documents)} document(s)")
+    embedder = get_embedding_client()
+    embeddings = iter(embedder.embed_many(chunk_texts))
+    print(f"[Ingest] embeddings {json.dumps(embedder.metrics.as_dict())}")
+
+    vectors = []
+    skipped = 0
+    accepted = []  # (first chunk key, its embedding, metadata) per document written by this request
+    for result, keys, chunks, metadata in planned:
+        doc_embeddings = [next(embeddings) for _ in chunks]
+
+        if NEAR_DUPLICATE_DISTANCE is not None:
+            # Earlier documents of this request are not in the index yet
+            scope = dedup_scope(metadata)
+            duplicate_of = (
+                find_batch_duplicate(doc_embeddings[0], scope, accepted)
+                or find_near_duplicate(doc_embeddings[0], scope, result["document_id"])
+            )
+            if duplicate_of:
+                result["duplicate_of"] = duplicate_of
+                result["chunk_ids"] = [duplicate_of]
+                skipped += 1
+                continue
+            accepted.append((keys[0], doc_embeddings[0], metadata))
+
+        for i, (key, chunk, embedding) in enumerate(zip(keys, chunks, doc_embeddings)):
+            vectors.append({"key": key, "data": {"float32": embedding}, "metadata": {
+                "text": chunk,
+                "timestamp": timestamp,
+                "chunk_id": key,
+                "parent_id": result["document_id"],
+                "chunk_index": i,
+                "chunk_count": len(chunks),
+                **metadata  # Include any additional metadata
+            }})
+
+    print(f"Storing {len(vectors)} vector(s) in bucket: {VECTOR_BUCKET}, index: {INDEX_NAME} "
+          f"({skipped} near-duplicate document(s) skipped)")
+    put_vectors(vectors)
+
+    return results
 
 
 def lambda_handler(event, context):
     """
     Main Lambda handler.
-    Expects JSON body with:
+    Expects JSON body with either one document:
     {
         "text": "Text to ingest",
         "metadata": {
@@ -47,6 +206,13 @@ def lambda_handler(event, context):
             "category": "optional category"
         }
     }
+    or a batch:
+    {
+        "documents": [
+            {"text": "...", "metadata": {...}},
+            ...
+        ]
+    }
     """
     try:
         # Parse the request body
@@ -54,44 +220,48 @@ def lambda_handler(event, context):
             body = json.loads(event['body'])
         else:
             body = event.get('body', {})
-        
-        text = body.get('text')
-        metadata = body.get('metadata', {})
-        
-        if not text:
+
+        batch = 'documents' in body
+        documents = body.get('documents') if batch else [{
+            'text': body.get('text'),
+            'metadata': body.get('metadata', {}),
+        }]
+
+        if not isinstance(documents, list) or not documents:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': 'documents must be a non-empty list'})
+            }
+        if len(documents) > MAX_DOCUMENTS:
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': f'At most {MAX_DOCUMENTS} documents per request'})
+            }
+        if any(
+            not isinstance(doc, dict) or not isinstance(doc.get('text'), str) or not doc['text'].strip()
+            for doc in documents
+        ):
             return {
                 'statusCode': 400,
                 'body': json.dumps({'error': 'Missing required field: text'})
             }
-        
-        # Get embedding from SageMaker
-        print(f"Getting embedding for text: {text[:100]}...")
-        embedding = get_embedding(text)
-        
-        # Generate unique ID for the vector
-        vector_id = str(uuid.uuid4())
-        
-        # Store in S3 Vectors
-        print(f"Storing vector in bucket: {VECTOR_BUCKET}, index: {INDEX_NAME}")
-        s3_vectors.put_vectors(
-            vectorBucketName=VECTOR_BUCKET,
-            indexName=INDEX_NAME,
-            vectors=[{
-                "key": vector_id,
-                "data": {"float32": embedding},
-                "metadata": {
-                    "text": text,
-                    "timestamp": datetime.datetime.utcnow().isoformat(),
-                    **metadata  # Include any additional metadata
-                }
-            }]
-        )
-        
+
+        results = ingest_documents(documents)
+
+        if not batch:
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Document indexed successfully',
+                    **results[0],
+                })
+            }
         return {
             'statusCode': 200,
             'body': json.dumps({
-                'message': 'Document indexed successfully',
-                'document_id': vector_id
+                'message': f'{len(results)} documents indexed successfully',
+                'documents': results,
+                'vector_count': sum(len(r['chunk_ids']) for r in results),
             })
         }
     except Exception as e:
@@ -99,4 +269,4 @@ def lambda_handler(event, context):
         return {
             'statusCode': 500,
             'body': json.dumps({'error': str(e)})
-        }
\ No newline at end of file
+        }
@@ -58,6 +58,15 @@ def create_deployment_package():
         shutil.copy(current_dir / 'ingest_s3vectors.py', package_dir)
     if (current_dir / 'search_s3vectors.py').exists():
         shutil.copy(current_dir / 'search_s3vectors.py', package_dir)
+    if (current_dir / 'chunker.py').exists():
+        shutil.copy(current_dir / 'chunker.py', package_dir)
+
+    # Shared embedding client and vector store factory (backend/common);
+    # the local store is left out, it needs numpy and is for offline runs only
+    common_dir = current_dir.parent / 'common'
+    (package_dir / 'common').mkdir(exist_ok=True)
+    for name in ('__init__.py', 'aws_clients.py', 'embeddings.py', 'vector_store.py'):
+        shutil.copy(common_dir / name, package_dir / 'common' / name)
     
     # Create ZIP file
     print("Creating deployment package...")
@@ -4,34 +4,16 @@ Lambda function for searching S3 Vectors.
 
 import json
 import os
-import boto3
+
+from common.embeddings import get_embedding_client
+from common.vector_store import get_vector_client
 
 # Environment variables
 VECTOR_BUCKET = os.environ.get('VECTOR_BUCKET', 'alex-vectors')
-SAGEMAKER_ENDPOINT = os.environ.get('SAGEMAKER_ENDPOINT')
 INDEX_NAME = os.environ.get('INDEX_NAME', 'financial-research')
 
-# Initialize AWS clients
-sagemaker_runtime = boto3.client('sagemaker-runtime')
-s3_vectors = boto3.client('s3vectors')
-
-
-def get_embedding(text):
-    """Get embedding vector from SageMaker endpoint."""
-    response = sagemaker_runtime.invoke_endpoint(
-        EndpointName=SAGEMAKER_ENDPOINT,
-        ContentType='application/json',
-        Body=json.dumps({'inputs': text})
-    )
-    
-    result = json.loads(response['Body'].read().decode())
-    # HuggingFace returns nested array [[[embedding]]], extract the actual embedding
-    if isinstance(result, list) and len(result) > 0:
-        if isinstance(result[0], list) and len(result[0]) > 0:
-            if isinstance(result[0][0], list):
-                return result[0][0]  # Extract from [[[embedding]]]
-            return result[0]  # Extract from [[embedding]]
-    return result  # Return as-is if not nested
+# Initialize clients (VECTOR_STORE=local swaps S3 Vectors for the local store)
+s3_vectors = get_vector_client()
 
 
 def lambda_handler(event, context):
@@ -60,7 +42,7 @@ def lambda_handler(event, context):
     
     # Get embedding for query
     print(f"Getting embedding for query: {query_text}")
-    query_embedding = get_embedding(query_text)
+    query_embedding = get_embedding_client().embed(query_text)
     
     # Search S3 Vectors
     print(f"Searching in bucket: {VECTOR_BUCKET}, index: {INDEX_NAME}")
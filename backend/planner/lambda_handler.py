@@ -71,8 +71,8 @@ async def run_orchestrator(job_id: str) -> None:
         # Handle missing instruments first (non-agent pre-processing)
         await asyncio.to_thread(handle_missing_instruments, job_id, db)
 
-        # Update instrument prices after tagging
-        logger.info("Planner: Updating instrument prices from market data")
+        # Refresh stale instrument prices after tagging (fresh ones are reused)
+        logger.info("Planner: Refreshing stale instrument prices from market data")
         await asyncio.to_thread(update_instrument_prices, job_id, db)
 
         # Load portfolio summary (just statistics, not full data)
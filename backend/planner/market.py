@@ -2,24 +2,29 @@
 Market data functions using polygon.io for fetching real-time prices.
 """
 
+import os
 import logging
 from typing import Set
-from prices import get_share_price
+from prices import get_share_prices
 
 logger = logging.getLogger()
 
+# Prices written within this window (by the scheduled price_refresher or an
+# earlier job) are reused as-is; only older or missing prices are fetched.
+PRICE_FRESHNESS_MINUTES = int(os.getenv("PRICE_FRESHNESS_MINUTES", "1440"))
+
 
 def update_instrument_prices(job_id: str, db) -> None:
     """
-    Fetch current prices for all instruments in the user's portfolio using polygon.io.
-    Updates the instruments table with current prices.
+    Refresh stale prices for the instruments in the user's portfolio using polygon.io.
+    Symbols whose price_updated_at falls inside PRICE_FRESHNESS_MINUTES are skipped.
 
     Args:
         job_id: The job ID to identify the user's portfolio
         db: Database instance
     """
     try:
-        logger.info(f"Market: Fetching current prices for job {job_id}")
+        logger.info(f"Market: Checking price freshness for job {job_id}")
 
         # Get the job to find the user
         job = db.jobs.find_by_id(job_id)
@@ -30,22 +35,23 @@ def update_instrument_prices(job_id: str, db) -> None:
         user_id = job['clerk_user_id']
 
         # Get all unique symbols from user's positions
-        accounts = db.accounts.find_by_user(user_id)
-        symbols = set()
-
-        for account in accounts:
-            positions = db.positions.find_by_account(account['id'])
-            for position in positions:
-                symbols.add(position['symbol'])
+        symbols = db.positions.find_symbols_by_user(user_id)
 
         if not symbols:
             logger.info("Market: No symbols to update prices for")
             return
 
-        logger.info(f"Market: Fetching prices for {len(symbols)} symbols: {symbols}")
+        stale = db.instruments.find_stale_symbols(symbols, PRICE_FRESHNESS_MINUTES)
+        if not stale:
+            logger.info(
+                f"Market: All {len(symbols)} prices fresher than "
+                f"{PRICE_FRESHNESS_MINUTES} minutes; skipping market data"
+            )
+            return
+
+        logger.info(f"Market: Refreshing {len(stale)}/{len(symbols)} stale prices: {stale}")
 
-        # Update prices for each symbol
-        update_prices_for_symbols(symbols, db)
+        update_prices_for_symbols(set(stale), db)
 
         logger.info("Market: Price update complete")
 
@@ -56,7 +62,7 @@ def update_instrument_prices(job_id: str, db) -> None:
 
 def update_prices_for_symbols(symbols: Set[str], db) -> None:
     """
-    Fetch and update prices for a set of symbols using polygon.io.
+    Fetch prices for a set of symbols in one batch and write them in one statement.
 
     Args:
         symbols: Set of ticker symbols to update
@@ -66,43 +72,24 @@ def update_prices_for_symbols(symbols: Set[str], db) -> None:
         logger.info("Market: No symbols to update")
         return
 
-    symbols_list = list(symbols)
-    price_map = {}
-
-    # Fetch price for each symbol using polygon.io
-    for symbol in symbols_list:
-        try:
-            price = get_share_price(symbol)
-            if price > 0:
-                price_map[symbol] = price
-                logger.info(f"Market: Retrieved {symbol} price: ${price:.2f}")
-            else:
-                logger.warning(f"Market: No price available for {symbol}")
-        except Exception as e:
-            logger.warning(f"Market: Could not fetch price for {symbol}: {e}")
+    symbols_list = sorted(symbols)
 
+    try:
+        fetched, live = get_share_prices(symbols_list)
+    except Exception as e:
+        logger.warning(f"Market: Could not fetch prices for {symbols_list}: {e}")
+        return
+
+    price_map = {symbol: price for symbol, price in fetched.items() if price and price > 0}
     logger.info(f"Market: Retrieved prices for {len(price_map)}/{len(symbols_list)} symbols")
 
-    # Update database with fetched prices
-    for symbol, price in price_map.items():
-        try:
-            instrument = db.instruments.find_by_symbol(symbol)
-            if instrument:
-                update_data = {'current_price': price}
-                success = db.client.update(
-                    'instruments',
-                    update_data,
-                    "symbol = :symbol",
-                    {'symbol': symbol}
-                )
-                if success:
-                    logger.info(f"Market: Updated {symbol} price to ${price:.2f}")
-                else:
-                    logger.warning(f"Market: Failed to update price for {symbol}")
-            else:
-                logger.warning(f"Market: Instrument {symbol} not found in database")
-        except Exception as e:
-            logger.error(f"Market: Error updating {symbol} in database: {e}")
+    try:
+        # Placeholder prices keep the portfolio valued but leave
+        # price_updated_at alone, so the next job fetches real ones
+        updated = db.instruments.update_prices(price_map, mark_updated=live)
+        logger.info(f"Market: Updated {updated} instrument prices" + ("" if live else " (placeholders)"))
+    except Exception as e:
+        logger.error(f"Market: Error writing prices to database: {e}")
 
     # Log symbols that didn't get prices
     missing = set(symbols_list) - set(price_map.keys())
@@ -56,6 +56,33 @@ def get_share_price_polygon(symbol) -> float:
         return get_share_price_polygon_eod(symbol)
 
 
+def get_share_prices_polygon(symbols: list[str]) -> dict[str, float]:
+    if is_paid_polygon:
+        client = RESTClient(polygon_api_key)
+        snapshots = client.get_snapshot_all("stocks", tickers=list(symbols))
+        return {
+            snap.ticker: (snap.min.close if snap.min and snap.min.close else snap.prev_day.close)
+            for snap in snapshots
+        }
+    today = datetime.now().date().strftime("%Y-%m-%d")
+    market_data = get_market_for_prior_date(today)
+    return {symbol: market_data[symbol] for symbol in symbols if symbol in market_data}
+
+
+def get_share_prices(symbols: list[str]) -> tuple[dict[str, float], bool]:
+    """
+    Fetch prices for many symbols with a single market-data call where possible.
+    Returns (prices, live): live is False for the random placeholder prices
+    used without polygon, which must not be recorded as fresh market data.
+    """
+    if polygon_api_key:
+        try:
+            return get_share_prices_polygon(symbols), True
+        except Exception as e:
+            print(f"Was not able to use the polygon API due to {e}; using random numbers")
+    return {symbol: float(random.randint(1, 100)) for symbol in symbols}, False
+
+
 def get_share_price(symbol) -> float:
     if polygon_api_key:
         try:
@@ -24,7 +24,7 @@ async def refresh_prices():
 
 
             db.query_raw(
-                "UPDATE instruments SET current_price = :p WHERE symbol = :s",
+                "UPDATE instruments SET current_price = :p, price_updated_at = NOW() WHERE symbol = :s",
                 [
                     {"name": "p", "value": {"doubleValue": price}},
                     {"name": "s", "value": {"stringValue": sym}},
@@ -1,59 +1,74 @@
-from producers.risk_producer import emit_portfolio_risk
-from producers.research_gap import emit_stale_research
+from producers.risk_producer import portfolio_risk_context
+from producers.research_gap import stale_research_context
 from producers.earnings_producer import emit_earnings_event
 from common.alert_engine import AlertContext
-from common.alert_service import emit_alert
+from common.alert_service import emit_alerts
 import logging
 from datetime import datetime, timezone
 
 # from common.event_agent import detect_events_from_narrative
 from common.event_agent import detect_events_via_llm as detect_events
 from common.events import DetectedEvent
-from common.event_todos import maybe_create_todo_from_event
+from common.event_todos import todo_spec_from_event
 from common.event_utils import map_event_severity_to_alert
+from common.keyword_scanner import KeywordScanner
 
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Signal -> phrases; the narrative is scanned once for all of them
+REPORTER_SIGNALS = {
+    "risk": ["volatility", "risk"],
+    "concentration": ["concentration"],
+    "rebalance": ["rebalance"],
+    "stale_research": ["outdated", "stale"],
+}
+
+_scanner = KeywordScanner(REPORTER_SIGNALS)
+
 
 async def emit_reporter_facts(user_id, job_id, portfolio_report: str):
     """
     Converts the reporter narrative into structured signal events.
     This replaces action_deriver.py entirely.
+
+    All signals are collected first and persisted with one emit_alerts
+    call, so DB round trips stay constant regardless of alert count.
     """
 
-    text = portfolio_report.lower() if portfolio_report else ""
+    scan = _scanner.scan(portfolio_report)
+    contexts: list[AlertContext] = []
 
     # ✅ Risk detection
-    if "volatility" in text or "risk" in text:
-        emit_portfolio_risk(
+    if scan.has("risk"):
+        contexts.append(portfolio_risk_context(
             clerk_user_id=user_id,
             job_id=job_id,
             drawdown=None
-        )
+        ))
         logger.info(
         "Emitting portfolio alert",
-        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": ["volatility", "risk"]}
+        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": scan.phrases("risk")}
         )
 
     # ✅ Concentration
-    if "concentration" in text:
-        emit_portfolio_risk(
+    if scan.has("concentration"):
+        contexts.append(portfolio_risk_context(
             clerk_user_id=user_id,
             job_id=job_id,
             drawdown=None,
             symbol=None,
             alloc=40.0  # placeholder until symbol attribution improves
-        )
+        ))
         logger.info(
         "Emitting portfolio alert",
-        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": ["concentration", "risk"]}
+        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": scan.phrases("concentration")}
         )
 
 
     # ✅ Rebalance intent
-    if "rebalance" in text:
+    if scan.has("rebalance"):
         ctx = AlertContext(
             alert_id=None,
             clerk_user_id=user_id,
@@ -65,23 +80,23 @@ async def emit_reporter_facts(user_id, job_id, portfolio_report: str):
             message="Reporter indicated rebalance recommendation.",
             created_at=datetime.now(timezone.utc)
         )
-        emit_alert(ctx)
+        contexts.append(ctx)
         logger.info(
         "Emitting portfolio alert",
-        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": ["rebalance", "portfolio"]}
+        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": scan.phrases("rebalance")}
         )
 
     # ✅ Stale research (heuristic placeholder)
-    if "outdated" in text or "stale" in text:
-        emit_stale_research(
+    if scan.has("stale_research"):
+        contexts.append(stale_research_context(
             symbol="UNKNOWN",
             days=45,
             clerk_user_id=user_id,
             job_id=job_id
-        )
+        ))
         logger.info(
         "Emitting portfolio alert",
-        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": ["outdated", "stale", "research"]}
+        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": scan.phrases("stale_research")}
         )
 
         # === Event Intelligence Layer (Option C) ===
@@ -105,7 +120,7 @@ async def emit_reporter_facts(user_id, job_id, portfolio_report: str):
             message=event.explanation,
             created_at=datetime.now(timezone.utc),
         )
-        emit_alert(ctx)
+        contexts.append(ctx)
         logger.info(
             "Emitting event-derived alert",
             extra={
@@ -115,8 +130,7 @@ async def emit_reporter_facts(user_id, job_id, portfolio_report: str):
                 "severity": event.severity,
             },
         )
-    
-    for event in events:
-        maybe_create_todo_from_event(event)
 
+    event_todos = [spec for spec in map(todo_spec_from_event, events) if spec]
 
+    emit_alerts(contexts, todos=event_todos)
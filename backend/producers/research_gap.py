@@ -3,8 +3,8 @@ from common.alert_engine import AlertContext
 from common.alert_service import emit_alert
 
 
-def emit_stale_research(symbol, days, clerk_user_id, job_id):
-    ctx = AlertContext(
+def stale_research_context(symbol, days, clerk_user_id, job_id) -> AlertContext:
+    return AlertContext(
         alert_id=None,
         clerk_user_id=clerk_user_id,
         job_id=job_id,
@@ -18,4 +18,6 @@ def emit_stale_research(symbol, days, clerk_user_id, job_id):
         created_at=datetime.now(timezone.utc)
     )
 
-    emit_alert(ctx)
+
+def emit_stale_research(symbol, days, clerk_user_id, job_id):
+    emit_alert(stale_research_context(symbol, days, clerk_user_id, job_id))
@@ -1,12 +1,13 @@
 from datetime import datetime, timezone
 from common.alert_engine import AlertContext
-from common.alert_service import emit_alert
+from common.alert_service import emit_alerts
 
 # from common.event_agent import detect_events_from_narrative
 from common.event_agent import detect_events_via_llm as detect_events
 from common.events import DetectedEvent
-from common.event_todos import maybe_create_todo_from_event
+from common.event_todos import todo_spec_from_event
 from common.event_utils import map_event_severity_to_alert
+from common.keyword_scanner import KeywordScanner
 
 
 
@@ -15,17 +16,31 @@ import logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Signal -> phrases; the narrative is scanned once for all of them
+RETIREMENT_SIGNALS = {
+    "success_probability": ["success rate", "probability"],
+    "income_gap": ["gap", "shortfall"],
+    "savings": ["increase savings"],
+    "insurance": ["insurance"],
+}
+
+_scanner = KeywordScanner(RETIREMENT_SIGNALS)
+
 
 async def emit_retirement_facts(user_id: str, job_id: str, retirement_report: str):
     """
     Structured Retirement signal emitter.
     Replaces derive_retirement_actions + AlertStore/TodoStore direct inserts.
+
+    All signals are collected first and persisted with one emit_alerts
+    call, so DB round trips stay constant regardless of alert count.
     """
 
-    text = retirement_report.lower() if retirement_report else ""
+    scan = _scanner.scan(retirement_report)
+    contexts: list[AlertContext] = []
 
     # ✅ Success probability risk
-    if "success rate" in text or "probability" in text:
+    if scan.has("success_probability"):
         ctx = AlertContext(
             alert_id=None,
             clerk_user_id=user_id,
@@ -38,15 +53,15 @@ async def emit_retirement_facts(user_id: str, job_id: str, retirement_report: st
             rationale="Derived from retirement analysis.",
             created_at=datetime.now(timezone.utc)
         )
-        emit_alert(ctx)
+        contexts.append(ctx)
         logger.info(
         "Emitting retirement alert",
-        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": ["probability", "success rate"]}
+        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": scan.phrases("success_probability")}
         )
 
 
     # ✅ Income shortfall
-    if "gap" in text or "shortfall" in text:
+    if scan.has("income_gap"):
         ctx = AlertContext(
             alert_id=None,
             clerk_user_id=user_id,
@@ -59,15 +74,15 @@ async def emit_retirement_facts(user_id: str, job_id: str, retirement_report: st
             rationale="Derived from retirement content.",
             created_at=datetime.now(timezone.utc)
         )
-        emit_alert(ctx)
+        contexts.append(ctx)
         logger.info(
         "Emitting retirement alert",
-        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": ["gap", "shortfall"]}
+        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": scan.phrases("income_gap")}
         )
 
 
     # ✅ Savings gap
-    if "increase savings" in text:
+    if scan.has("savings"):
         ctx = AlertContext(
             alert_id=None,
             clerk_user_id=user_id,
@@ -80,15 +95,15 @@ async def emit_retirement_facts(user_id: str, job_id: str, retirement_report: st
             rationale="Derived from retirement model.",
             created_at=datetime.now(timezone.utc)
         )
-        emit_alert(ctx)
+        contexts.append(ctx)
         logger.info(
         "Emitting retirement alert",
-        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": ["savings", "shortfall"]}
+        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": scan.phrases("savings")}
         )
 
 
     # ✅ Insurance risk
-    if "insurance" in text:
+    if scan.has("insurance"):
         ctx = AlertContext(
             alert_id=None,
             clerk_user_id=user_id,
@@ -101,10 +116,10 @@ async def emit_retirement_facts(user_id: str, job_id: str, retirement_report: st
             rationale="Derived from retirement model.",
             created_at=datetime.now(timezone.utc)
         )
-        emit_alert(ctx)
+        contexts.append(ctx)
         logger.info(
         "Emitting retirement alert",
-        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": ["insurance", "underinsured"]}
+        extra={"user_id": user_id, "job_id": job_id, "keyword_hits": scan.phrases("insurance")}
         )
 
         # === Event Intelligence Layer (Option C) ===
@@ -127,7 +142,7 @@ async def emit_retirement_facts(user_id: str, job_id: str, retirement_report: st
             message=event.explanation,
             created_at=datetime.now(timezone.utc),
         )
-        emit_alert(ctx)
+        contexts.append(ctx)
         logger.info(
             "Emitting retirement event-derived alert",
             extra={
@@ -138,6 +153,7 @@ async def emit_retirement_facts(user_id: str, job_id: str, retirement_report: st
             },
         )
 
-    for event in events:
-        maybe_create_todo_from_event(event)
+    event_todos = [spec for spec in map(todo_spec_from_event, events) if spec]
+
+    emit_alerts(contexts, todos=event_todos)
 
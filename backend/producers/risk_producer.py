@@ -3,8 +3,8 @@ from common.alert_engine import AlertContext
 from common.alert_service import emit_alert
 
 
-def emit_portfolio_risk(clerk_user_id: str, job_id: str, drawdown: float, symbol: str = None, alloc: float = None):
-    ctx = AlertContext(
+def portfolio_risk_context(clerk_user_id: str, job_id: str, drawdown: float, symbol: str = None, alloc: float = None) -> AlertContext:
+    return AlertContext(
         alert_id=None,
         clerk_user_id=clerk_user_id,
         job_id=job_id,
@@ -19,4 +19,6 @@ def emit_portfolio_risk(clerk_user_id: str, job_id: str, drawdown: float, symbol
         created_at=datetime.now(timezone.utc)
     )
 
-    emit_alert(ctx)
+
+def emit_portfolio_risk(clerk_user_id: str, job_id: str, drawdown: float, symbol: str = None, alloc: float = None):
+    emit_alert(portfolio_risk_context(clerk_user_id, job_id, drawdown, symbol=symbol, alloc=alloc))
@@ -17,8 +17,6 @@ from context import ReporterContext
 
 from tools import (
     get_market_insights,
-    submit_portfolio_research_job,
-    check_research_job_status,
     get_latest_price_tool,
 )
 
@@ -142,14 +140,9 @@ def create_agent(job_id: str, portfolio_data: Dict[str, Any], user_data: Dict[st
         job_id=job_id, portfolio_data=portfolio_data, user_data=user_data, db=db
     )
 
-    # Tools - only get_market_insights now, report saved in lambda_handler
-    # tools = [get_market_insights, get_latest_price_tool,]
-    tools = [
-    get_market_insights,
-    get_latest_price_tool,
-    submit_portfolio_research_job,
-    check_research_job_status,
-    ]
+    # Tools - report saved in lambda_handler; symbol research has already
+    # completed before the agent runs (pushed by JobTracker, no polling)
+    tools = [get_market_insights, get_latest_price_tool]
 
     # Format portfolio for analysis
     portfolio_summary = format_portfolio_for_analysis(portfolio_data, user_data)
@@ -162,18 +155,13 @@ MANDATORY: Always include the current stock price and total value for each holdi
 - Format portfolio composition in a markdown table with columns: Symbol | Shares | Price | Total Value.
 - Use `get_market_insights` to enrich the analysis with market context.
 
-Additionally, before generating your final report:
-
-- Extract all holdings' symbols from the portfolio.
-- Call submit_portfolio_research_job(symbols) to request deep research.
-- Then repeatedly call check_research_job_status() until the job is complete.
-- Once research job completes, proceed with the task detailed below
-- Do not generate the final report until after all the researcher jobs have completed.
+Symbol-specific research for every holding has already been completed by the
+Researcher and stored in the knowledge base; retrieve it with get_market_insights.
 
 {portfolio_summary}
 
 Your task:
-1. First, get market insights for the top holdings using get_market_insights() to retrieve the Researcher's vector-based analysis
+1. First, call get_market_insights() ONCE with ALL holdings' symbols to retrieve the Researcher's vector-based analysis for each position
 2. Use get_latest_price_tool to get the latest closing prices for the holdings
 2. Analyze the portfolio's current state, strengths, and weaknesses against the insights and latest closing prices
 3. Generate a detailed, professional analysis report in markdown format. Use the insights to enrich the report's sections.
@@ -1,11 +1,87 @@
 from agents import Agent, Runner
 from pydantic import BaseModel, Field
 import os
+import json
+import hashlib
 import logging
+from typing import Optional
+from botocore.config import Config
 from agents.extensions.models.litellm_model import LitellmModel
 
+from common.aws_clients import get_client
+
 logger = logging.getLogger()
 
+# When the judge runs relative to saving the report:
+#   inline      judge first, a low score replaces the report before it is saved
+#   concurrent  save first and mark the report completed, then judge in this
+#               invocation
+#   async       save first, judge in a separate async self-invocation (off the
+#               response path); falls back to concurrent when that is unavailable
+# After a deferred judgement, only a passing report is post-processed (facts,
+# events, alerts, todos) and cached.
+JUDGE_MODES = ("inline", "concurrent", "async")
+JUDGE_MODE = os.getenv("JUDGE_MODE", "async").lower()
+
+# Fraction of reports judged (0.0-1.0), to shed judge calls under load
+JUDGE_SAMPLE_RATE = float(os.getenv("JUDGE_SAMPLE_RATE", "1.0"))
+
+JUDGE_ACTION = "judge"
+
+# Async invoke payload limit is 256 KB; leave headroom for the envelope
+MAX_ASYNC_PAYLOAD_BYTES = 250_000
+
+
+def judge_mode() -> str:
+    if JUDGE_MODE not in JUDGE_MODES:
+        logger.warning(f"Judge: unknown JUDGE_MODE {JUDGE_MODE!r}, using async")
+        return "async"
+    return JUDGE_MODE
+
+
+def should_judge(job_id: str, sample_rate: Optional[float] = None) -> bool:
+    """Deterministic per-job sampling, so Lambda retries make the same decision."""
+    rate = JUDGE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    bucket = int(hashlib.sha256(job_id.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return bucket < rate
+
+
+def enqueue_judge(job_id: str, task: str, cache_key: str) -> bool:
+    """
+    Judge the saved report of job_id in an async invocation of this Lambda.
+    Returns False when there is no async target (local runs), the payload is
+    too large, or the invoke fails; the caller should then judge in-process.
+    """
+    function_name = os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+    if not function_name:
+        return False
+
+    payload = json.dumps({
+        "action": JUDGE_ACTION,
+        "job_id": job_id,
+        "task": task,
+        "cache_key": cache_key,
+    }).encode("utf-8")
+    if len(payload) > MAX_ASYNC_PAYLOAD_BYTES:
+        logger.warning(f"Judge: payload too large for async invoke ({len(payload)} bytes)")
+        return False
+
+    try:
+        lambda_client = get_client(
+            "lambda", config=Config(connect_timeout=5, read_timeout=10, retries={"max_attempts": 2})
+        )
+        lambda_client.invoke(FunctionName=function_name, InvocationType="Event", Payload=payload)
+    except Exception as e:
+        logger.warning(f"Judge: async invoke failed for job {job_id}: {e}")
+        return False
+
+    logger.info(f"Judge: enqueued evaluation for job {job_id}")
+    return True
+
 
 class Evaluation(BaseModel):
     feedback: str = Field(
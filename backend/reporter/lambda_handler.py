@@ -36,22 +36,33 @@ print("CWD:", os.getcwd())
 
 import json
 import asyncio
+import contextlib
+import hashlib
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from agents import Agent, Runner, trace
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from litellm.exceptions import RateLimitError, ServiceUnavailableError
-from judge import evaluate
+from judge import JUDGE_ACTION, enqueue_judge, evaluate, judge_mode, should_judge
 
 from producers.reporter_bridge import emit_reporter_facts
+from common.post_processing import POST_PROCESS_ACTION, enqueue_post_processing, run_post_processing
+from common.post_processing_store import PostProcessingStore
+from common.report_cache_store import ReportCacheStore, report_cache_key
+from common.research_completion import RESEARCH_COMPLETE_ACTION
 
 class AgentTemporaryError(Exception):
     """Temporary error that should trigger retry"""
     pass
 
 GUARD_AGAINST_SCORE = 0.3  # Guard against score being too low
+GUARD_FALLBACK_RESPONSE = "I'm sorry, I'm not able to generate a report for you. Please try again later."
+
+# A report judged low after it was saved: "flag" marks the stored payload,
+# "replace" also swaps its content for GUARD_FALLBACK_RESPONSE
+JUDGE_LOW_SCORE_ACTION = os.getenv("JUDGE_LOW_SCORE_ACTION", "replace").lower()
 
 try:
     from dotenv import load_dotenv
@@ -71,7 +82,12 @@ from templates import REPORTER_INSTRUCTIONS
 
 print("========== REPORTER_INSTRUCTIONS IMPORT SUCCEEDED ==========")
 
+# Part of the report cache key: bump when the task template in agent.py
+# changes; edits to REPORTER_INSTRUCTIONS change the key on their own
+REPORT_PROMPT_VERSION = "v1:" + hashlib.sha256(REPORTER_INSTRUCTIONS.encode("utf-8")).hexdigest()[:12]
+
 from agent import create_agent, ReporterContext
+from tools import portfolio_symbols, start_portfolio_research
 
 print("========== AGENT IMPORT SUCCEEDED ==========")
 
@@ -155,8 +171,34 @@ async def run_reporter_agent(
     user_data: Dict[str, Any],
     db=None,
     observability=None,
+    force_refresh: bool = False,
+    cached: Optional[Dict[str, Any]] = None,
+    check_cache: bool = True,
 ) -> Dict[str, Any]:
-    """Run the reporter agent to generate analysis."""
+    """
+    Run the reporter agent to generate analysis.
+
+    Reports are cached by portfolio snapshot, user goals, price date and
+    prompt/model version (common.report_cache_store): an unchanged re-run
+    saves the cached report_payload without calling the model or the judge.
+    force_refresh=True always regenerates (and refreshes the cache entry).
+    A caller that already looked the report up passes the entry as cached
+    (or check_cache=False on a miss), so the cache is not read twice.
+    """
+    cache = ReportCacheStore(db)
+    cache_key = _report_cache_key(portfolio_data, user_data)
+    if not force_refresh:
+        if cached is None and check_cache:
+            try:
+                cached = cache.get(cache_key)
+            except Exception as e:
+                logger.warning(f"Reporter: report cache lookup failed: {e}")
+        if cached:
+            logger.info(f"Reporter: cache hit for job {job_id} (report of job {cached['cache_source_job_id']})")
+            cached["cached"] = True
+            result = await _save_report(job_id, user_id, cached, db, "Cached report stored")
+            _mark_report_completed(db, job_id)
+            return result
 
     # Create agent with tools and context
     model, tools, task, context = create_agent(job_id, portfolio_data, user_data, db)
@@ -194,30 +236,15 @@ async def run_reporter_agent(
 
         
 
-        if observability:
-            try:
-                with observability.start_as_current_span(name="judge") as span:
-                    evaluation = await evaluate(REPORTER_INSTRUCTIONS, task, response)
-                    score = evaluation.score / 100
-                    comment = evaluation.feedback
-
-                    # Record telemetry safely
-                    try:
-                        span.score(name="Judge", value=score, data_type="NUMERIC", comment=comment)
-                        observation = f"Score: {score} - Feedback: {comment}"
-                        observability.create_event(name="Judge Event", status_message=observation)
-                        
-                    except AttributeError as otel_error:
-                        logger.warning(f"Telemetry scoring failed: {otel_error}")
-
-                    # Business guard logic (keep this!)
-                    if score < GUARD_AGAINST_SCORE:
-                        logger.error(f"Reporter score is too low: {score}")
-                        response = "I'm sorry, I'm not able to generate a report for you. Please try again later."
-
-            except Exception as e:
-                logger.warning(f"Observability or evaluation failed: {e}")
-
+        # The judge runs for a sample of reports; by default after the save
+        # (JUDGE_MODE), so it adds nothing to the user-visible latency
+        mode = judge_mode() if observability and should_judge(job_id) else None
+        if mode == "inline":
+            judged = await _judge(task, response, observability)
+            # Business guard logic (keep this!)
+            if judged and judged[0] < GUARD_AGAINST_SCORE:
+                logger.error(f"Reporter score is too low: {judged[0]}")
+                response = GUARD_FALLBACK_RESPONSE
 
         # Save the report to database
         report_payload = {
@@ -226,44 +253,233 @@ async def run_reporter_agent(
             "agent": "reporter",
         }
 
-        success = db.jobs.update_report(job_id, report_payload)
+        # Only reports that passed the judge guard are reused; a report judged
+        # after the save is cached once its score arrives (_apply_judgement)
+        if mode in (None, "inline") and response != GUARD_FALLBACK_RESPONSE:
+            _cache_report(cache, cache_key, report_payload, job_id)
+
+        judging = asyncio.create_task(_judge(task, response, observability)) if mode == "concurrent" else None
+
+        # A report judged after the save reaches post-processing (facts,
+        # events, alerts, todos) only once it passed (_apply_judgement)
+        deferred = mode in ("concurrent", "async")
+        result = await _save_report(
+            job_id, user_id, report_payload, db, "Report generated and stored", post_process=not deferred
+        )
+
+        # The report is visible from here on; a judge still running in this
+        # invocation only finishes behind it
+        _mark_report_completed(db, job_id)
+
+        # The async judge reads the saved payload, so it is enqueued after the
+        # save; without an async target it runs here instead
+        if mode == "async" and not enqueue_judge(job_id, task, cache_key):
+            judging = asyncio.create_task(_judge(task, response, observability))
+
+        if judging:
+            judged = await judging
+            try:
+                await _apply_judgement(db, job_id, user_id, cache_key, report_payload, judged)
+            except Exception as e:
+                # The report is already out; never fail (and retry) the run here
+                logger.error(f"Reporter: applying judgement failed for job {job_id}: {e}")
+        return result
+
+
+async def _judge(task: str, response: str, observability=None) -> Optional[Tuple[float, str]]:
+    """(score 0-1, feedback) for a report, recorded in telemetry; None if judging failed."""
+    try:
+        span_context = (
+            observability.start_as_current_span(name="judge") if observability else contextlib.nullcontext()
+        )
+        with span_context as span:
+            evaluation = await evaluate(REPORTER_INSTRUCTIONS, task, response)
+            score = evaluation.score / 100
+            comment = evaluation.feedback
+
+            # Record telemetry safely
+            if observability:
+                try:
+                    span.score(name="Judge", value=score, data_type="NUMERIC", comment=comment)
+                    observation = f"Score: {score} - Feedback: {comment}"
+                    observability.create_event(name="Judge Event", status_message=observation)
+
+                except AttributeError as otel_error:
+                    logger.warning(f"Telemetry scoring failed: {otel_error}")
+
+            return score, comment
+
+    except Exception as e:
+        logger.warning(f"Observability or evaluation failed: {e}")
+        return None
+
+
+async def _apply_judgement(
+    db,
+    job_id: str,
+    user_id: str,
+    cache_key: str,
+    report_payload: Dict[str, Any],
+    judged: Optional[Tuple[float, str]],
+) -> bool:
+    """
+    Settle a report judged after it was saved, whose post-processing was
+    held back for the judge. A passing report is post-processed and cached;
+    one the judge could not score is post-processed only (the inline guard
+    lets it through too). Below GUARD_AGAINST_SCORE the stored payload is
+    flagged, or replaced when JUDGE_LOW_SCORE_ACTION=replace, and nothing
+    is emitted or cached for it. Returns True if the payload was changed.
+    """
+    if judged is None or judged[0] >= GUARD_AGAINST_SCORE:
+        if judged is not None:
+            _cache_report(ReportCacheStore(db), cache_key, report_payload, job_id)
+        await _post_process_report(job_id, user_id, report_payload["content"])
+        return False
+
+    score, feedback = judged
+    logger.error(f"Reporter score is too low: {score} (job {job_id}, judged after save)")
+    payload = dict(report_payload)
+    payload["judge"] = {"score": score, "feedback": feedback, "flagged": True}
+    if JUDGE_LOW_SCORE_ACTION == "replace":
+        payload["content"] = GUARD_FALLBACK_RESPONSE
+    db.jobs.update_report(job_id, payload)
+    return True
+
+
+def _cache_report(cache: ReportCacheStore, cache_key: str, report_payload: Dict[str, Any], job_id: str) -> None:
+    if not cache_key:
+        return
+    try:
+        cache.put(cache_key, report_payload, job_id)
+    except Exception as e:
+        logger.warning(f"Reporter: report cache write failed: {e}")
+
+
+async def _run_judge_event(event: Dict[str, Any], observability=None) -> Dict[str, Any]:
+    """Judge an already-saved report (action="judge"), once per job."""
+    job_id = event["job_id"]
+    db = Database()
+    runs = PostProcessingStore(db)
+    key = f"reporter:judge:{job_id}"
+    if not runs.claim(key, "reporter_judge", job_id):
+        logger.info(f"Judge already ran or is running for job {job_id}, skipping")
+        return {"statusCode": 200, "body": json.dumps({"skipped": True, "job_id": job_id})}
+
+    try:
+        job = db.jobs.find_by_id(job_id) or {}
+        report_payload = job.get("report_payload") or {}
+        if isinstance(report_payload, str):
+            report_payload = json.loads(report_payload)
+
+        changed = False
+        if report_payload.get("content"):
+            judged = await _judge(event.get("task", ""), report_payload["content"], observability)
+            changed = await _apply_judgement(
+                db, job_id, job.get("clerk_user_id"), event.get("cache_key", ""), report_payload, judged
+            )
+    except Exception as e:
+        runs.mark_failed(key, str(e))
+        raise
+
+    runs.mark_done(key)
+    return {"statusCode": 200, "body": json.dumps({"success": True, "job_id": job_id, "flagged": changed})}
+
 
-        if not success:
-            logger.error(f"Failed to save report for job {job_id}")
+def _report_cache_key(portfolio_data: Dict[str, Any], user_data: Dict[str, Any]) -> str:
+    return report_cache_key(portfolio_data, user_data, REPORT_PROMPT_VERSION, os.getenv("BEDROCK_MODEL_ID", ""))
 
-        # try:
-            # await persist_portfolio_actions(
-            # user_id=user_id,
-            # job_id=job_id,
-            # portfolio_response=response
-            # )
-        # except Exception as e:
-            # logger.exception("Failed to persist portfolio actions")
 
+def _force_refresh(event: Dict[str, Any], job: Dict[str, Any] = None) -> bool:
+    """force_refresh from the event, else from the analysis request options on the job."""
+    if "force_refresh" in event:
+        return bool(event["force_refresh"])
+    payload = (job or {}).get("request_payload") or {}
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return False
+    return bool((payload.get("options") or {}).get("force_refresh"))
+
+
+def _mark_report_completed(db, job_id: str) -> None:
+    db.jobs.set_agent_status(job_id, "reporter", "completed")
+    db.jobs.set_agent_completed_at(job_id, "reporter")
+
+    if db.jobs.are_all_agents_completed(job_id):
+        db.jobs.update_status(job_id, "completed")
+
+
+async def _save_report(
+    job_id: str, user_id: str, report_payload: Dict[str, Any], db, message: str, post_process: bool = True
+) -> Dict[str, Any]:
+    """
+    Store the report on the job and hand fact/event emission off the
+    critical path. post_process=False holds emission back for the judge.
+    """
+    success = db.jobs.update_report(job_id, report_payload)
+
+    if not success:
+        logger.error(f"Failed to save report for job {job_id}")
+
+    response = report_payload["content"]
+
+    # try:
+        # await persist_portfolio_actions(
+        # user_id=user_id,
+        # job_id=job_id,
+        # portfolio_response=response
+        # )
+    # except Exception as e:
+        # logger.exception("Failed to persist portfolio actions")
+
+    if post_process:
+        await _post_process_report(job_id, user_id, response)
+
+    return {
+        "success": success,
+        "message": message
+        if success
+        else "Report generated but failed to save",
+        "final_output": response,
+        "cached": bool(report_payload.get("cached")),
+    }
+
+
+async def _post_process_report(job_id: str, user_id: str, narrative: str) -> None:
+    # Fact/event emission runs off the critical path (async self-invoke);
+    # emit inline only when there is no async target (e.g. local runs)
+    if not enqueue_post_processing("reporter", job_id=job_id, user_id=user_id, narrative=narrative):
         await emit_reporter_facts(
             user_id=user_id,
             job_id=job_id,
-            portfolio_report=response
+            portfolio_report=narrative
         )
 
-        return {
-            "success": success,
-            "message": "Report generated and stored"
-            if success
-            else "Report generated but failed to save",
-            "final_output": result.final_output,
-        }
+
+async def _emit_facts(user_id: str, job_id: str, narrative: str):
+    await emit_reporter_facts(user_id=user_id, job_id=job_id, portfolio_report=narrative)
 
 
 def lambda_handler(event, context):
     """
     Lambda handler expecting job_id, portfolio_data, and user_data in event.
 
+    Two phases, no polling:
+      1. Invoked by the Planner: submit symbol research and return. If there
+         is nothing to research (or it already finished, or an unchanged
+         portfolio has a cached report) go straight to 2.
+      2. action="research_complete", pushed by JobTracker once every symbol
+         has settled: run the Reporter agent and save the report.
+    Events with action="post_process" run the deferred fact/event emission,
+    and action="judge" the deferred judge evaluation (see judge.JUDGE_MODE).
+
     Expected event:
     {
         "job_id": "uuid",
         "portfolio_data": {...},
-        "user_data": {...}
+        "user_data": {...},
+        "force_refresh": false   # optional; also read from the job's request options
     }
     """
     # Wrap entire handler with observability context
@@ -275,9 +491,19 @@ def lambda_handler(event, context):
             if isinstance(event, str):
                 event = json.loads(event)
 
+            # Deferred fact/event emission for an already-saved report
+            if event.get("action") == POST_PROCESS_ACTION:
+                return asyncio.run(run_post_processing(event, _emit_facts))
+
+            # Deferred judge evaluation for an already-saved report
+            if event.get("action") == JUDGE_ACTION:
+                return asyncio.run(_run_judge_event(event, observability))
+
             job_id = event.get("job_id")
             if not job_id:
                 return {"statusCode": 400, "body": json.dumps({"error": "job_id is required"})}
+            user_id = None
+            job = None
 
             # Initialize database
             db = Database()
@@ -339,7 +565,7 @@ def lambda_handler(event, context):
             if not user_data:
                 # Try to load from database
                 try:
-                    job = db.jobs.find_by_id(job_id)
+                    job = job or db.jobs.find_by_id(job_id)
                     if job and job.get("clerk_user_id"):
                         status = f"Job ID: {job_id} Clerk User ID: {job['clerk_user_id']}"
                         if observability:
@@ -363,18 +589,60 @@ def lambda_handler(event, context):
                     logger.warning(f"Could not load user data: {e}. Using defaults.")
                     user_data = {"years_until_retirement": 30, "target_retirement_income": 80000}
 
-            # Run the agent
-            result = asyncio.run(
-                run_reporter_agent(job_id, user_id, portfolio_data, user_data, db, observability)
-            )
+            user_id = user_id or portfolio_data.get("user_id")
+            if job is None and "force_refresh" not in event:
+                job = db.jobs.find_by_id(job_id)
+            force_refresh = _force_refresh(event, job)
 
-            logger.info(f"Reporter completed for job {job_id}")
+            # An unchanged portfolio with a cached report needs no new research;
+            # the entry is handed to run_reporter_agent instead of read again
+            cached, cache_checked = None, False
+            if not force_refresh and event.get("action") != RESEARCH_COMPLETE_ACTION:
+                try:
+                    cached = ReportCacheStore(db).get(_report_cache_key(portfolio_data, user_data))
+                    cache_checked = True
+                except Exception as e:
+                    logger.warning(f"Reporter: report cache lookup failed: {e}")
+
+            # Phase 1: submit research; JobTracker pushes research_complete when it settles
+            if event.get("action") != RESEARCH_COMPLETE_ACTION and not cached:
+                # Before enqueueing: the continuation may start (and set
+                # "running") before start_portfolio_research returns
+                db.jobs.set_agent_status(job_id, "reporter", "waiting_research")
+                research = start_portfolio_research(
+                    job_id, user_id, portfolio_symbols(portfolio_data)
+                )
+                if not research["settled"]:
+                    logger.info(
+                        f"Reporter waiting for research on {research['symbol_count']} symbols, job {job_id}"
+                    )
+                    return {"statusCode": 202, "body": json.dumps(research)}
+
+            # Phase 2: write the report exactly once per job, whichever path got here
+            runs = PostProcessingStore(db)
+            report_key = f"reporter:report:{job_id}"
+            if not runs.claim(report_key, "reporter_report", job_id):
+                logger.info(f"Reporter already ran or is running for job {job_id}, skipping")
+                return {"statusCode": 200, "body": json.dumps({"skipped": True, "job_id": job_id})}
+
+            db.jobs.set_agent_status(job_id, "reporter", "running")
 
-            db.jobs.set_agent_status(job_id, "reporter", "completed")
-            db.jobs.set_agent_completed_at(job_id, "reporter")
+            # Run the agent
+            try:
+                result = asyncio.run(
+                    run_reporter_agent(
+                        job_id, user_id, portfolio_data, user_data, db, observability, force_refresh,
+                        cached=cached, check_cache=not cache_checked,
+                    )
+                )
+            except Exception as e:
+                runs.mark_failed(report_key, str(e))
+                raise
+            runs.mark_done(report_key)
 
-            if db.jobs.are_all_agents_completed(job_id):
-                db.jobs.update_status(job_id, "completed")
+            # run_reporter_agent marked the reporter completed as soon as the
+            # report was saved, before any in-process judge finished
+            logger.info(f"Reporter completed for job {job_id}")
 
             return {"statusCode": 200, "body": json.dumps(result)}
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Ordering of the deferred judge vs post-processing, no AWS or model calls.
+
+A report judged after the save (JUDGE_MODE concurrent/async) must reach
+post-processing (facts, events, alerts, todos) only once it passed the
+judge; a rejected report must never be post-processed.
+
+Run from backend/reporter:
+    uv run test_judge_ordering.py
+"""
+
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import lambda_handler as lh
+
+
+class FakeJobs:
+    def __init__(self, log):
+        self.log = log
+        self.report = None
+
+    def update_report(self, job_id, payload):
+        self.log.append(("save", payload["content"]))
+        self.report = payload
+        return True
+
+    def find_by_id(self, job_id):
+        return {"clerk_user_id": "user_1", "report_payload": self.report}
+
+    def set_agent_status(self, job_id, agent, status):
+        self.log.append(("status", status))
+
+    def set_agent_completed_at(self, job_id, agent):
+        pass
+
+    def are_all_agents_completed(self, job_id):
+        return False
+
+    def update_status(self, job_id, status, **kwargs):
+        pass
+
+
+class FakeCache:
+    def __init__(self, log):
+        self.log = log
+
+    def get(self, cache_key):
+        return None
+
+    def put(self, cache_key, payload, job_id):
+        self.log.append(("cache", payload["content"]))
+
+
+def _patch(log, score, mode):
+    async def fake_run(agent, input, context, max_turns):
+        return SimpleNamespace(final_output="REPORT")
+
+    async def fake_judge(task, response, observability=None):
+        log.append(("judge", response))
+        return None if score is None else (score, "feedback")
+
+    lh.judge_mode = lambda: mode
+    lh.should_judge = lambda job_id: True
+    lh.create_agent = lambda job_id, portfolio, user, db: (None, [], "task", None)
+    lh.Runner = SimpleNamespace(run=fake_run)
+    lh.trace = lambda name: contextlib.nullcontext()
+    lh._judge = fake_judge
+    lh.ReportCacheStore = lambda db=None: FakeCache(log)
+    lh.enqueue_judge = lambda job_id, task, cache_key: False  # no async target: judged in-process
+    lh.enqueue_post_processing = lambda kind, **kwargs: log.append(("post_process", kwargs["narrative"])) or True
+
+
+def _run(score, mode):
+    log = []
+    _patch(log, score, mode)
+    db = SimpleNamespace(jobs=FakeJobs(log))
+    asyncio.run(lh.run_reporter_agent("job_1", "user_1", {"accounts": []}, {}, db, observability=object()))
+    return log, db.jobs.report
+
+
+def test_deferred_judge_gates_post_processing():
+    for mode in ("concurrent", "async"):
+        log, _ = _run(0.9, mode)
+        kinds = [k for k, _ in log]
+        assert kinds.index("save") < kinds.index("judge") < kinds.index("post_process"), log
+        assert ("status", "completed") in log[:kinds.index("judge")], log  # judge is off the visible path
+        assert ("cache", "REPORT") in log, log
+
+        log, report = _run(0.1, mode)
+        assert not any(k in ("post_process", "cache") for k, _ in log), log
+        assert report["judge"]["flagged"], report
+
+        # A judge that could not score lets the report through, uncached
+        log, _ = _run(None, mode)
+        assert ("post_process", "REPORT") in log and not any(k == "cache" for k, _ in log), log
+
+    print("Deferred judge gates post-processing.")
+
+
+def test_inline_and_unsampled_post_process_on_save():
+    for mode in ("inline", None):
+        log, _ = _run(0.9, mode)
+        kinds = [k for k, _ in log]
+        assert kinds.index("save") < kinds.index("post_process"), log
+
+    log, _ = _run(0.1, "inline")
+    assert ("post_process", lh.GUARD_FALLBACK_RESPONSE) in log, log
+    assert ("post_process", "REPORT") not in log, log
+
+    print("Inline and unsampled reports are post-processed on save.")
+
+
+def test_judge_event_gates_post_processing():
+    for score, emitted in ((0.9, True), (0.1, False)):
+        log = []
+        _patch(log, score, "async")
+        jobs = FakeJobs(log)
+        jobs.report = {"content": "REPORT"}
+        lh.Database = lambda: SimpleNamespace(jobs=jobs)
+        lh.PostProcessingStore = lambda db=None: SimpleNamespace(
+            claim=lambda *args: True, mark_done=lambda key: None, mark_failed=lambda key, error: None
+        )
+        asyncio.run(lh._run_judge_event({"job_id": "job_1", "task": "task", "cache_key": "k"}))
+        assert (("post_process", "REPORT") in log) == emitted, log
+
+    print("Async judge event post-processes only passing reports.")
+
+
+if __name__ == "__main__":
+    test_deferred_judge_gates_post_processing()
+    test_inline_and_unsampled_post_process_on_save()
+    test_judge_event_gates_post_processing()
@@ -1,70 +1,192 @@
+import asyncio
 import json
 import os
-from typing import List
-import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 
-import boto3
+from common.aws_clients import get_client, vector_bucket_name
 from common.job_tracker import JobTracker
+from common.research_completion import is_settled
+from common.symbol_research_store import SymbolResearchStore
 from common.tools import get_latest_price_tool
+from common.embeddings import get_embedding_client
+from common.vector_store import get_vector_client
 
 from agents import RunContextWrapper  # or your actual wrapper import
 from agents import function_tool             # adjust if you use a different decorator
 
 from context import ReporterContext
 from uuid import UUID
-from datetime import datetime, timezone
 
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger()
 
 SQS_QUEUE_URL = os.environ["SYMBOL_RESEARCH_QUEUE_URL"]
-sqs = boto3.client("sqs")
+sqs = get_client("sqs")
 
 
-@function_tool
-async def submit_portfolio_research_job(
-    wrapper: RunContextWrapper[ReporterContext],
-    symbols: List[str],
-    ) -> dict:
+# Knowledge-base retrieval: chunks fetched per query, text per chunk, and the
+# budget (estimated tokens) for everything returned to the Reporter
+INSIGHT_CANDIDATES = 8
+INSIGHT_MAX_CHARS = 1200
+INSIGHT_TOKEN_BUDGET = int(os.getenv("INSIGHT_TOKEN_BUDGET", "2000"))
+INSIGHT_CONCURRENCY = 8
+
+# Ranking: similarity scaled by recency, halving the recency term every
+# INSIGHT_HALF_LIFE_DAYS, so last week's analysis beats last quarter's
+INSIGHT_HALF_LIFE_DAYS = float(os.getenv("INSIGHT_HALF_LIFE_DAYS", "14"))
+
+
+def dedupe_by_parent(vectors: List[dict], limit: int) -> List[dict]:
+    """
+    Best-scoring chunk per source document, best first. Chunks carry their
+    document in metadata.parent_id; vectors ingested before chunking are
+    their own parent.
+    """
+    best = {}
+    for vector in sorted(vectors, key=lambda v: v.get("distance", 0.0)):
+        parent = vector.get("metadata", {}).get("parent_id") or vector.get("key")
+        best.setdefault(parent, vector)
+    return list(best.values())[:limit]
+
+
+def insight_query(symbol: str) -> str:
+    return f"{symbol} stock analysis earnings outlook risks"
+
+
+def _age_days(timestamp: Optional[str], now: datetime) -> Optional[float]:
+    try:
+        ts = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - ts).total_seconds() / 86400)
+
+
+def insight_score(vector: dict, now: datetime) -> float:
+    """Cosine similarity weighted by recency (undated chunks count as old)."""
+    similarity = 1.0 - vector.get("distance", 1.0)
+    age = _age_days(vector.get("metadata", {}).get("timestamp"), now)
+    recency = 0.0 if age is None else 0.5 ** (age / INSIGHT_HALF_LIFE_DAYS)
+    return similarity * (0.5 + 0.5 * recency)
+
+
+def select_insights(
+    hits: Dict[Optional[str], List[dict]], token_budget: int
+) -> List[Tuple[Optional[str], dict]]:
+    """
+    Merge per-symbol hits (key None: the unfiltered market query) into one
+    ranked list under token_budget (~4 characters per token).
+
+    Each symbol's best chunk goes first so every holding with research gets
+    context; the remaining chunks follow by score. Chunks of a document
+    already selected are skipped.
     """
-    Attach job tracker rows to an existing jobs.id and enqueue one SQS message per symbol.
+    now = datetime.now(timezone.utc)
+    ranked = {
+        symbol: sorted(dedupe_by_parent(vectors, len(vectors)), key=lambda v: -insight_score(v, now))
+        for symbol, vectors in hits.items()
+    }
+    firsts = sorted(
+        ((symbol, vectors[0]) for symbol, vectors in ranked.items() if symbol and vectors),
+        key=lambda item: -insight_score(item[1], now),
+    )
+    rest = sorted(
+        ((symbol, v) for symbol, vectors in ranked.items() for v in (vectors[1:] if symbol else vectors)),
+        key=lambda item: -insight_score(item[1], now),
+    )
+
+    selected, seen, used = [], set(), 0
+    for symbol, vector in firsts + rest:
+        metadata = vector.get("metadata", {})
+        parent = metadata.get("parent_id") or vector.get("key")
+        text = metadata.get("text", "")[:INSIGHT_MAX_CHARS]
+        cost = len(text) // 4 + 8
+        if not text or parent in seen or used + cost > token_budget:
+            continue
+        seen.add(parent)
+        used += cost
+        selected.append((symbol, vector))
+    return selected
+
+
+def portfolio_symbols(portfolio_data: dict) -> List[str]:
+    return sorted({
+        pos["symbol"]
+        for account in portfolio_data.get("accounts", [])
+        for pos in account.get("positions", [])
+        if pos.get("symbol")
+    })
+
+
+def start_portfolio_research(job_id: str, user_id: str, symbols: List[str]) -> dict:
+    """
+    Attach job tracker rows to an existing jobs.id and enqueue one SQS message
+    per symbol that needs research. Symbols researched recently by any job are
+    marked done immediately (SymbolResearchStore), and symbols another job is
+    already researching wait for that run instead of being enqueued again.
+
+    Runs in code before the Reporter agent, not as an agent tool. Completion
+    is pushed: when the last symbol settles, JobTracker invokes the Reporter
+    continuation (common.research_completion), so nothing polls.
+
+    Returns {"job_id", "symbol_count", "settled"}; settled=True means the
+    report can be written right away (no symbols, or research already finished).
     """
-    job_id = wrapper.context.job_id   # ✅ Always correct UUID
     UUID(job_id)  # Raises ValueError if invalid
-    
-    logger.info(f"[Reporter] Starting submit_portfolio_research_job job_id={job_id}")
 
-    tracker = JobTracker()
+    logger.info(f"[Reporter] Starting portfolio research job_id={job_id}")
+
+    # No push from here: if fresh symbols settle the job in this call, the
+    # caller learns it from the returned "settled" and writes the report inline
+    tracker = JobTracker(on_settled=None)
     # ✅ HARD IDEMPOTENCY GUARD
     existing = tracker.get_job_status(job_id)
     if existing is not None:
         logger.warning(f"[Reporter] Job {job_id} already exists. Skipping resubmission.")
         return {
             "job_id": job_id,
-            "status": existing.get("status", "exists"),
-            "message": "Research job already submitted. Skipping duplicate invocation."
+            "symbol_count": existing.get("symbol_count", 0),
+            "settled": is_settled(existing),
         }
 
-    portfolio = wrapper.context.portfolio_data
-    symbols = {
-        pos["symbol"]
-        for account in portfolio["accounts"]
-        for pos in account["positions"]
-    }
-    symbols = sorted(symbols)
+    if not symbols:
+        return {"job_id": job_id, "symbol_count": 0, "settled": True}
 
     logger.info(f"[Reporter] Unique symbols for research: job_id={job_id}, symbols={symbols}")
-    
 
     # 1) Initialise tracker rows
     tracker.init_tracker_for_job(job_id=job_id, symbols=symbols)
 
-    # 2) Enqueue one message per symbol
-    # user_id = wrapper.context.clerk_user_id
-    user_id = wrapper.context.portfolio_data["user_id"]
-
+    # 2) Reuse fresh research and share in-flight runs; only stale symbols
+    #    are researched by this job
+    #    Each item is parked as waiting BEFORE the claim, so an in-flight run
+    #    that finishes at any point after the claim still releases it
+    registry = SymbolResearchStore(tracker.db)
+    to_research = []
     for sym in symbols:
+        tracker.mark_symbol_waiting(job_id, sym)
+        claim = registry.claim(sym, job_id)
+        if claim == "fresh":
+            tracker.mark_symbol_done(job_id, sym)
+        elif claim == "claimed":
+            if tracker.mark_symbol_pending(job_id, sym):
+                to_research.append(sym)
+            else:
+                # A run that failed between parking and claiming already
+                # settled this item; hand the claim back
+                registry.release(sym, job_id)
+        # "inflight": stays waiting until that run calls release_waiters
+
+    logger.info(
+        f"[Reporter] job_id={job_id}: {len(to_research)} to research, "
+        f"{len(symbols) - len(to_research)} reused or shared"
+    )
+
+    # 3) Enqueue one message per stale symbol
+    for sym in to_research:
         body = {
             "job_id": job_id,
             "user_id": user_id,
@@ -76,54 +198,13 @@ async def submit_portfolio_research_job(
         )
         logger.info(f"[Reporter] Enqueued symbol job: {sym}")
 
-    logger.info(f"[Reporter] Submitted symbol research job: job_id={job_id}, symbols={symbols}")
-
-    await asyncio.sleep(3)
-
-    return {"job_id": job_id, "symbol_count": len(symbols)}
-
-
-@function_tool
-async def check_research_job_status(
-    wrapper: RunContextWrapper[ReporterContext]
-    ) -> dict:
-    """
-    Returns job_tracker + job_tracker_items for a given job_id.
-    """
-    job_id = wrapper.context.job_id   # ✅ Always correct UUID
-    UUID(job_id)  # Raises ValueError if invalid
-
-    tracker = JobTracker()
-
-    status = tracker.get_job_status(job_id)
-    if status is None:
-        return {"job_id": job_id, "status": "not_found"}
+    logger.info(f"[Reporter] Submitted symbol research job: job_id={job_id}, symbols={to_research}")
 
-    # ✅ Initial backoff if job is still "young"
-    created = status.get("created_at")
-    if created:
-        if isinstance(created, str):
-            created = datetime.fromisoformat(created)
+    # Fresh symbols may already have settled the job; waiters may have been
+    # released meanwhile too, so read the state back rather than infer it
+    state = tracker.get_job_status(job_id) or {}
+    return {"job_id": job_id, "symbol_count": len(symbols), "settled": is_settled(state)}
 
-        if created.tzinfo is None:
-            created = created.replace(tzinfo=timezone.utc)
-
-        age = (datetime.now(timezone.utc) - created).total_seconds()
-        if age < 30:
-            await asyncio.sleep(30 - age)
-        else:
-            await asyncio.sleep(15)
-
-            
-    if tracker.is_job_complete(job_id):
-        return {
-            "job_id": job_id,
-            "status": "done"
-        }
-
-    # ✅ Normal poll pacing
-    # await asyncio.sleep(15)
-    return status
 
 @function_tool
 async def get_market_insights(
@@ -140,61 +221,72 @@ async def get_market_insights(
         Relevant market context and insights
     """
     try:
-        import boto3
-        import logging
-        logger = logging.getLogger()
-
-        # Get account ID
-        sts = boto3.client("sts")
-        account_id = sts.get_caller_identity()["Account"]
-        bucket = f"alex-vectors-{account_id}"
+        # Bucket name and clients are resolved once per container
+        bucket = vector_bucket_name()
 
-        # Get embeddings
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
         sagemaker_region = os.getenv("DEFAULT_AWS_REGION", "us-east-1")
-        sagemaker = boto3.client("sagemaker-runtime", region_name=sagemaker_region)
-        endpoint_name = os.getenv("SAGEMAKER_ENDPOINT", "alex-embedding-endpoint")
-        query = f"market analysis {' '.join(symbols[:5])}" if symbols else "market outlook"
-
-        response = sagemaker.invoke_endpoint(
-            EndpointName=endpoint_name,
-            ContentType="application/json",
-            Body=json.dumps({"inputs": query}),
+        s3v = get_vector_client(region_name=sagemaker_region)
+
+        # One query per holding, filtered on the symbol written at ingest,
+        # plus an unfiltered market query; embedded in one batched call
+        queries = [(sym, insight_query(sym)) for sym in symbols]
+        queries.append((None, f"market analysis outlook {' '.join(symbols[:5])}".strip()))
+        embeddings = await asyncio.to_thread(get_embedding_client().embed_many, [q for _, q in queries])
+
+        def search(symbol, embedding):
+            kwargs = {"filter": {"symbol": symbol}} if symbol else {}
+            response = s3v.query_vectors(
+                vectorBucketName=bucket,
+                indexName="financial-research",
+                queryVector={"float32": embedding},
+                topK=INSIGHT_CANDIDATES,
+                returnDistance=True,
+                returnMetadata=True,
+                **kwargs,
+            )
+            return symbol, response.get("vectors", [])
+
+        semaphore = asyncio.Semaphore(INSIGHT_CONCURRENCY)
+
+        async def bounded(symbol, embedding):
+            async with semaphore:
+                return await asyncio.to_thread(search, symbol, embedding)
+
+        results = await asyncio.gather(
+            *(bounded(sym, emb) for (sym, _), emb in zip(queries, embeddings)),
+            return_exceptions=True,
         )
 
-        result = json.loads(response["Body"].read().decode())
-        # Extract embedding (handle nested arrays)
-        if isinstance(result, list) and result:
-            embedding = result[0][0] if isinstance(result[0], list) else result[0]
-        else:
-            embedding = result
-
-        # Search vectors
-        s3v = boto3.client("s3vectors", region_name=sagemaker_region)
-        response = s3v.query_vectors(
-            vectorBucketName=bucket,
-            indexName="financial-research",
-            queryVector={"float32": embedding},
-            topK=3,
-            returnMetadata=True,
-        )
+        hits = {}
+        for (sym, _), result in zip(queries, results):
+            if isinstance(result, Exception):
+                logger.warning(f"[Reporter] Insight query failed for {sym or 'market'}: {result}")
+                continue
+            hits[result[0]] = result[1]
 
-        # Format insights
-        insights = []
-        for vector in response.get("vectors", []):
-            metadata = vector.get("metadata", {})
-            text = metadata.get("text", "")[:200]
-            if text:
-                company = metadata.get("company_name", "")
-                prefix = f"{company}: " if company else "- "
-                insights.append(f"{prefix}{text}...")
-
-        if insights:
-            return "Market Insights:\n" + "\n".join(insights)
-        else:
+        selected = select_insights(hits, INSIGHT_TOKEN_BUDGET)
+        if not selected:
             return "Market insights unavailable - proceeding with standard analysis."
 
+        lines = []
+        for symbol, vector in selected:
+            metadata = vector.get("metadata", {})
+            label = symbol or metadata.get("symbol") or metadata.get("company_name") or "Market"
+            date = str(metadata.get("timestamp", ""))[:10]
+            lines.append(f"[{label}{', ' + date if date else ''}] {metadata.get('text', '')[:INSIGHT_MAX_CHARS]}")
+
+        covered = {symbol for symbol, _ in selected if symbol}
+        missing = [sym for sym in symbols if sym not in covered]
+        if missing:
+            lines.append(f"No stored research for: {', '.join(missing)}")
+
+        logger.info(
+            f"[Reporter] Market insights: {len(selected)} chunk(s) for "
+            f"{len(covered)}/{len(symbols)} symbol(s)"
+        )
+        return "Market Insights:\n" + "\n".join(lines)
+
     except Exception as e:
         logger.warning(f"Reporter: Could not retrieve market insights: {e}")
         return "Market insights unavailable - proceeding with standard analysis."
-
-
@@ -119,8 +119,10 @@ SAVE TO DATABASE
 ---------------------------------
 
 - Always call ingest_financial_document
+- Saving more than one analysis: call ingest_financial_documents ONCE with all of them
 - Topic format:
   "[SYMBOL] Analysis - {today}"
+- Pass the ticker as symbol for symbol analyses (omit it for general market analysis)
 - Save concise, factual analysis only
 
 --------------------
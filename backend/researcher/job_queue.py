@@ -0,0 +1,204 @@
+"""
+Bounded in-process research job queue for the Alex Researcher
+
+Endpoints submit work here and return 202 with a job handle instead of
+running the agent inside the request. A fixed number of workers drain the
+queue, so bursts from the symbol worker or the scheduler queue up rather
+than overloading Bedrock and the container (Playwright):
+
+    job = research_queue.submit("symbol", PRIORITY_SYMBOL, run, dedup_key=...)
+    job.handle  # -> GET /research/jobs/{handle}
+
+- Priorities: lower runs first (symbol research ahead of general research),
+  FIFO within a priority.
+- Bounded: submit() raises QueueFull once `max_queued` jobs are waiting;
+  callers map it to 429 so the client retries later.
+- Dedup: a job with the same dedup_key that is still queued or running is
+  returned instead of queueing a second run (e.g. an SQS redelivery).
+
+Jobs live in memory only. Finished jobs are kept for `retention` lookups.
+A job that will never run because the queue stops (restart, scale-in) gets
+its `on_abandon(reason)` called, so callers that already acknowledged the
+work (e.g. the SQS message behind /research/symbol) can settle it.
+"""
+
+import asyncio
+import itertools
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_SYMBOL = 0
+PRIORITY_GENERAL = 10
+
+
+class QueueFull(Exception):
+    """The queue is at capacity; retry later."""
+    pass
+
+
+@dataclass
+class ResearchJob:
+    handle: str
+    kind: str
+    priority: int
+    run: Callable[[], Awaitable[Any]] = field(repr=False)
+    dedup_key: Optional[str] = None
+    on_abandon: Optional[Callable[[str], Any]] = field(default=None, repr=False)
+    status: str = "queued"  # queued|running|done|failed
+    submitted_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Any = None
+    error: Optional[str] = None
+    finished: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_handle": self.handle,
+            "kind": self.kind,
+            "status": self.status,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class ResearchJobQueue:
+    def __init__(self, concurrency: int = 2, max_queued: int = 100, retention: int = 500):
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.retention = retention
+
+        self._queue: "asyncio.PriorityQueue" = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._jobs: "OrderedDict[str, ResearchJob]" = OrderedDict()
+        self._active: Dict[str, ResearchJob] = {}  # dedup_key -> queued/running job
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+
+    # ---------------------------------------
+    # Lifecycle
+    # ---------------------------------------
+    def start(self) -> None:
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        logger.info(f"[ResearchQueue] started {self.concurrency} worker(s), max_queued={self.max_queued}")
+
+    async def stop(self) -> None:
+        """
+        Cancel running jobs (their run() sees CancelledError and must settle
+        itself) and abandon the queued ones.
+        """
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        abandoned = 0
+        while not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            self._abandon(job, "Researcher stopped before the job ran")
+            abandoned += 1
+        logger.info(f"[ResearchQueue] stopped, {abandoned} queued job(s) abandoned")
+
+    # ---------------------------------------
+    # Submission
+    # ---------------------------------------
+    def submit(
+        self,
+        kind: str,
+        priority: int,
+        run: Callable[[], Awaitable[Any]],
+        dedup_key: Optional[str] = None,
+        on_abandon: Optional[Callable[[str], Any]] = None,
+    ) -> ResearchJob:
+        if dedup_key and dedup_key in self._active:
+            return self._active[dedup_key]
+
+        if self._queue.qsize() >= self.max_queued:
+            raise QueueFull(f"{self._queue.qsize()} research jobs already queued")
+
+        job = ResearchJob(
+            handle=str(uuid.uuid4()), kind=kind, priority=priority, run=run,
+            dedup_key=dedup_key, on_abandon=on_abandon,
+        )
+        self._jobs[job.handle] = job
+        if dedup_key:
+            self._active[dedup_key] = job
+        self._queue.put_nowait((priority, next(self._seq), job))
+        self._evict()
+        logger.info(f"[ResearchQueue] queued {kind} job {job.handle} (priority={priority}, depth={self._queue.qsize()})")
+        return job
+
+    def get(self, handle: str) -> Optional[ResearchJob]:
+        return self._jobs.get(handle)
+
+    async def wait(self, job: ResearchJob, timeout: Optional[float] = None) -> ResearchJob:
+        await asyncio.wait_for(job.finished.wait(), timeout=timeout)
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "concurrency": self.concurrency,
+            "queued": self._queue.qsize(),
+            "running": self._running,
+            "max_queued": self.max_queued,
+        }
+
+    # ---------------------------------------
+    # Internals
+    # ---------------------------------------
+    async def _worker(self, index: int) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            self._running += 1
+            job.status = "running"
+            job.started_at = datetime.now(UTC)
+            try:
+                # Own task, own copy of the context: ContextVars a job sets
+                # (e.g. researcher.tools) do not leak into this worker's next job
+                job.result = await asyncio.create_task(job.run())
+                job.status = "done"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                logger.error(f"[ResearchQueue] {job.kind} job {job.handle} failed: {e}")
+            finally:
+                self._running -= 1
+                job.finished_at = datetime.now(UTC)
+                if job.dedup_key:
+                    self._active.pop(job.dedup_key, None)
+                job.finished.set()
+                self._queue.task_done()
+
+    def _abandon(self, job: ResearchJob, reason: str) -> None:
+        job.status = "failed"
+        job.error = reason
+        job.finished_at = datetime.now(UTC)
+        if job.dedup_key:
+            self._active.pop(job.dedup_key, None)
+        if job.on_abandon:
+            try:
+                job.on_abandon(reason)
+            except Exception as e:
+                logger.error(f"[ResearchQueue] on_abandon failed for {job.kind} job {job.handle}: {e}")
+        job.finished.set()
+
+    def _evict(self) -> None:
+        # Drop the oldest finished jobs beyond the retention limit
+        excess = len(self._jobs) - self.retention
+        if excess <= 0:
+            return
+        for handle in [h for h, j in self._jobs.items() if j.finished.is_set()][:excess]:
+            del self._jobs[handle]
@@ -0,0 +1,173 @@
+"""
+App-lifetime pool of warmed MCP servers for the Alex Researcher
+
+Spawning `npx ...` for every research call costs seconds before the agent
+does any work. The pool starts the servers once (in the FastAPI lifespan)
+and leases them to requests:
+
+    async with pool.lease() as brave_mcp:
+        agent = Agent(..., mcp_servers=[brave_mcp])
+
+- Concurrency limit: a server serves one request at a time, so the pool
+  size caps concurrent requests; lease() waits up to `acquire_timeout`.
+- Health checks: idle servers are probed with list_tools() periodically,
+  and a server whose request failed is probed before it is reused.
+- Restart on failure: an unhealthy server is shut down and respawned in
+  the background, without blocking requests on the other servers.
+
+Each server is owned by its own supervisor task, which both connects and
+cleans it up: the MCP stdio client must be closed from the task that
+opened it.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional
+
+from agents.mcp import MCPServer
+
+logger = logging.getLogger(__name__)
+
+
+class _Slot:
+    def __init__(self, index: int):
+        self.index = index
+        self.server: Optional[MCPServer] = None
+        self.restart = asyncio.Event()
+        self.last_checked = 0.0
+
+
+class MCPServerPool:
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], MCPServer],
+        size: int = 2,
+        acquire_timeout: float = 60.0,
+        health_interval: float = 60.0,
+        health_timeout: float = 10.0,
+        restart_backoff: float = 5.0,
+    ):
+        self.name = name
+        self.factory = factory
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.restart_backoff = restart_backoff
+
+        self._idle: "asyncio.Queue[_Slot]" = asyncio.Queue()
+        self._slots: List[_Slot] = []
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self.restarts = 0
+
+    # ---------------------------------------
+    # Lifecycle
+    # ---------------------------------------
+    async def start(self, warmup_timeout: float = 120.0) -> None:
+        """Spawn all servers; waits (bounded) for the first one to be ready."""
+        self._slots = [_Slot(i) for i in range(self.size)]
+        self._tasks = [asyncio.create_task(self._supervise(slot)) for slot in self._slots]
+        self._tasks.append(asyncio.create_task(self._health_loop()))
+
+        deadline = time.monotonic() + warmup_timeout
+        while self._idle.empty() and time.monotonic() < deadline:
+            await asyncio.sleep(0.2)
+        logger.info(f"[MCPPool:{self.name}] started, {self._idle.qsize()}/{self.size} ready")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for slot in self._slots:
+            slot.restart.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info(f"[MCPPool:{self.name}] stopped")
+
+    async def _supervise(self, slot: _Slot) -> None:
+        while not self._stopping:
+            slot.restart.clear()
+            try:
+                server = self.factory()
+                async with server:
+                    slot.server = server
+                    slot.last_checked = time.monotonic()
+                    self._idle.put_nowait(slot)
+                    await slot.restart.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[MCPPool:{self.name}] server {slot.index} failed: {e}")
+            finally:
+                slot.server = None
+
+            if not self._stopping:
+                self.restarts += 1
+                await asyncio.sleep(self.restart_backoff)
+
+    # ---------------------------------------
+    # Health
+    # ---------------------------------------
+    async def _is_healthy(self, slot: _Slot) -> bool:
+        if slot.server is None:
+            return False
+        try:
+            await asyncio.wait_for(slot.server.list_tools(), timeout=self.health_timeout)
+            slot.last_checked = time.monotonic()
+            return True
+        except Exception as e:
+            logger.warning(f"[MCPPool:{self.name}] server {slot.index} unhealthy: {e}")
+            return False
+
+    def _recycle(self, slot: _Slot) -> None:
+        # Not returned to the idle queue; its supervisor respawns it
+        slot.restart.set()
+
+    async def _health_loop(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(self.health_interval)
+            # Only probe servers that are idle right now; leased ones are in use
+            for _ in range(self._idle.qsize()):
+                try:
+                    slot = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if time.monotonic() - slot.last_checked < self.health_interval:
+                    self._idle.put_nowait(slot)
+                elif await self._is_healthy(slot):
+                    self._idle.put_nowait(slot)
+                else:
+                    self._recycle(slot)
+
+    # ---------------------------------------
+    # Leasing
+    # ---------------------------------------
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Exclusive use of one warmed server for the duration of the block.
+        Raises asyncio.TimeoutError if none frees up within acquire_timeout.
+        """
+        slot = await asyncio.wait_for(self._idle.get(), timeout=self.acquire_timeout)
+        failed = False
+        try:
+            yield slot.server
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            # A failed request may have left the session broken; probe before reuse
+            if slot.server is None or (failed and not await self._is_healthy(slot)):
+                self._recycle(slot)
+            else:
+                self._idle.put_nowait(slot)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "restarts": self.restarts,
+        }
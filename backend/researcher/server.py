@@ -5,10 +5,12 @@ Alex Researcher Service - Investment Advice Agent
 import os
 import logging
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, UTC
 from typing import Optional
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from agents import Agent, Runner, trace
@@ -18,6 +20,7 @@ from litellm.exceptions import RateLimitError
 from database.src.models import Database
 
 from common.job_tracker import JobTracker
+from common.symbol_research_store import complete_symbol_research, fail_symbol_research
 from common.tools import get_latest_price_tool  # shared tool
 # ingest_financial_document already imported from researcher.tools
 from agents.mcp import MCPServerStdio
@@ -32,12 +35,75 @@ logging.getLogger("LiteLLM").setLevel(logging.CRITICAL)
 # Import from our modules
 from researcher.context import get_agent_instructions, DEFAULT_RESEARCH_PROMPT
 from researcher.mcp_servers import create_playwright_mcp_server
-from researcher.tools import ingest_financial_document, get_latest_price_tool
+from researcher.mcp_pool import MCPServerPool
+from researcher.job_queue import ResearchJobQueue, QueueFull, PRIORITY_SYMBOL, PRIORITY_GENERAL
+from researcher.tools import (
+    ingest_financial_document,
+    ingest_financial_documents,
+    get_latest_price_tool,
+    collect_ingested_ids,
+)
 
 # Load environment
 load_dotenv(override=True)
 
-app = FastAPI(title="Alex Researcher Service")
+# Warmed MCP servers, created in the app lifespan. Each server serves one
+# request at a time, so the pool sizes are also the concurrency limits.
+BRAVE_POOL_SIZE = int(os.getenv("BRAVE_MCP_POOL_SIZE", "4"))
+PLAYWRIGHT_POOL_SIZE = int(os.getenv("PLAYWRIGHT_MCP_POOL_SIZE", "1"))
+MCP_ACQUIRE_TIMEOUT = float(os.getenv("MCP_ACQUIRE_TIMEOUT_SECONDS", "120"))
+
+mcp_pools: dict[str, MCPServerPool] = {}
+
+# Research runs are queued and drained by a fixed number of workers, so a
+# burst of requests cannot run unbounded agents at once
+RESEARCH_CONCURRENCY = int(os.getenv("RESEARCH_CONCURRENCY", "3"))
+RESEARCH_MAX_QUEUED = int(os.getenv("RESEARCH_MAX_QUEUED", "100"))
+SYMBOL_RESEARCH_ATTEMPTS = int(os.getenv("SYMBOL_RESEARCH_ATTEMPTS", "3"))
+
+research_queue = ResearchJobQueue(concurrency=RESEARCH_CONCURRENCY, max_queued=RESEARCH_MAX_QUEUED)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    mcp_pools["brave"] = MCPServerPool(
+        "brave",
+        lambda: MCPServerStdio(params=build_brave_mcp_params(), client_session_timeout_seconds=30),
+        size=BRAVE_POOL_SIZE,
+        acquire_timeout=MCP_ACQUIRE_TIMEOUT,
+    )
+    mcp_pools["playwright"] = MCPServerPool(
+        "playwright",
+        lambda: create_playwright_mcp_server(timeout_seconds=60),
+        size=PLAYWRIGHT_POOL_SIZE,
+        acquire_timeout=MCP_ACQUIRE_TIMEOUT,
+    )
+    await asyncio.gather(*(pool.start() for pool in mcp_pools.values()))
+    research_queue.start()
+    try:
+        yield
+    finally:
+        await research_queue.stop()
+        await asyncio.gather(*(pool.stop() for pool in mcp_pools.values()))
+        mcp_pools.clear()
+
+
+@asynccontextmanager
+async def lease_mcp_server(name: str, create):
+    """
+    Lease a warmed server from the pool, or spawn a one-off server when the
+    app runs without its lifespan (scripts, tests).
+    """
+    pool = mcp_pools.get(name)
+    if pool is not None:
+        async with pool.lease() as server:
+            yield server
+    else:
+        async with create() as server:
+            yield server
+
+
+app = FastAPI(title="Alex Researcher Service", lifespan=lifespan)
 
 
 # Request model
@@ -101,26 +167,26 @@ async def run_research_agent(
     MODEL = "bedrock/us.amazon.nova-pro-v1:0"
     model = LitellmModel(model=MODEL)
 
-    tools = [ingest_financial_document, get_latest_price_tool]
+    tools = [ingest_financial_document, ingest_financial_documents, get_latest_price_tool]
 
-# --- Brave MCP (enabled for BOTH modes) ---
-    brave_params = build_brave_mcp_params()
-
-    # Create and run the agent with MCP server
+    # Create and run the agent with MCP servers leased from the warm pools
     try:
         browser_budget = 1 if use_browser else 0
         with trace("Researcher"):
 
             # Always enable Brave MCP
-            async with MCPServerStdio(
-                params=brave_params,
-                client_session_timeout_seconds=30,
+            async with lease_mcp_server(
+                "brave",
+                lambda: MCPServerStdio(params=build_brave_mcp_params(), client_session_timeout_seconds=30),
             ) as brave_mcp:
 
                 mcp_servers = [brave_mcp]
                 if use_browser:
                     # GENERAL MODE → Add Playwright MCP
-                    async with create_playwright_mcp_server(timeout_seconds=60) as playwright_mcp:
+                    async with lease_mcp_server(
+                        "playwright",
+                        lambda: create_playwright_mcp_server(timeout_seconds=60),
+                    ) as playwright_mcp:
                         agent = Agent(
                             name="Alex Investment Researcher",
                             instructions=get_agent_instructions() + f"\n\nBROWSER BUDGET: {browser_budget} page load(s) maximum.",
@@ -172,8 +238,28 @@ async def root():
     }
 
 
+def _submit(kind: str, priority: int, run, dedup_key: Optional[str] = None, on_abandon=None):
+    try:
+        return research_queue.submit(kind, priority, run, dedup_key=dedup_key, on_abandon=on_abandon)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+
+
+def _accepted(job) -> JSONResponse:
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@app.get("/research/jobs/{handle}")
+async def research_job(handle: str):
+    """Status (and result once finished) of a queued research job."""
+    job = research_queue.get(handle)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job handle")
+    return job.to_dict()
+
+
 @app.post("/research")
-async def research(request: ResearchRequest) -> str:
+async def research(request: ResearchRequest, wait: bool = False):
     """
     Generate investment research and advice.
 
@@ -183,16 +269,22 @@ async def research(request: ResearchRequest) -> str:
     3. Store the analysis in the knowledge base
 
     If no topic is provided, the agent will pick a trending topic.
+
+    The run is queued behind symbol research and the response is 202 with a
+    job handle; pass ?wait=true to block until the run has finished.
     """
-    try:
-        response = await run_research_agent(request.topic, use_browser=True)
-        return response
-    except Exception as e:
-        print(f"Error in research endpoint: {e}")
-        import traceback
+    job = _submit(
+        "general",
+        PRIORITY_GENERAL,
+        lambda: run_research_agent(request.topic, use_browser=True),
+    )
+    if not wait:
+        return _accepted(job)
 
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    await research_queue.wait(job)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    return job.to_dict()
 
 
 @app.get("/research/auto")
@@ -202,28 +294,80 @@ async def research_auto():
     Picks a trending topic automatically and generates research.
     Used by EventBridge Scheduler for periodic research updates.
     """
-    try:
-        # Always use agent's choice for automated runs
-        response = await run_research_agent(topic=None, use_browser=True)
-        return {
-            "status": "success",
-            "timestamp": datetime.now(UTC).isoformat(),
-            "message": "Automated research completed",
-            "preview": response[:200] + "..." if len(response) > 200 else response,
-        }
-    except Exception as e:
-        print(f"Error in automated research: {e}")
-        return {"status": "error", "timestamp": datetime.now(UTC).isoformat(), "error": str(e)}
+    # Always use agent's choice for automated runs
+    job = _submit(
+        "general",
+        PRIORITY_GENERAL,
+        lambda: run_research_agent(topic=None, use_browser=True),
+    )
+    return _accepted(job)
 
 # ============================================================
 # NEW ENDPOINT — Symbol-specific research
 # ============================================================
 
+async def run_symbol_research(job_id: str, symbol: str) -> dict:
+    """
+    One symbol research run, executed by the job queue. Settles the symbol
+    for its job (and for jobs waiting on it) whatever the outcome.
+    """
+    # Build topic for Runner.run
+    topic = (
+        f"Focused equity analysis for {symbol}. "
+        f"Use get_latest_price_tool to retrieve the latest price. "
+        f"Provide company overview, financial outlook, growth drivers, risks, "
+        f"and a concise investment thesis. "
+        f"This is strictly symbol-specific research. Do NOT perform general market analysis."
+    )
+
+    tracker = JobTracker()
+    attempt = 1
+    with collect_ingested_ids(symbol=symbol) as vector_ids:
+        while True:
+            try:
+                # Reuse existing pipeline
+                result = await run_research_agent(topic, use_browser=False)
+                break
+            except AgentTemporaryError as e:
+                # The SQS message was already accepted, so retries happen here
+                if attempt < SYMBOL_RESEARCH_ATTEMPTS:
+                    logging.warning(f"Researcher: {symbol} attempt {attempt} failed, retrying: {e}")
+                    attempt += 1
+                    await asyncio.sleep(5 * attempt)
+                    continue
+                fail_symbol_research(tracker, job_id, symbol, str(e))
+                raise
+            except asyncio.CancelledError:
+                # Shutdown mid-run: the SQS message is already acknowledged,
+                # so settle the symbol (and its waiters) before going away
+                fail_symbol_research(tracker, job_id, symbol, "Research cancelled: Researcher shutting down")
+                raise
+            except Exception as e:
+                fail_symbol_research(tracker, job_id, symbol, str(e))
+                raise
+
+    # Publish to the cross-user registry, then settle this job and every
+    # job that was waiting on this symbol's in-flight run
+    released = complete_symbol_research(tracker, job_id, symbol, vector_ids)
+    if released:
+        logging.info(f"Researcher: {symbol} research shared with {len(released)} waiting job(s)")
+
+    # return a preview for debugging
+    preview = result[:250] + "..." if len(result) > 250 else result
+    return {
+        "job_id": job_id,
+        "symbol": symbol,
+        "vector_ids": vector_ids,
+        "preview": preview,
+    }
+
+
 @app.post("/research/symbol")
 async def research_symbol(payload: dict):
     """
     Symbol-focused research for portfolio-level analysis.
-    Triggered by Reporter during Increment 5.
+    Triggered by the symbol research worker (the worker has already marked
+    the symbol running). Queued ahead of general research; returns 202.
     """
 
     job_id = payload.get("job_id")
@@ -234,36 +378,15 @@ async def research_symbol(payload: dict):
     if not all([job_id, user_id, symbol]):
         raise HTTPException(status_code=400, detail="Missing parameters")
 
-    tracker = JobTracker()
-    tracker.mark_symbol_running(job_id, symbol)
-
-    # Build topic for Runner.run
-    topic = (
-        f"Focused equity analysis for {symbol}. "
-        f"Use get_latest_price_tool to retrieve the latest price. "
-        f"Provide company overview, financial outlook, growth drivers, risks, "
-        f"and a concise investment thesis. "
-        f"This is strictly symbol-specific research. Do NOT perform general market analysis."
+    # A redelivered message for a run that is still queued/running gets the same handle
+    job = _submit(
+        "symbol",
+        PRIORITY_SYMBOL,
+        lambda: run_symbol_research(job_id, symbol),
+        dedup_key=f"symbol:{job_id}:{symbol}",
+        on_abandon=lambda reason: fail_symbol_research(JobTracker(), job_id, symbol, reason),
     )
-
-    try:
-        # Reuse existing pipeline
-        result = await run_research_agent(topic, use_browser=False)
-
-        tracker.mark_symbol_done(job_id, symbol)
-
-        # return a preview for debugging
-        preview = result[:250] + "..." if len(result) > 250 else result
-        return {
-            "status": "success",
-            "job_id": job_id,
-            "symbol": symbol,
-            "preview": preview
-        }
-
-    except Exception as e:
-        tracker.mark_symbol_error(job_id, symbol, str(e))
-        raise
+    return _accepted(job)
 
 
 @app.get("/health")
@@ -286,6 +409,8 @@ async def health():
         "debug_container": container_indicators,
         "aws_region": os.environ.get("AWS_DEFAULT_REGION", "not set"),
         "bedrock_model": "bedrock/amazon.nova-pro-v1:0",
+        "mcp_pools": {name: pool.stats() for name, pool in mcp_pools.items()},
+        "research_queue": research_queue.stats(),
     }
 
 
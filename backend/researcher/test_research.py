@@ -85,6 +85,7 @@ def test_research(topic=None):
         response = requests.post(
             research_url,
             json=payload,
+            params={"wait": "true"},  # block until the queued run finishes
             timeout=180  # Give it 3 minutes for research
         )
         response.raise_for_status()
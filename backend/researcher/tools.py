@@ -2,9 +2,12 @@
 Tools for the Alex Researcher agent
 """
 import os
-from typing import Dict, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime, UTC
 import httpx
+from pydantic import BaseModel
 from agents import function_tool
 from common.tools import get_latest_price_tool
 from tenacity import retry, stop_after_attempt, wait_exponential
@@ -13,6 +16,48 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 ALEX_API_ENDPOINT = os.getenv("ALEX_API_ENDPOINT")
 ALEX_API_KEY = os.getenv("ALEX_API_KEY")
 
+# Document ids ingested during the current research run (see collect_ingested_ids)
+_ingested_ids: ContextVar[Optional[List[str]]] = ContextVar("ingested_ids", default=None)
+
+# Symbol the current run researches; tags ingested documents for filtered retrieval
+_research_symbol: ContextVar[Optional[str]] = ContextVar("research_symbol", default=None)
+
+
+def _collect(vector_ids: List[Optional[str]]) -> None:
+    collected = _ingested_ids.get()
+    if collected is not None:
+        collected.extend(v for v in vector_ids if v)
+
+
+@contextmanager
+def collect_ingested_ids(symbol: Optional[str] = None) -> Iterator[List[str]]:
+    """
+    Collect the ids of documents ingested inside the block; the yielded list
+    fills in as the agent ingests. With a symbol, documents ingested inside
+    the block are tagged with it. Both are reset on exit, so a later run on
+    the same task (e.g. a queue worker) does not inherit them.
+
+        with collect_ingested_ids(symbol="AAPL") as ids:
+            await Runner.run(...)
+    """
+    ids: List[str] = []
+    ids_token = _ingested_ids.set(ids)
+    symbol_token = _research_symbol.set(symbol.upper() if symbol else None)
+    try:
+        yield ids
+    finally:
+        _research_symbol.reset(symbol_token)
+        _ingested_ids.reset(ids_token)
+
+
+def _metadata(topic: str, timestamp: str, symbol: Optional[str] = None) -> Dict[str, Any]:
+    """Document metadata; `symbol` is what the Reporter filters retrieval on."""
+    metadata = {"topic": topic, "timestamp": timestamp}
+    symbol = symbol or _research_symbol.get()
+    if symbol:
+        metadata["symbol"] = symbol.strip().upper()
+    return metadata
+
 
 def _ingest(document: Dict[str, Any]) -> Dict[str, Any]:
     """Internal function to make the actual API call."""
@@ -21,7 +66,7 @@ def _ingest(document: Dict[str, Any]) -> Dict[str, Any]:
             ALEX_API_ENDPOINT,
             json=document,
             headers={"x-api-key": ALEX_API_KEY},
-            timeout=30.0
+            timeout=60.0  # batches embed many chunks in one request
         )
         response.raise_for_status()
         return response.json()
@@ -37,13 +82,14 @@ def ingest_with_retries(document: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @function_tool
-def ingest_financial_document(topic: str, analysis: str) -> Dict[str, Any]:
+def ingest_financial_document(topic: str, analysis: str, symbol: Optional[str] = None) -> Dict[str, Any]:
     """
     Ingest a financial document into the Alex knowledge base.
     
     Args:
         topic: The topic or subject of the analysis (e.g., "AAPL Stock Analysis", "Retirement Planning Guide")
         analysis: Detailed analysis or advice with specific data and insights
+        symbol: Ticker the analysis is about (e.g. "AAPL"); omit for general market analysis
     
     Returns:
         Dictionary with success status and document ID
@@ -56,14 +102,12 @@ def ingest_financial_document(topic: str, analysis: str) -> Dict[str, Any]:
     
     document = {
         "text": analysis,
-        "metadata": {
-            "topic": topic,
-            "timestamp": datetime.now(UTC).isoformat()
-        }
+        "metadata": _metadata(topic, datetime.now(UTC).isoformat(), symbol)
     }
     
     try:
         result = ingest_with_retries(document)
+        _collect(result.get("chunk_ids") or [result.get("document_id")])
         return {
             "success": True,
             "document_id": result.get("document_id"),  # Changed from documentId
@@ -73,4 +117,55 @@ def ingest_financial_document(topic: str, analysis: str) -> Dict[str, Any]:
         return {
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+class FinancialDocument(BaseModel):
+    topic: str
+    analysis: str
+    symbol: Optional[str] = None
+
+
+@function_tool
+def ingest_financial_documents(documents: List[FinancialDocument]) -> Dict[str, Any]:
+    """
+    Ingest several financial documents into the Alex knowledge base in one call.
+    Prefer this over repeated ingest_financial_document calls when saving
+    more than one analysis (e.g. one per symbol).
+
+    Args:
+        documents: Analyses to save, each with a topic (e.g. "AAPL Stock Analysis"), its analysis text
+            and the ticker it is about (symbol, omitted for general market analysis)
+
+    Returns:
+        Dictionary with success status and one document ID per document
+    """
+    if not ALEX_API_ENDPOINT or not ALEX_API_KEY:
+        return {
+            "success": False,
+            "error": "Alex API not configured. Running in local mode."
+        }
+
+    timestamp = datetime.now(UTC).isoformat()
+    batch = {
+        "documents": [
+            {"text": doc.analysis, "metadata": _metadata(doc.topic, timestamp, doc.symbol)}
+            for doc in documents
+        ]
+    }
+
+    try:
+        result = ingest_with_retries(batch)
+        ingested = result.get("documents", [])
+        for doc in ingested:
+            _collect(doc.get("chunk_ids") or [doc.get("document_id")])
+        return {
+            "success": True,
+            "document_ids": [doc.get("document_id") for doc in ingested],
+            "message": f"Successfully ingested {len(ingested)} analyses"
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
@@ -24,6 +24,7 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 from litellm.exceptions import RateLimitError
 
 from producers.retirement_bridge import emit_retirement_facts
+from common.post_processing import POST_PROCESS_ACTION, enqueue_post_processing, run_post_processing
 
 
 class AgentTemporaryError(Exception):
@@ -154,11 +155,16 @@ async def run_retirement_agent(job_id: str, user_id: str, portfolio_data: Dict[s
         # except Exception as e:
             # logger.exception("Failed to persist retirement actions")
 
-        await emit_retirement_facts(
-            user_id=user_id,
-            job_id=job_id,
-            retirement_report=result.final_output
-        )
+        # Fact/event emission runs off the critical path (async self-invoke);
+        # emit inline only when there is no async target (e.g. local runs)
+        if not enqueue_post_processing(
+            "retirement", job_id=job_id, user_id=user_id, narrative=result.final_output
+        ):
+            await emit_retirement_facts(
+                user_id=user_id,
+                job_id=job_id,
+                retirement_report=result.final_output
+            )
 
         
         return {
@@ -167,6 +173,10 @@ async def run_retirement_agent(job_id: str, user_id: str, portfolio_data: Dict[s
             'final_output': result.final_output
         }
 
+async def _emit_facts(user_id: str, job_id: str, narrative: str):
+    await emit_retirement_facts(user_id=user_id, job_id=job_id, retirement_report=narrative)
+
+
 def lambda_handler(event, context):
     """
     Lambda handler expecting job_id in event.
@@ -186,6 +196,10 @@ def lambda_handler(event, context):
             if isinstance(event, str):
                 event = json.loads(event)
 
+            # Deferred fact/event emission for an already-saved analysis
+            if event.get('action') == POST_PROCESS_ACTION:
+                return asyncio.run(run_post_processing(event, _emit_facts))
+
             logger.info(f"[TRACE] portfolio_data exists in event: {'portfolio_data' in event}")
             logger.info(f"[TRACE] portfolio_data type: {type(event.get('portfolio_data'))}")
             logger.info(f"[TRACE] portfolio_data value: {str(event.get('portfolio_data'))[:300]}")
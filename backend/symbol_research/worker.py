@@ -1,21 +1,41 @@
 import json
 import os
+import time
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
 from common.job_tracker import JobTracker
+from common.symbol_research_store import fail_symbol_research, sweep_stale_research
 
 # APP_RUNNER_URL = os.environ["APP_RUNNER_URL"].replace("https://", "")
 app_runner_url = os.environ.get('APP_RUNNER_URL')
 if not app_runner_url:
     raise ValueError("APP_RUNNER_URL environment variable not set")
-    
+
 # Remove any protocol if included
 if app_runner_url.startswith('https://'):
     app_runner_url = app_runner_url.replace('https://', '')
 elif app_runner_url.startswith('http://'):
     app_runner_url = app_runner_url.replace('http://', '')
 
-def call_researcher(job_id, user_id, symbol):
-    
+# Records of one SQS batch are researched concurrently, bounded so a large
+# batch cannot flood the Researcher service
+MAX_CONCURRENCY = int(os.getenv("SYMBOL_WORKER_CONCURRENCY", "5"))
+
+# Per-symbol budget for the Researcher call
+SYMBOL_TIMEOUT_SECONDS = float(os.getenv("SYMBOL_RESEARCH_TIMEOUT_SECONDS", "300"))
+
+# Must match maxReceiveCount of the queue's redrive policy: only the last
+# delivery marks the symbol failed, earlier failures are left to SQS retries
+MAX_RECEIVES = int(os.getenv("SYMBOL_MAX_RECEIVES", "3"))
+
+# Time kept back from the Lambda deadline to report results
+DEADLINE_MARGIN_SECONDS = 10
+
+# Scheduled event that fails tracker items whose settlement was lost
+SWEEP_ACTION = "sweep_stale_research"
+
+def call_researcher(job_id, user_id, symbol, timeout=SYMBOL_TIMEOUT_SECONDS):
+
     url = f"https://{app_runner_url}/research/symbol"
     payload = {
         "job_id": job_id,
@@ -33,33 +53,106 @@ def call_researcher(job_id, user_id, symbol):
         method="POST",
         headers=headers
     )
-    
+
     print("WORKER calling Researcher URL:", url)
-    print("Headers:", headers)
     print("Body:", payload)
 
-    with urllib.request.urlopen(req, timeout=300) as resp:
-        return resp.read().decode("utf-8")
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        print("WORKER Researcher responded:", resp.status, resp.read().decode("utf-8")[:300])
+        return resp.status
 
 
-def handler(event, context):
-    tracker = JobTracker()
+def _is_last_attempt(record):
+    receive_count = int(record.get("attributes", {}).get("ApproximateReceiveCount", "1"))
+    return receive_count >= MAX_RECEIVES
+
 
-    for record in event["Records"]:
-        msg = json.loads(record["body"])
+def process_record(tracker, record, timeout):
+    """Research one symbol. Raises on failure so the record is retried."""
+    msg = json.loads(record["body"])
 
-        job_id = msg["job_id"]
-        user_id = msg["user_id"]
-        symbol = msg["symbol"]
+    job_id = msg["job_id"]
+    user_id = msg["user_id"]
+    symbol = msg["symbol"]
 
-        # Mark running
-        tracker.mark_symbol_running(job_id, symbol)
+    # Mark running (bumps retry_count on redelivery)
+    tracker.mark_symbol_running(job_id, symbol)
 
-        try:
-            call_researcher(job_id, user_id, symbol)
+    try:
+        status = call_researcher(job_id, user_id, symbol, timeout=timeout)
+        # 202: queued in the Researcher, which settles the symbol itself when
+        # the run finishes. A full queue answers 429 and raises here (retry).
+        if status != 202:
             tracker.mark_symbol_done(job_id, symbol)
-        except Exception as e:
-            tracker.mark_symbol_error(job_id, symbol, str(e))
-            raise
+    except Exception as e:
+        if _is_last_attempt(record):
+            # Out of retries: record the failure so the job can settle, and
+            # hand the symbol back so jobs waiting on this run settle too
+            fail_symbol_research(tracker, job_id, symbol, str(e))
+        else:
+            print(f"WORKER {symbol} failed, leaving for SQS retry: {e}")
+        raise
+
+
+def _fail_timed_out(tracker, record, budget):
+    msg = json.loads(record["body"])
+    try:
+        fail_symbol_research(
+            tracker, msg["job_id"], msg["symbol"],
+            f"Symbol research timed out after {budget:.0f}s on the last attempt",
+        )
+    except Exception as e:
+        print(f"WORKER could not settle timed-out {msg.get('symbol')}: {e}")
+
+
+def sweep(tracker):
+    stale = sweep_stale_research(tracker)
+    for item in stale:
+        print(f"WORKER swept stale {item['status']} {item['symbol']} of job {item['job_id']}")
+    return {"swept": len(stale)}
+
+
+def handler(event, context):
+    if event.get("action") == SWEEP_ACTION:
+        return sweep(JobTracker())
+
+    records = event.get("Records", [])
+    if not records:
+        return {"batchItemFailures": []}
+
+    tracker = JobTracker()
+
+    # Never let a symbol run past the Lambda deadline: whatever is still
+    # in flight then is reported as failed and redelivered by SQS
+    budget = SYMBOL_TIMEOUT_SECONDS
+    if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+        remaining = context.get_remaining_time_in_millis() / 1000 - DEADLINE_MARGIN_SECONDS
+        budget = max(1.0, min(budget, remaining))
+    deadline = time.monotonic() + budget
+
+    failures = []
+    pool = ThreadPoolExecutor(max_workers=min(MAX_CONCURRENCY, len(records)))
+    try:
+        futures = {
+            pool.submit(process_record, tracker, record, budget): record
+            for record in records
+        }
+        _, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+
+        for future, record in futures.items():
+            if future in not_done:
+                print(f"WORKER timed out after {budget:.0f}s: {record['messageId']}")
+                failures.append({"itemIdentifier": record["messageId"]})
+                if _is_last_attempt(record):
+                    # Its thread is abandoned below and the message goes to the
+                    # DLQ, so settle the symbol here or the job never settles
+                    _fail_timed_out(tracker, record, budget)
+            elif future.exception() is not None:
+                print(f"WORKER failed {record['messageId']}: {future.exception()}")
+                failures.append({"itemIdentifier": record["messageId"]})
+    finally:
+        # Don't block on stragglers; their messages are already reported failed
+        pool.shutdown(wait=False, cancel_futures=True)
 
-    return {"status": "ok"}
+    print(f"WORKER processed {len(records)} record(s), {len(failures)} failed")
+    return {"batchItemFailures": failures}
@@ -148,13 +148,15 @@ resource "aws_lambda_function" "ingest" {
   
   handler = "ingest_s3vectors.lambda_handler"
   runtime = "python3.12"
-  timeout = 60
+  timeout = 120  # batch requests embed many chunks
   memory_size = 512
   
   environment {
     variables = {
       VECTOR_BUCKET      = aws_s3_bucket.vectors.id
       SAGEMAKER_ENDPOINT = var.sagemaker_endpoint_name
+      # Persistent tier of the shared embedding cache (common/embeddings.py)
+      EMBEDDING_CACHE_BUCKET = aws_s3_bucket.vectors.id
     }
   }
   
@@ -134,6 +134,23 @@ resource "aws_iam_role_policy" "app_runner_rds_data_api" {
 }
 
 
+# Allow the Researcher (JobTracker) to push research completion to the Reporter
+resource "aws_iam_role_policy" "app_runner_invoke_reporter" {
+  name = "alex-app-runner-invoke-reporter"
+  role = aws_iam_role.app_runner_instance_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17",
+    Statement = [
+      {
+        Effect   = "Allow",
+        Action   = ["lambda:InvokeFunction"],
+        Resource = "arn:aws:lambda:${var.aws_region}:${data.aws_caller_identity.current.account_id}:function:alex-reporter"
+      }
+    ]
+  })
+}
+
 # Policy for App Runner instance to access Bedrock
 resource "aws_iam_role_policy" "app_runner_instance_bedrock_access" {
   name = "alex-app-runner-instance-bedrock-policy"
@@ -180,6 +197,11 @@ resource "aws_apprunner_service" "researcher" {
           AURORA_SECRET_ARN  = var.database_secret_arn
           DEFAULT_AWS_REGION = var.aws_region
           BRAVE_API_KEY      = var.brave_api_key
+          # JobTracker pushes the Reporter continuation when research settles
+          RESEARCH_COMPLETE_FUNCTION = "alex-reporter"
+          # In-process research queue: concurrent agent runs per instance
+          RESEARCH_CONCURRENCY = "3"
+          RESEARCH_MAX_QUEUED  = "100"
         }
       }
       image_repository_type = "ECR"
@@ -389,6 +411,17 @@ resource "aws_lambda_function" "symbol_worker" {
       AURORA_CLUSTER_ARN = var.database_cluster_arn
       AURORA_SECRET_ARN  = var.database_secret_arn
       DEFAULT_AWS_REGION = var.aws_region
+
+      # JobTracker pushes the Reporter continuation when research settles
+      RESEARCH_COMPLETE_FUNCTION = "alex-reporter"
+
+      # Concurrent batch processing
+      SYMBOL_WORKER_CONCURRENCY       = "5"
+      SYMBOL_RESEARCH_TIMEOUT_SECONDS = "60"   # Researcher answers 202 once queued
+      SYMBOL_MAX_RECEIVES             = "3"  # keep in sync with maxReceiveCount
+      # The sweeper derives its stale window from these (60 + 2 x 920 + 600 s,
+      # about 42 min); set SYMBOL_RESEARCH_STALE_SECONDS only to override it
+      SYMBOL_QUEUE_VISIBILITY_SECONDS = aws_sqs_queue.symbol_research.visibility_timeout_seconds
     }
   }
 
@@ -405,8 +438,42 @@ resource "aws_lambda_function" "symbol_worker" {
 resource "aws_lambda_event_source_mapping" "symbol_research_worker_sqs" {
   event_source_arn = aws_sqs_queue.symbol_research.arn
   function_name    = "alex-symbol-research-worker"
-  batch_size       = 1
+  batch_size       = 10
   enabled          = true
+
+  # Records of a batch are researched concurrently; wait briefly so a
+  # portfolio's symbols arrive together
+  maximum_batching_window_in_seconds = 5
+
+  # Worker returns batchItemFailures so only failed symbols are redelivered
+  function_response_types = ["ReportBatchItemFailures"]
+}
+
+# ========================================
+# Stale Research Sweep (Symbol Worker Lambda)
+# ========================================
+
+# Settlement is pushed by whoever finishes a symbol; this sweep fails items
+# whose push never came so their jobs still settle and reach the Reporter
+resource "aws_cloudwatch_event_rule" "stale_research_sweep" {
+  name                = "alex-stale-research-sweep"
+  description         = "Fail symbol research items that never settled"
+  schedule_expression = "rate(15 minutes)"
+}
+
+resource "aws_cloudwatch_event_target" "stale_research_sweep" {
+  rule      = aws_cloudwatch_event_rule.stale_research_sweep.name
+  target_id = "symbol_worker_sweep"
+  arn       = aws_lambda_function.symbol_worker.arn
+  input     = jsonencode({ action = "sweep_stale_research" })
+}
+
+resource "aws_lambda_permission" "allow_stale_research_sweep" {
+  statement_id  = "AllowStaleResearchSweep"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.symbol_worker.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.stale_research_sweep.arn
 }
 
 # ========================================
@@ -472,6 +539,13 @@ resource "aws_iam_role_policy" "lambda_symbol_worker_policy" {
         Effect = "Allow"
         Action = ["secretsmanager:GetSecretValue"]
         Resource = var.database_secret_arn
+      },
+
+      # Push research completion to the Reporter
+      {
+        Effect = "Allow"
+        Action = ["lambda:InvokeFunction"]
+        Resource = "arn:aws:lambda:${var.aws_region}:${data.aws_caller_identity.current.account_id}:function:alex-reporter"
       }
     ]
   })
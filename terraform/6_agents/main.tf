@@ -185,6 +185,14 @@ resource "aws_iam_role_policy" "lambda_agents_policy" {
           "arn:aws:s3:::${var.vector_bucket}/*"
         ]
       },
+      # Embedding cache objects (common/embeddings.py)
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:PutObject"
+        ]
+        Resource = "arn:aws:s3:::${var.vector_bucket}/embedding-cache/*"
+      },
       # S3 Vectors API access for all agents
       {
         Effect = "Allow"
@@ -392,6 +400,14 @@ resource "aws_lambda_function" "reporter" {
       BEDROCK_REGION     = var.bedrock_region
       DEFAULT_AWS_REGION = var.aws_region
       SAGEMAKER_ENDPOINT = var.sagemaker_endpoint
+      # Knowledge base bucket; saves an STS lookup (common/aws_clients.py)
+      VECTOR_BUCKET      = var.vector_bucket
+      # Judge after the report is saved, for a sample of reports (reporter/judge.py)
+      JUDGE_MODE             = "async"
+      JUDGE_SAMPLE_RATE      = "1.0"
+      JUDGE_LOW_SCORE_ACTION = "replace"
+      # Persistent tier of the shared embedding cache (common/embeddings.py)
+      EMBEDDING_CACHE_BUCKET = var.vector_bucket
       # LangFuse observability (optional)
       LANGFUSE_PUBLIC_KEY = var.langfuse_public_key
       LANGFUSE_SECRET_KEY = var.langfuse_secret_key
@@ -490,6 +506,19 @@ resource "aws_lambda_function" "retirement" {
   depends_on = [aws_s3_object.lambda_packages["retirement"]]
 }
 
+# Async self-invocations that run fact/event post-processing for the
+# Reporter and Retirement agents (idempotent via post_processing_runs)
+resource "aws_lambda_function_event_invoke_config" "post_processing" {
+  for_each = {
+    reporter   = aws_lambda_function.reporter.function_name
+    retirement = aws_lambda_function.retirement.function_name
+  }
+
+  function_name                = each.value
+  maximum_retry_attempts       = 2
+  maximum_event_age_in_seconds = 3600
+}
+
 # CloudWatch Log Groups
 resource "aws_cloudwatch_log_group" "agent_logs" {
   for_each = toset(["planner", "tagger", "reporter", "charter", "retirement"])